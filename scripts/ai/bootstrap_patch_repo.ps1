@@ -41,11 +41,16 @@ from __future__ import annotations
 
 import argparse
 import re
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Optional
 
 ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.bridge.walker import DENY_DIRS, RepoWalker  # noqa: E402
 
 @dataclass(frozen=True)
 class PatchResult:
@@ -191,17 +196,13 @@ def ensure_shipping_option_deadline_in_file(ts: str) -> tuple[str, bool]:
 def find_files_containing(pattern: str, roots: Iterable[Path]) -> list[Path]:
     hits: list[Path] = []
     rx = re.compile(pattern)
+    walker = RepoWalker(ROOT, deny_dirs=DENY_DIRS)
     for r in roots:
         if not r.exists():
             continue
-        for p in r.rglob("*.ts"):
-            try:
-                t = p.read_text(encoding="utf-8", errors="replace")
-            except Exception:
-                continue
-            if rx.search(t):
-                hits.append(p)
-        for p in r.rglob("*.tsx"):
+        start = r.resolve().relative_to(ROOT).as_posix() if r.resolve() != ROOT else ""
+        for _, de in walker.walk(start, suffixes=(".ts", ".tsx")):
+            p = Path(de.path)
             try:
                 t = p.read_text(encoding="utf-8", errors="replace")
             except Exception:
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# scripts/bridge/bench/__main__.py
+"""
+Bridge benchmark: synthetic repos at set sizes, in-process server, JSON report.
+
+Usage (from the repo root):
+  python -m scripts.bridge.bench --sizes 1k,50k --concurrency 1,8 --out bench.json
+  python -m scripts.bridge.bench --sizes 1k --baseline bench.json   # exit 1 on regression
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+from scripts.bridge.bench.runner import ENDPOINTS, compare, run_repo
+from scripts.bridge.bench.synth import DEFAULT_NODE_MODULES_SHARE, GEN_VERSION, generate, parse_size
+from scripts.bridge.bridge_server import DEFAULT_SEARCH_WORKERS, DEFAULT_WORKERS
+
+
+def _code_revision() -> Dict[str, Any]:
+    here = Path(__file__).resolve().parent
+    try:
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=str(here), capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--", "."], cwd=str(here.parent), capture_output=True, text=True).stdout.strip())
+    except OSError:
+        return {"commit": None, "dirty": None}
+    return {"commit": head or None, "dirty": dirty}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark bridge endpoints against synthetic repos")
+    ap.add_argument("--sizes", default="1k", help="Comma-separated repo sizes in files, e.g. 1k,50k,500k")
+    ap.add_argument("--endpoints", default=",".join(ENDPOINTS), help="Comma-separated endpoints to drive")
+    ap.add_argument("--concurrency", default="1,8", help="Comma-separated client counts")
+    ap.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint and concurrency")
+    ap.add_argument("--node-modules-share", type=float, default=DEFAULT_NODE_MODULES_SHARE, help="Fraction of files under node_modules/")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "bridge-bench"), help="Where synthetic repos are generated (and reused)")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Bridge worker threads")
+    ap.add_argument("--search-workers", type=int, default=DEFAULT_SEARCH_WORKERS, help="Bridge search scan processes")
+    ap.add_argument("--access-log", action="store_true", default=False, help="Keep the bridge access log on stderr")
+    ap.add_argument("--out", default="", help="Write the JSON report here (default: stdout)")
+    ap.add_argument("--baseline", default="", help="Previous report to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 / rps change vs baseline (fraction)")
+    args = ap.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = [e for e in endpoints if e not in ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"unknown endpoints: {unknown} (known: {ENDPOINTS})")
+    concurrency = [max(1, int(c)) for c in args.concurrency.split(",") if c.strip()]
+    work_dir = Path(args.work_dir).resolve()
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    repos: List[Dict[str, Any]] = []
+    results: List[Dict[str, Any]] = []
+    # progress (and anything the server prints) to stderr: stdout carries only the report
+    with contextlib.redirect_stdout(sys.stderr):
+        for label in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+            t0 = time.perf_counter()
+            repo = generate(work_dir, parse_size(label), args.seed, args.node_modules_share)
+            gen_s = time.perf_counter() - t0
+            info, res = run_repo(repo, label, endpoints, concurrency, max(1, args.requests), max(0, args.workers), args.search_workers, args.access_log)
+            repos.append({**info, "generateSeconds": round(gen_s, 3)})
+            results.extend(asdict(r) for r in res)
+
+    report = {
+        "meta": {
+            **_code_revision(),
+            "generator": GEN_VERSION,
+            "seed": args.seed,
+            "nodeModulesShare": args.node_modules_share,
+            "requests": args.requests,
+            "workers": args.workers,
+            "searchWorkers": args.search_workers,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "repos": repos,
+        "results": results,
+    }
+
+    regressions: List[str] = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("generator") != GEN_VERSION:
+            print("[bench] baseline was generated by another synthetic repo version: not comparable", file=sys.stderr)
+        else:
+            regressions = compare(results, baseline.get("results", []), args.tolerance)
+        report["regressions"] = regressions
+        for line in regressions:
+            print(f"[bench] REGRESSION {line}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+        print(f"[bench] report written to {args.out}", file=sys.stderr)
+    else:
+        print(text)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# scripts/bridge/bench/runner.py
+"""
+Load driver for the bridge benchmark.
+
+- Starts BridgeHTTPServer in-process on an ephemeral port (fresh cache/state dirs: cold start every run)
+- Scenarios: /repo/tree, /repo/search, /repo/read, /patch/apply, /git/status; each is a body factory
+  called with the request number, so a run is the same sequence of requests on every commit
+- N client threads, one keep-alive connection each; per request latency, errors counted by status
+- Result per (repo, endpoint, concurrency): requests, errors, seconds, rps, p50/p95/p99/max in ms
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from scripts.bridge.bench.synth import ABSENT_SYMBOL, COMMON_SYMBOL, RARE_SYMBOL, SynthRepo
+from scripts.bridge.bridge_server import ALLOW_GLOBS_DEFAULT, GROUP_LIMITS_DEFAULT, BridgeConfig, BridgeHandler, BridgeHTTPServer
+
+ENDPOINTS = ["/repo/tree", "/repo/search", "/repo/read", "/patch/apply", "/git/status"]
+WARMUP_REQUESTS = 5
+INDEX_READY_TIMEOUT = 600.0
+
+BodyFactory = Callable[[int, int], Dict[str, Any]]  # (request number, client number) -> body
+
+
+@dataclass
+class EndpointResult:
+    repo: str
+    endpoint: str
+    concurrency: int
+    requests: int
+    errors: int
+    seconds: float
+    rps: float
+    p50Ms: float
+    p95Ms: float
+    p99Ms: float
+    maxMs: float
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an ascending list (0.0 if empty).
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))  # ceil
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class _PatchToggler:
+    """
+    /patch/apply bodies: each client owns one source file and alternately appends and removes a line,
+    so the repo ends where it started and clients never conflict.
+    """
+
+    def __init__(self, repo: SynthRepo, clients: int) -> None:
+        self.targets = [repo.source_files[(c * 7919) % len(repo.source_files)] for c in range(clients)]
+        self.original: Dict[str, bytes] = {rel: (repo.root / rel).read_bytes() for rel in self.targets}
+        self.applied = [False] * clients
+        self._patches: Dict[str, Tuple[str, str]] = {}
+        for rel, data in self.original.items():
+            last = data.decode("utf-8").splitlines()[-1]
+            n = len(data.decode("utf-8").splitlines())
+            hdr = f"diff --git a/{rel} b/{rel}\n--- a/{rel}\n+++ b/{rel}\n"
+            fwd = hdr + f"@@ -{n},1 +{n},2 @@\n {last}\n+// bench\n"
+            rev = hdr + f"@@ -{n},2 +{n},1 @@\n {last}\n-// bench\n"
+            self._patches[rel] = (fwd, rev)
+
+    def body(self, i: int, client: int) -> Dict[str, Any]:
+        fwd, rev = self._patches[self.targets[client]]
+        patch = rev if self.applied[client] else fwd
+        self.applied[client] = not self.applied[client]
+        return {"patch": patch, "dryRun": False, "force": True}
+
+    def restore(self, root: Path) -> None:
+        for rel, data in self.original.items():
+            (root / rel).write_bytes(data)
+        self.applied = [False] * len(self.applied)
+
+
+def scenarios(repo: SynthRepo, clients: int, patcher: _PatchToggler) -> Dict[str, BodyFactory]:
+    src = repo.source_files
+    queries = [RARE_SYMBOL, COMMON_SYMBOL, ABSENT_SYMBOL, "Item1Props", "compute"]
+    dirs = sorted({rel.rsplit("/", 1)[0] for rel in src})
+    return {
+        "/repo/tree": lambda i, c: {"path": "." if i % 2 == 0 else dirs[i % len(dirs)], "maxEntries": 2000},
+        "/repo/search": lambda i, c: {"query": queries[i % len(queries)], "maxHits": 50},
+        "/repo/read": lambda i, c: {"path": src[(i * 31) % len(src)]},
+        "/patch/apply": patcher.body,
+        "/git/status": lambda i, c: {},
+    }
+
+
+class _QuietHandler(BridgeHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _Client:
+    def __init__(self, port: int, token: str) -> None:
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+        self.headers = {"X-Bridge-Token": token, "Content-Type": "application/json"}
+
+    def post(self, path: str, body: Dict[str, Any]) -> int:
+        data = json.dumps(body).encode("utf-8")
+        try:
+            self.conn.request("POST", path, body=data, headers=self.headers)
+            resp = self.conn.getresponse()
+            resp.read()
+            if resp.getheader("Connection", "").lower() == "close":
+                self.conn.close()
+            return resp.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()  # reconnects on the next request
+            return 0
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def drive(port: int, token: str, endpoint: str, make_body: BodyFactory, requests: int, concurrency: int) -> Tuple[List[float], Dict[str, int], float]:
+    """
+    Send `requests` requests from `concurrency` clients. Returns: latencies (s), status counts, wall seconds
+    """
+    lock = threading.Lock()
+    next_i = [0]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    def worker(c: int) -> None:
+        client = _Client(port, token)
+        mine: List[float] = []
+        seen: Dict[str, int] = {}
+        try:
+            while True:
+                with lock:
+                    i = next_i[0]
+                    if i >= requests:
+                        break
+                    next_i[0] += 1
+                body = make_body(i, c)
+                t0 = time.perf_counter()
+                status = client.post(endpoint, body)
+                mine.append(time.perf_counter() - t0)
+                seen[str(status)] = seen.get(str(status), 0) + 1
+        finally:
+            client.close()
+            with lock:
+                latencies.extend(mine)
+                for k, v in seen.items():
+                    statuses[k] = statuses.get(k, 0) + v
+
+    threads = [threading.Thread(target=worker, args=(c,), daemon=True) for c in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, statuses, time.perf_counter() - started
+
+
+def start_server(repo: SynthRepo, workers: int, search_workers: int, access_log: bool = False) -> Tuple[BridgeHTTPServer, str, Path, Dict[str, float]]:
+    """
+    In-process bridge over repo with fresh cache/state dirs. Returns: server, token, temp dir, startup timings
+    """
+    token = secrets.token_hex(8)
+    tmp = Path(tempfile.mkdtemp(prefix="bridge-bench-"))
+    cfg = BridgeConfig(
+        repo_root=repo.root,
+        token=token,
+        readonly=False,
+        allow_write=True,
+        allow_apply_plan=True,
+        allow_git=True,
+        allow_patch_apply=True,
+        allow_globs=list(ALLOW_GLOBS_DEFAULT),
+    )
+    t0 = time.perf_counter()
+    srv = BridgeHTTPServer(
+        ("127.0.0.1", 0),
+        cfg,
+        workers=workers,
+        limits=dict(GROUP_LIMITS_DEFAULT),
+        cache_dir=tmp / "cache",
+        state_dir=tmp / "state",
+        search_workers=search_workers,
+    )
+    startup = {"indexBuildSeconds": round(time.perf_counter() - t0, 4)}
+    if not access_log:
+        srv.RequestHandlerClass = _QuietHandler
+    if srv.search_index is not None:
+        deadline = time.monotonic() + INDEX_READY_TIMEOUT
+        while not srv.search_index.ready and time.monotonic() < deadline:
+            time.sleep(0.02)
+        startup["searchIndexReadySeconds"] = round(time.perf_counter() - t0, 4)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, token, tmp, startup
+
+
+def run_repo(
+    repo: SynthRepo,
+    label: str,
+    endpoints: List[str],
+    concurrency: List[int],
+    requests: int,
+    workers: int,
+    search_workers: int,
+    access_log: bool = False,
+) -> Tuple[Dict[str, Any], List[EndpointResult]]:
+    srv, token, tmp, startup = start_server(repo, workers, search_workers, access_log)
+    port = srv.server_address[1]
+    results: List[EndpointResult] = []
+    patcher = _PatchToggler(repo, max(concurrency))
+    factories = scenarios(repo, max(concurrency), patcher)
+    try:
+        for endpoint in endpoints:
+            for conc in concurrency:
+                drive(port, token, endpoint, factories[endpoint], WARMUP_REQUESTS, 1)
+                lat, statuses, wall = drive(port, token, endpoint, factories[endpoint], requests, conc)
+                lat.sort()
+                ms = [v * 1000 for v in lat]
+                errors = sum(n for s, n in statuses.items() if not s.startswith("2"))
+                r = EndpointResult(
+                    repo=label,
+                    endpoint=endpoint,
+                    concurrency=conc,
+                    requests=len(lat),
+                    errors=errors,
+                    seconds=round(wall, 4),
+                    rps=round(len(lat) / wall, 2) if wall > 0 else 0.0,
+                    p50Ms=round(percentile(ms, 50), 3),
+                    p95Ms=round(percentile(ms, 95), 3),
+                    p99Ms=round(percentile(ms, 99), 3),
+                    maxMs=round(ms[-1], 3) if ms else 0.0,
+                    statuses=statuses,
+                )
+                results.append(r)
+                print(f"[bench] {label} {endpoint} c={conc} rps={r.rps} p50={r.p50Ms}ms p95={r.p95Ms}ms p99={r.p99Ms}ms errors={errors}")
+                if endpoint == "/patch/apply":
+                    patcher.restore(repo.root)
+    finally:
+        patcher.restore(repo.root)
+        srv.shutdown()
+        srv.server_close()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {"repo": label, "files": repo.files, "sourceFiles": len(repo.source_files), **startup}, results
+
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """
+    Regressions vs a previous run: p95 up or rps down by more than `tolerance` (fraction), or new errors.
+    """
+    base = {(r["repo"], r["endpoint"], r["concurrency"]): r for r in baseline}
+    out: List[str] = []
+    for r in current:
+        b: Optional[Dict[str, Any]] = base.get((r["repo"], r["endpoint"], r["concurrency"]))
+        if b is None:
+            continue
+        key = f"{r['repo']} {r['endpoint']} c={r['concurrency']}"
+        if b["p95Ms"] > 0 and r["p95Ms"] > b["p95Ms"] * (1 + tolerance):
+            out.append(f"{key}: p95 {b['p95Ms']}ms -> {r['p95Ms']}ms")
+        if b["rps"] > 0 and r["rps"] < b["rps"] * (1 - tolerance):
+            out.append(f"{key}: rps {b['rps']} -> {r['rps']}")
+        if r["errors"] > b["errors"]:
+            out.append(f"{key}: errors {b['errors']} -> {r['errors']}")
+    return out
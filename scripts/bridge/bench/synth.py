@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# scripts/bridge/bench/synth.py
+"""
+Synthetic repos for the bridge benchmark.
+
+- Layout of the real app: app/, components/, hooks/, utils/, types/, context/, constants/, data/
+  (allowlisted .ts/.tsx sources) next to a large node_modules/ (denied, but walked by git and the index)
+- Deterministic for a given (files, seed, GEN_VERSION): the same repo on every machine and commit
+- Generated once per work dir and reused (marker file written last, so a killed run is regenerated)
+- Sources are committed (node_modules is .gitignored, as in the real repo)
+"""
+
+from __future__ import annotations
+
+import random
+import shutil
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+# bump when the generated content changes: results are only comparable within one version
+GEN_VERSION = 1
+MARKER = ".bench-complete"
+DEFAULT_NODE_MODULES_SHARE = 0.8
+
+SOURCE_DIRS = ["app", "components", "hooks", "utils", "types", "context", "constants", "data"]
+FILES_PER_DIR = 40
+NM_FILES_PER_PACKAGE = 12
+
+# identifiers the search scenario looks for (rare, common, absent)
+RARE_SYMBOL = "ShippingOption"
+COMMON_SYMBOL = "useMemo"
+ABSENT_SYMBOL = "zzBenchAbsentToken"
+
+
+@dataclass
+class SynthRepo:
+    root: Path
+    files: int
+    source_files: List[str]  # allowlisted, repo-relative posix paths
+
+
+def parse_size(label: str) -> int:
+    """
+    "1k" -> 1000, "50k" -> 50000, "2m" -> 2000000, "1500" -> 1500
+    """
+    s = label.strip().lower()
+    mult = 1
+    if s.endswith("k"):
+        mult, s = 1000, s[:-1]
+    elif s.endswith("m"):
+        mult, s = 1_000_000, s[:-1]
+    return int(float(s) * mult)
+
+
+def _source_text(rnd: random.Random, i: int, rel_dir: str, ext: str) -> str:
+    name = f"Item{i}"
+    lines = [
+        'import React, { useMemo, useState } from "react";',
+        f'import {{ Order{rnd.randrange(max(1, i))} }} from "@/types/order";',
+        f'import {{ format{rnd.randrange(max(1, i))} }} from "../utils/format";',
+        "",
+        f"export type {name}Props = {{ id: string; total: number; note?: string }};",
+        "",
+    ]
+    if i % 97 == 0:
+        lines.append(f"export interface {RARE_SYMBOL}{i} {{ deadline?: string; price: number }}")
+        lines.append("")
+    if ext == ".tsx":
+        lines += [
+            f"export default function {name}(props: {name}Props) {{",
+            "  const [open, setOpen] = useState(false);",
+            "  const label = useMemo(() => `${props.id}:${props.total}`, [props.id, props.total]);",
+            "  return null;",
+            "}",
+        ]
+    else:
+        lines += [
+            f"export function compute{name}(props: {name}Props): number {{",
+            "  return props.total * 2;",
+            "}",
+        ]
+    # filler to a realistic size (~1-4 KB)
+    for k in range(rnd.randint(20, 90)):
+        lines.append(f"export const {rel_dir.replace('/', '_')}_{i}_{k} = {rnd.randrange(1_000_000)}; // {rnd.random():.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def _nm_text(rnd: random.Random, pkg: str, k: int) -> str:
+    return f'"use strict";\n// {pkg} module {k}\nmodule.exports = function f{k}(x) {{ return x + {rnd.randrange(1000)}; }};\n'
+
+
+def _git(root: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=str(root), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def generate(work_dir: Path, files: int, seed: int = 0, node_modules_share: float = DEFAULT_NODE_MODULES_SHARE) -> SynthRepo:
+    """
+    Synthetic repo with `files` files in total (node_modules_share of them under node_modules/).
+    """
+    share = min(max(node_modules_share, 0.0), 0.99)
+    root = work_dir / f"repo-{files}-s{seed}-nm{int(share * 100)}-v{GEN_VERSION}"
+    n_src = max(len(SOURCE_DIRS), int(files * (1 - share)))
+    n_nm = max(0, files - n_src)
+
+    source_files: List[str] = []
+    for i in range(n_src):
+        top = SOURCE_DIRS[i % len(SOURCE_DIRS)]
+        bucket = (i // len(SOURCE_DIRS)) // FILES_PER_DIR
+        ext = ".tsx" if top in ("app", "components", "context") else ".ts"
+        source_files.append(f"{top}/g{bucket}/f{i}{ext}")
+
+    if (root / MARKER).exists():
+        return SynthRepo(root=root, files=files, source_files=source_files)
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+    print(f"[bench] generating {root.name} ({n_src} sources, {n_nm} node_modules files)")
+
+    rnd = random.Random(seed)
+    (root / "package.json").write_text('{ "name": "bench-app", "private": true }\n', encoding="utf-8")
+    (root / "tsconfig.json").write_text('{ "compilerOptions": { "strict": true, "paths": { "@/*": ["./*"] } } }\n', encoding="utf-8")
+    (root / ".gitignore").write_text("node_modules/\n", encoding="utf-8")
+    made = set()
+    for i, rel in enumerate(source_files):
+        p = root / rel
+        if p.parent not in made:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            made.add(p.parent)
+        top, sub, _ = rel.split("/", 2)
+        p.write_text(_source_text(rnd, i, f"{top}/{sub}", p.suffix), encoding="utf-8")
+
+    k = 0
+    pkg_i = 0
+    while k < n_nm:
+        # a quarter of the packages scoped, some with nested node_modules, like a real install
+        pkg = f"@scope{pkg_i % 7}/pkg{pkg_i}" if pkg_i % 4 == 0 else f"pkg{pkg_i}"
+        base = root / "node_modules" / pkg
+        if pkg_i % 10 == 5:
+            base = base / "node_modules" / f"dep{pkg_i}"
+        (base / "lib").mkdir(parents=True, exist_ok=True)
+        (base / "package.json").write_text(f'{{ "name": "{pkg}", "version": "1.0.{pkg_i}" }}\n', encoding="utf-8")
+        k += 1
+        for j in range(min(NM_FILES_PER_PACKAGE - 1, n_nm - k)):
+            (base / "lib" / f"m{j}.js").write_text(_nm_text(rnd, pkg, j), encoding="utf-8")
+            k += 1
+        pkg_i += 1
+
+    _git(root, "init", "-q")
+    _git(root, "add", "-A")
+    _git(root, "-c", "user.email=bench@localhost", "-c", "user.name=bench", "commit", "-qm", "synthetic repo")
+    (root / ".git" / "info" / "exclude").write_text(MARKER + "\n", encoding="utf-8")
+    (root / MARKER).write_text(f"{files} {seed} {share} {GEN_VERSION}\n", encoding="utf-8")
+    return SynthRepo(root=root, files=files, source_files=source_files)
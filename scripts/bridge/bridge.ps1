@@ -26,6 +26,11 @@ function Bridge-Cat {
   Invoke-BridgePost -Path "/repo/read" -Body @{ path=$Path; maxBytes=$MaxBytes } | ConvertTo-Json -Depth 10
 }
 
+function Bridge-CatMany {
+  param([string[]]$Paths=@(), [string[]]$Globs=@(), [int]$MaxTotalBytes=2000000)
+  Invoke-BridgePost -Path "/repo/read-many" -Body @{ paths=$Paths; globs=$Globs; maxTotalBytes=$MaxTotalBytes } | ConvertTo-Json -Depth 10
+}
+
 function Bridge-Search {
   param([string]$Query, [int]$MaxHits=50)
   Invoke-BridgePost -Path "/repo/search" -Body @{ query=$Query; maxHits=$MaxHits } | ConvertTo-Json -Depth 10
@@ -112,6 +117,14 @@ switch ($cmd) {
   "cat" {
     if ($args.Count -ge 2) { Bridge-Cat -Path $args[1] } else { Write-Host "Usage: bridge.ps1 cat <path>" }
   }
+  "cat-many" {
+    if ($args.Count -ge 2) {
+      $items = @($args[1..($args.Count-1)])
+      $globs = @($items | Where-Object { $_ -match '[\*\?\[]' })
+      $paths = @($items | Where-Object { $_ -notmatch '[\*\?\[]' })
+      Bridge-CatMany -Paths $paths -Globs $globs
+    } else { Write-Host "Usage: bridge.ps1 cat-many <path|glob>..." }
+  }
   "search" {
     if ($args.Count -ge 2) { Bridge-Search -Query $args[1] } else { Write-Host "Usage: bridge.ps1 search <query>" }
   }
@@ -163,6 +176,7 @@ switch ($cmd) {
     Write-Host "Usage:"
     Write-Host "  .\\scripts\\bridge\\bridge.ps1 tree [path]"
     Write-Host "  .\\scripts\\bridge\\bridge.ps1 cat <path>"
+    Write-Host "  .\\scripts\\bridge\\bridge.ps1 cat-many <path|glob>..."
     Write-Host "  .\\scripts\\bridge\\bridge.ps1 search <query>"
     Write-Host "  .\\scripts\\bridge\\bridge.ps1 git-status"
     Write-Host "  .\\scripts\\bridge\\bridge.ps1 git-diff"
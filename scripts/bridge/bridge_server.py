@@ -7,59 +7,187 @@ Plugaishop Local Bridge (Claude-like)
 - Repo-root sandbox
 - Optional controlled "plan apply" to create architecture/files
 - BRIDGE-003: unified diff validate/apply/revert via git apply (with dry-run + guardrails)
+- Concurrent serving: bounded worker pool (--workers) + per-endpoint concurrency limits
+- In-memory file index (built at startup, refreshed by polling dir mtimes) backs /repo/tree
+- Repo walks prune denied / non-allowlisted dirs before descending (scripts/bridge/walker.py)
+- Persistent trigram index narrows /repo/search to candidate files (regex / glob / case options)
+- Search scans fan out over a process pool (--search-workers), merged in deterministic order
+- /repo/search {"stream": true} streams NDJSON hits as they are found
+- /repo/read: LRU cache of encoded responses + ETag / If-None-Match (304)
+- /repo/read-many: paths + globs in one call, read in parallel under a total byte budget
+- /repo/read ranges: offset/length (bytes) or startLine/endLine via a lazy per-file line-offset index
+- HTTP/1.1 keep-alive + gzip/zstd response compression (Accept-Encoding, size threshold)
+- Idle keep-alive connections and waiting /repo/changes requests are parked in a selector, off the
+  worker pool: a worker only runs requests that have work to do
+- Git calls go through a pluggable backend (cached status, long-lived cat-file --batch)
+- Patch guardrail reuses the cached status while index/HEAD/watched files are unchanged (statusAge in responses)
+- /patch/apply {"atomic": true}: one check+apply pass on a snapshot, per-file hunk results, all-or-nothing promotion
+- /patch/validate {"check": true, "preview": true}: in-process diff parse + fuzzy apply (no git spawn), per-hunk conflict lines
+- /patch/apply-batch: ordered list of diffs, one policy check + one worktree check, applied as a single unit
+- GET /metrics: request counts / latency histograms / bytes per path, git time, cache hit rates, files scanned
+- TCP_NODELAY on responses (headers and body are separate writes)
+- Per-request trace id (X-Trace-Id) + phase timings; slow requests (--slow-ms) go to a rotating JSONL log
+- Path policy (deny patterns + allow globs) compiled once into combined regexes, memoized per directory
+- Request bodies: chunked read into one buffer, parsed from bytes, capped by --max-body-mb (413)
+- Patch journal (<state dir>/journal): applied patches get an id; /patch/revert {"id"} / {"last": N} restores stored pre-images
+- /repo/changes: cursor-based feed of created/modified/deleted allowlisted paths (long-poll or SSE),
+  fed by an inotify watcher on Linux (targeted index refreshes), index polling elsewhere
+- /repo/symbols: symbol index of the TS/JS sources (exports, types, functions, components, hooks, imports),
+  re-scanned per file on mtime/size change; definition lookups without a full-text scan
+- /repo/imports: import graph on top of the symbol index (tsconfig paths aliases resolved), direct or
+  transitive dependents / dependencies; /patch/validate reports the dependents of the touched files ("impact")
 
 Run:
   python scripts/bridge/bridge_server.py --repo "E:\\plugaishopp-app" --token "CHANGE_ME"
+  python scripts/bridge/bridge_server.py --repo "E:\\plugaishopp-app" --token "CHANGE_ME" --workers 16
 
 Endpoints (JSON):
   GET  /health
+  GET  /metrics   (Prometheus text format)
   POST /repo/tree
   POST /repo/read
+  POST /repo/read-many
   POST /repo/search
+  POST /repo/changes
+  POST /repo/symbols
+  POST /repo/imports
   POST /git/status
   POST /git/diff
   POST /plan/validate
   POST /plan/apply
   POST /patch/validate
   POST /patch/apply
+  POST /patch/apply-batch
   POST /patch/revert
+  POST /patch/journal
 """
 
 from __future__ import annotations
 
 import argparse
 import fnmatch
+import functools
+import gzip
 import json
 import os
 import re
 import shutil
-import subprocess
 import sys
-from dataclasses import dataclass
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+try:  # optional: zstd is preferred over gzip when installed and accepted by the client
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+from scripts.bridge.change_feed import ChangeFeed, FeedPage
+from scripts.bridge.file_index import FileIndex
+from scripts.bridge.fs_watch import InotifyWatcher
+from scripts.bridge.git_backend import CachingGitBackend, GitBackend
+from scripts.bridge.import_graph import ImportGraph
+from scripts.bridge.line_index import LineIndexCache
+from scripts.bridge.parking import Parking, Suspension
+from scripts.bridge.read_cache import CachedBody, ReadCache, content_etag, etag_matches
+from scripts.bridge.search_index import SearchIndex
+from scripts.bridge.search_scan import CHUNK_FILES, make_pool, scan_paths
+from scripts.bridge.symbol_index import SymbolIndex
+from scripts.bridge.walker import DENY_DIRS, RepoWalker
+from scripts.bridge.metrics import COUNT_BUCKETS, METRICS
+from scripts.bridge.patch_journal import PatchJournal
+from scripts.bridge import tracing
+from scripts.bridge.tracing import RequestTrace, SlowLog, summarize_params
+from scripts.bridge.path_policy import AllowMatcher, DenyMatcher
 from scripts.bridge.patch_tools import (
     extract_touched_paths,
+    get_backend,
     git_available,
-    validate_clean_worktree,
+    set_backend,
+    check_clean_worktree,
     git_apply_check,
     git_apply,
+    git_apply_atomic,
+    git_apply_batch,
     git_apply_reverse,
+    parse_patch,
+    write_file_atomic,
+    preview_patch,
+    DEFAULT_MAX_FUZZ,
 )
 
 DEFAULT_PORT = 8732
+DEFAULT_WORKERS = 8
+DEFAULT_INDEX_POLL_SECONDS = 2.0
+# with the inotify watcher on, polling is only a safety net (missed events, watch limit)
+WATCH_SAFETY_POLL_SECONDS = 30.0
+CHANGES_MAX_WAIT_SECONDS = 60.0
+CHANGES_MAX_LIMIT = 10_000
+CHANGES_STREAM_MAX_SECONDS = 600.0
+CHANGES_HEARTBEAT_SECONDS = 15.0
+SYMBOLS_MAX_RESULTS = 2000
+SYMBOL_MATCHES = ("exact", "prefix", "substring")
+IMPORTS_MAX_RESULTS = 5000
+IMPORTS_MAX_DEPTH = 50
+IMPORT_DIRECTIONS = ("dependents", "dependencies")
+PATCH_IMPACT_MAX_FILES = 500
+DEFAULT_SEARCH_WORKERS = os.cpu_count() or 1
+DEFAULT_READ_CACHE_MB = 64
+DEFAULT_IO_WORKERS = 8
+READ_MANY_MAX_FILES = 500
+PATCH_BATCH_MAX_DIFFS = 200
+DEFAULT_MAX_BODY_MB = 64
+READ_BODY_CHUNK_BYTES = 1024 * 1024
+READ_BODY_DRAIN_MAX_BYTES = 256 * 1024
+DEFAULT_SLOW_MS = 1000.0
+DEFAULT_SLOW_LOG_MAX_MB = 10
+SLOW_LOG_FILENAME = "slow-requests.jsonl"
+PLAN_MAX_FILE_BYTES = 600_000
+DEFAULT_COMPRESS_MIN_BYTES = 2048
+DEFAULT_KEEPALIVE_TIMEOUT = 15.0
+# bounds staleness for changes the cache key cannot see (edits outside the allowlist such as android/ios)
+DEFAULT_GIT_STATUS_MAX_AGE = 2.0
+
+# Endpoints that share a concurrency slot. Mutating endpoints touch the worktree
+# and must never run at the same time; everything not listed here is unlimited.
+ENDPOINT_GROUPS = {
+    "/plan/apply": "mutate",
+    "/patch/apply": "mutate",
+    "/patch/apply-batch": "mutate",
+    "/patch/revert": "mutate",
+    "/repo/search": "search",
+}
+GROUP_LIMITS_DEFAULT = {
+    "mutate": 1,
+    "search": 0,  # 0 = unlimited
+}
+
+# /metrics path label: anything else is reported as "other" (bounded cardinality)
+METRIC_PATHS = frozenset({
+    "/health", "/metrics", "/repo/tree", "/repo/read", "/repo/read-many", "/repo/search", "/repo/changes", "/repo/symbols", "/repo/imports",
+    "/git/status",
+    "/git/diff", "/plan/validate", "/plan/apply", "/patch/validate", "/patch/apply", "/patch/apply-batch",
+    "/patch/revert", "/patch/journal",
+})
+_M_REQUESTS = METRICS.counter("bridge_requests_total", "HTTP requests handled", ("method", "path", "status"))
+_M_LATENCY = METRICS.histogram("bridge_request_duration_seconds", "Request handling time (headers parsed to response written)", ("path",))
+_M_BYTES_IN = METRICS.counter("bridge_request_bytes_total", "Request body bytes (Content-Length)", ("path",))
+_M_BYTES_OUT = METRICS.counter("bridge_response_bytes_total", "Response bytes written (headers + body, after compression)", ("path",))
+_M_JSON_ENCODE = METRICS.histogram("bridge_json_encode_seconds", "json.dumps + utf-8 encode time for JSON responses")
+_M_COMPRESS = METRICS.histogram("bridge_compress_seconds", "Response compression time", ("encoding",))
+_M_GIT = METRICS.histogram("bridge_git_command_seconds", "git subprocess / cat-file --batch time", ("command",))
+_M_SEARCH_SCANNED = METRICS.histogram("bridge_search_files_scanned", "Files handed to the scanner per /repo/search", ("indexed",), buckets=COUNT_BUCKETS)
 
 # Conservative denylist
 DENY_PATTERNS = [
     ".env", ".env.*", "*.pem", "*.p12", "*.pfx", "*.key", "*id_rsa*", "*id_ed25519*",
     "secrets.*", "*secret*", "*token*", "*private*key*",
 ]
-DENY_DIRS = {
-    ".git", "node_modules", "dist", "dist-web", "build", ".expo", ".next", ".turbo",
-    "android", "ios",
-}
 
 # Allowlist for "normal project context"
 ALLOW_GLOBS_DEFAULT = [
@@ -91,50 +219,415 @@ class BridgeConfig:
     allow_globs: List[str]
 
 
+class EndpointLimiter:
+    """
+    Per-endpoint concurrency limits. Endpoints are mapped to a group (ENDPOINT_GROUPS);
+    each group with a positive limit gets a semaphore. Ungrouped endpoints are unlimited.
+    """
+
+    def __init__(self, limits: Dict[str, int]) -> None:
+        self._sems: Dict[str, threading.BoundedSemaphore] = {
+            group: threading.BoundedSemaphore(n) for group, n in limits.items() if n > 0
+        }
+
+    @contextmanager
+    def slot(self, path: str) -> Iterator[None]:
+        sem = self._sems.get(ENDPOINT_GROUPS.get(path, ""))
+        if sem is None:
+            yield
+            return
+        with sem:
+            yield
+
+
+class BridgeHTTPServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server. With workers > 0 requests run on a bounded thread pool,
+    so a slow search or git apply no longer blocks /health or /repo/read.
+    Between requests a connection holds no thread: it is parked (Parking) until its socket is readable,
+    and a request waiting on the change feed is suspended there until it can answer.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        addr: Tuple[str, int],
+        cfg: "BridgeConfig",
+        workers: int,
+        limits: Dict[str, int],
+        index_poll: float = DEFAULT_INDEX_POLL_SECONDS,
+        search_index: bool = True,
+        cache_dir: Optional[Path] = None,
+        search_workers: int = DEFAULT_SEARCH_WORKERS,
+        read_cache_mb: int = DEFAULT_READ_CACHE_MB,
+        compress_min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES,
+        git_status_max_age: float = DEFAULT_GIT_STATUS_MAX_AGE,
+        state_dir: Optional[Path] = None,
+        max_body_mb: int = DEFAULT_MAX_BODY_MB,
+        slow_log: Optional[SlowLog] = None,
+        watch: bool = True,
+        symbol_index: bool = True,
+    ) -> None:
+        super().__init__(addr, BridgeHandler)
+        self.cfg = cfg
+        self.limiter = EndpointLimiter(limits)
+        self.compress_min_bytes = compress_min_bytes
+        self.max_body_bytes = max_body_mb * 1024 * 1024
+        self.slow_log = slow_log
+        self.index_poll = index_poll
+        self.git: GitBackend = CachingGitBackend(cfg.repo_root, max_age=git_status_max_age)
+        self.git.on_command = self._on_git_command
+        set_backend(cfg.repo_root, self.git)
+        self.walker = _make_walker(cfg)
+        self.file_index = FileIndex(
+            cfg.repo_root,
+            is_allowed=lambda rel: _is_allowed_rel(cfg, rel),
+            walker=self.walker,
+        )
+        self.file_index.listeners.append(self.git.invalidate)
+        self.change_feed = ChangeFeed()
+        self.file_index.change_listeners.append(self.change_feed.record)
+        self.file_index.build()
+        self.watcher: Optional[InotifyWatcher] = None
+        if watch:
+            watcher = InotifyWatcher(self.file_index)
+            if watcher.start():
+                self.watcher = watcher
+        if self.watcher is not None and index_poll > 0:
+            self.watcher.fallback_poll = index_poll
+            self.file_index.start_polling(max(index_poll, WATCH_SAFETY_POLL_SECONDS))
+        else:
+            self.file_index.start_polling(index_poll)
+        self.search_pool = make_pool(search_workers)
+        self.journal = PatchJournal(cfg.repo_root, state_dir or cache_dir)
+        self.read_cache: Optional[ReadCache] = ReadCache(read_cache_mb * 1024 * 1024) if read_cache_mb > 0 else None
+        self.line_cache = LineIndexCache()
+        self.io_pool = ThreadPoolExecutor(max_workers=DEFAULT_IO_WORKERS, thread_name_prefix="bridge-io")
+        self.search_index: Optional[SearchIndex] = None
+        if search_index:
+            self.search_index = SearchIndex(self.file_index, cache_dir)
+            self.search_index.start()
+        self.symbol_index: Optional[SymbolIndex] = None
+        self.import_graph: Optional[ImportGraph] = None
+        if symbol_index:
+            self.symbol_index = SymbolIndex(self.file_index, cache_dir)
+            self.import_graph = ImportGraph(self.symbol_index, cfg.repo_root)
+            self.symbol_index.start()
+        self._pool: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bridge") if workers > 0 else None
+        )
+        self.parking = Parking(self._submit)
+        self.file_index.change_listeners.append(lambda _changes: self.parking.wake())
+        METRICS.add_collector(self.collect_metrics)
+
+    def _on_git_command(self, command: str, seconds: float) -> None:
+        _M_GIT.observe(seconds, (command,))
+        tracing.add_phase("git", seconds)
+
+    def collect_metrics(self) -> List[Tuple[str, str, str, float]]:
+        """
+        Scrape-time samples from the caches and indexes (they keep their own counters).
+        """
+        out: List[Tuple[str, str, str, float]] = []
+        if self.read_cache is not None:
+            rc = self.read_cache.stats()
+            out += [
+                ("bridge_read_cache_hits_total", "counter", "/repo/read cache hits", rc["hits"]),
+                ("bridge_read_cache_misses_total", "counter", "/repo/read cache misses", rc["misses"]),
+                ("bridge_read_cache_bytes", "gauge", "/repo/read cache size in bytes", rc["bytes"]),
+            ]
+        if isinstance(self.git, CachingGitBackend):
+            out += [
+                ("bridge_git_status_cache_hits_total", "counter", "git status served from cache", self.git.status_hits),
+                ("bridge_git_status_cache_misses_total", "counter", "git status computed", self.git.status_misses),
+            ]
+        out.append(("bridge_git_spawns_total", "counter", "git processes started", self.git.spawns))
+        fi = self.file_index.stats()
+        out += [
+            ("bridge_file_index_files", "gauge", "Files in the file index", fi["files"]),
+            ("bridge_file_index_allowed_files", "gauge", "Allowed files in the file index", fi["allowed"]),
+            ("bridge_file_watch_active", "gauge", "1 while the inotify watcher drives index refreshes", 1 if self.watcher is not None and self.watcher.active else 0),
+            ("bridge_change_feed_events_total", "counter", "Path change events recorded for /repo/changes", self.change_feed.stats()["seq"]),
+        ]
+        pk = self.parking.stats()
+        out += [
+            ("bridge_parked_idle_connections", "gauge", "Idle keep-alive connections parked off the worker pool", pk["idle"]),
+            ("bridge_parked_waiting_requests", "gauge", "/repo/changes long-polls / streams waiting off the worker pool", pk["waiting"]),
+        ]
+        if self.search_index is not None:
+            si = self.search_index.stats()
+            out += [
+                ("bridge_search_index_ready", "gauge", "1 once the trigram index is loaded", 1 if self.search_index.ready else 0),
+                ("bridge_search_index_files", "gauge", "Files in the trigram index", si["files"]),
+                ("bridge_search_index_unindexed_files", "gauge", "Files too large to index (always scanned)", si["unindexed"]),
+            ]
+        if self.symbol_index is not None:
+            sy = self.symbol_index.stats()
+            out += [
+                ("bridge_symbol_index_files", "gauge", "Sources in the symbol index", sy["files"]),
+                ("bridge_symbol_index_names", "gauge", "Distinct symbol names in the symbol index", sy["names"]),
+            ]
+        if self.import_graph is not None:
+            ig = self.import_graph.stats()
+            out += [
+                ("bridge_import_graph_edges", "gauge", "Resolved file-to-file imports in the import graph", ig["edges"]),
+                ("bridge_import_graph_unresolved_files", "gauge", "Sources with local imports that did not resolve", ig["unresolvedFiles"]),
+            ]
+        return out
+
+    def _submit(self, fn: Any, *args: Any) -> None:
+        if self._pool is None:
+            # thread per turn (ThreadingMixIn style)
+            threading.Thread(target=fn, args=args, daemon=True).start()
+            return
+        self._pool.submit(fn, *args)
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self._submit(self._serve_connection, request, client_address)
+
+    # ---------- connection turns: a worker runs a connection while it has work, then parks it ----------
+
+    def _serve_connection(self, request: Any, client_address: Any) -> None:
+        try:
+            handler = self.RequestHandlerClass(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+            self.shutdown_request(request)
+            return
+        self._after_turn(handler)  # type: ignore[arg-type]
+
+    def _after_turn(self, handler: "BridgeHandler") -> None:
+        if handler.suspension is not None:
+            self.parking.wait(
+                handler.suspension,
+                functools.partial(self._resume_suspended, handler),
+                functools.partial(self._close_connection, handler),
+            )
+        elif handler.parked:
+            self.parking.park(
+                handler.connection,
+                handler.timeout,
+                functools.partial(self._resume_idle, handler),
+                functools.partial(self._close_connection, handler),
+            )
+        else:
+            self.shutdown_request(handler.request)
+
+    def _resume_idle(self, handler: "BridgeHandler") -> None:
+        self._run_turn(handler, handler.handle)
+
+    def _resume_suspended(self, handler: "BridgeHandler", timed_out: bool) -> None:
+        self._run_turn(handler, lambda: handler.resume(timed_out))
+
+    def _run_turn(self, handler: "BridgeHandler", fn: Any) -> None:
+        try:
+            fn()
+        except Exception:
+            handler.parked, handler.suspension = False, None
+            self.handle_error(handler.request, handler.client_address)
+        handler.finish()
+        self._after_turn(handler)
+
+    def _close_connection(self, handler: "BridgeHandler") -> None:
+        handler.parked, handler.suspension = False, None
+        try:
+            handler.finish()
+        except OSError:
+            pass
+        self.shutdown_request(handler.request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        METRICS.remove_collector(self.collect_metrics)
+        self.parking.close()
+        if self.slow_log is not None:
+            self.slow_log.close()
+        self.file_index.stop()
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.search_index is not None and self.search_index.ready:
+            self.search_index.save()
+        if self.symbol_index is not None and self.symbol_index.ready:
+            self.symbol_index.save()
+        if self.search_pool is not None:
+            self.search_pool.shutdown(wait=False, cancel_futures=True)
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+        self.git.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
 def _json_response(handler: BaseHTTPRequestHandler, status: int, payload: Dict[str, Any]) -> None:
+    started = time.perf_counter()
     data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    encode_s = time.perf_counter() - started
+    _M_JSON_ENCODE.observe(encode_s)
+    tracing.add_phase("encode", encode_s)
+    _json_bytes_response(handler, status, data)
+
+
+def _accepted_encodings(accept: str) -> List[str]:
+    """
+    Codings from Accept-Encoding with q > 0 (order preserved).
+    """
+    out: List[str] = []
+    for item in accept.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            k, _, v = param.strip().partition("=")
+            if k == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            out.append(name.strip().lower())
+    return out
+
+
+def _compress(handler: BaseHTTPRequestHandler, data: bytes) -> Tuple[bytes, Optional[str]]:
+    min_bytes = getattr(handler.server, "compress_min_bytes", 0)
+    if min_bytes <= 0 or len(data) < min_bytes:
+        return data, None
+    accepted = _accepted_encodings(handler.headers.get("Accept-Encoding", ""))
+    started = time.perf_counter()
+    if zstandard is not None and "zstd" in accepted:
+        data, encoding = zstandard.ZstdCompressor(level=3).compress(data), "zstd"
+    elif "gzip" in accepted:
+        data, encoding = gzip.compress(data, compresslevel=5), "gzip"
+    else:
+        return data, None
+    _M_COMPRESS.observe(time.perf_counter() - started, (encoding,))
+    tracing.add_phase("compress", time.perf_counter() - started)
+    return data, encoding
+
+
+def _json_bytes_response(
+    handler: BaseHTTPRequestHandler, status: int, data: bytes, headers: Optional[Dict[str, str]] = None
+) -> None:
+    headers = dict(headers or {})
+    data, encoding = _compress(handler, data)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        if "ETag" in headers:
+            # same entity, different bytes: a weak validator still matches If-None-Match
+            headers["ETag"] = "W/" + headers["ETag"]
     handler.send_response(status)
     handler.send_header("Content-Type", "application/json; charset=utf-8")
     handler.send_header("Content-Length", str(len(data)))
+    handler.send_header("Vary", "Accept-Encoding")
+    if handler.close_connection:  # type: ignore[attr-defined]
+        handler.send_header("Connection", "close")
+    for k, v in headers.items():
+        handler.send_header(k, v)
     handler.end_headers()
-    handler.wfile.write(data)
+    with tracing.phase("write"):
+        handler.wfile.write(data)
+
 
+def _not_modified_response(handler: BaseHTTPRequestHandler, etag: str) -> None:
+    handler.send_response(304)
+    handler.send_header("ETag", etag)
+    handler.end_headers()
 
-def _read_json(handler: BaseHTTPRequestHandler) -> Dict[str, Any]:
-    length = int(handler.headers.get("Content-Length", "0"))
-    raw = handler.rfile.read(length) if length > 0 else b"{}"
+
+def _ndjson_line(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _read_json(handler: BaseHTTPRequestHandler, max_bytes: int) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Body read in chunks straight into one preallocated buffer, parsed from bytes (no decoded copy).
+    Bodies over max_bytes (0 = no limit) are refused from Content-Length, before reading
+    (the caller answers 413 and closes the connection).
+    Returns: body (invalid JSON -> {}), error
+    """
     try:
-        return json.loads(raw.decode("utf-8"))
+        length = int(handler.headers.get("Content-Length", "0"))
+    except ValueError:
+        return None, "invalid Content-Length"
+    if max_bytes > 0 and length > max_bytes:
+        _discard_received(handler, min(length, READ_BODY_DRAIN_MAX_BYTES))
+        return None, f"request body too large ({length} bytes, max {max_bytes})"
+    if length <= 0:
+        return {}, None
+    buf = bytearray(length)
+    view = memoryview(buf)
+    got = 0
+    while got < length:
+        n = handler.rfile.readinto(view[got:got + READ_BODY_CHUNK_BYTES])  # type: ignore[attr-defined]
+        if not n:
+            break
+        got += n
+    view.release()
+    if got < length:
+        return {}, None
+    try:
+        data = json.loads(buf)
     except Exception:
-        return {}
+        return {}, None
+    return (data if isinstance(data, dict) else {}), None
+
+
+def _discard_received(handler: BaseHTTPRequestHandler, limit: int) -> None:
+    """
+    Drop up to limit body bytes that have already arrived, without waiting for more: closing with
+    unread data resets the connection and the client may lose the 413, but a client that declares a
+    huge body and sends it slowly (or never) must not hold a worker.
+    """
+    conn = handler.connection  # type: ignore[attr-defined]
+    try:
+        conn.setblocking(False)
+        try:
+            while limit > 0:
+                chunk = handler.rfile.read1(min(limit, READ_BODY_CHUNK_BYTES))  # type: ignore[attr-defined]
+                if not chunk:
+                    break
+                limit -= len(chunk)
+        finally:
+            conn.settimeout(handler.timeout)
+    except OSError:
+        pass
+
+
+_DENY_MATCHER = DenyMatcher(DENY_DIRS, DENY_PATTERNS)
+
+
+@functools.lru_cache(maxsize=16)
+def _allow_matcher(allow_globs: Tuple[str, ...]) -> AllowMatcher:
+    return AllowMatcher(allow_globs)
 
 
 def _is_denied_path(rel_posix: str) -> bool:
-    rel = rel_posix.replace("\\", "/").lower()
-    parts = rel.split("/")
-    if any(p in DENY_DIRS for p in parts):
-        return True
-    name = parts[-1]
-    for pat in DENY_PATTERNS:
-        if fnmatch.fnmatch(name, pat.lower()) or fnmatch.fnmatch(rel, pat.lower()):
-            return True
-    return False
+    return _DENY_MATCHER.is_denied(rel_posix)
 
 
 def _matches_allowlist(rel_posix: str, allow_globs: List[str]) -> bool:
-    rel = rel_posix.replace("\\", "/")
-    for g in allow_globs:
-        gposix = g.replace("\\", "/")
-        if fnmatch.fnmatch(rel, gposix):
-            return True
-        if gposix.endswith("/**"):
-            base = gposix[:-3]
-            if rel.startswith(base.rstrip("/") + "/"):
-                return True
-    return False
+    return _allow_matcher(tuple(allow_globs)).matches(rel_posix)
+
+
+def _is_allowed_rel(cfg: BridgeConfig, rel_posix: str) -> bool:
+    return not _is_denied_path(rel_posix) and _matches_allowlist(rel_posix, cfg.allow_globs)
+
+
+def _default_cache_dir(repo_root: Path) -> Optional[Path]:
+    # inside .git: never shows up in git status, never allowlisted
+    git_dir = repo_root / ".git"
+    return git_dir / "plugaishop-bridge" if git_dir.is_dir() else None
+
+
+def _make_walker(cfg: BridgeConfig) -> RepoWalker:
+    return RepoWalker(cfg.repo_root, deny_dirs=DENY_DIRS, allow_globs=cfg.allow_globs)
 
 
 def _resolve_repo_path(cfg: BridgeConfig, rel_path: str) -> Tuple[Optional[Path], Optional[str]]:
+    with tracing.phase("policy"):
+        return _resolve_repo_path_untraced(cfg, rel_path)
+
+
+def _resolve_repo_path_untraced(cfg: BridgeConfig, rel_path: str) -> Tuple[Optional[Path], Optional[str]]:
     rel = rel_path.strip().lstrip("/").replace("\\", "/")
     if rel == "":
         return None, "Empty path"
@@ -152,31 +645,120 @@ def _resolve_repo_path(cfg: BridgeConfig, rel_path: str) -> Tuple[Optional[Path]
     return abs_path, None
 
 
+ReadRange = Tuple[str, int, Optional[int]]  # ("bytes", offset, length) | ("lines", startLine, endLine)
+
+
+def _parse_read_range(body: Dict[str, Any]) -> Tuple[Optional[ReadRange], str]:
+    has_lines = "startLine" in body or "endLine" in body
+    has_bytes = "offset" in body or "length" in body
+    if has_lines and has_bytes:
+        return None, "use either offset/length or startLine/endLine"
+    try:
+        if has_lines:
+            start = int(body["startLine"]) if body.get("startLine") is not None else 1
+            end = int(body["endLine"]) if body.get("endLine") is not None else None
+            if start < 1 or (end is not None and end < start):
+                return None, "invalid line range"
+            return ("lines", start, end), ""
+        if has_bytes:
+            offset = int(body.get("offset") or 0)
+            length = int(body["length"]) if body.get("length") is not None else None
+            if offset < 0 or (length is not None and length < 0):
+                return None, "invalid byte range"
+            return ("bytes", offset, length), ""
+    except (TypeError, ValueError):
+        return None, "range values must be integers"
+    return None, ""
+
+
+def _parse_max_bytes(body: Dict[str, Any], default: int = 200_000) -> Tuple[Optional[int], str]:
+    raw = body.get("maxBytes", default)
+    if isinstance(raw, bool) or not isinstance(raw, int) or raw < 0:
+        return None, "maxBytes must be a non-negative integer"
+    return raw, ""
+
+
+def _read_repo_file(
+    server: "BridgeHTTPServer", rel: str, max_bytes: int, rng: Optional[ReadRange] = None
+) -> Tuple[int, Optional[CachedBody], str]:
+    """
+    /repo/read body for one path (policy-checked, cached). Returns (status, body, error).
+    Ranged reads seek to the slice; only min(slice, maxBytes) bytes are read.
+    """
+    cfg = server.cfg
+    read_cache = server.read_cache
+    abs_path, err = _resolve_repo_path(cfg, rel)
+    if err or abs_path is None:
+        return 403, None, err or "denied"
+    try:
+        st = os.stat(abs_path)
+    except OSError:
+        st = None
+    if st is None or not abs_path.is_file():
+        return 404, None, "file not found"
+
+    cached = read_cache.get((rel, st.st_mtime_ns, st.st_size, max_bytes, rng)) if read_cache is not None else None
+    if cached is not None:
+        return 200, cached, ""
+    extra: Dict[str, Any] = {}
+    with open(abs_path, "rb") as f:
+        fst = os.fstat(f.fileno())
+        if rng is None:
+            start, end = 0, fst.st_size
+        elif rng[0] == "bytes":
+            start = min(rng[1], fst.st_size)
+            end = fst.st_size if rng[2] is None else min(start + rng[2], fst.st_size)
+        else:
+            line_index = server.line_cache.get((rel, fst.st_mtime_ns, fst.st_size), fst.st_size)
+            start, end = line_index.byte_span(f, rng[1], rng[2])
+            extra = {"startLine": rng[1], "endLine": rng[2], "totalLines": line_index.total_lines}
+        f.seek(start)
+        data = f.read(min(end - start, max_bytes))
+    truncated = end - start > max_bytes
+    text = data.decode("utf-8", errors="replace")
+    payload: Dict[str, Any] = {"ok": True, "path": rel, "content": text, "truncated": truncated}
+    if rng is not None:
+        payload.update({"offset": start, "length": len(data), "size": fst.st_size, **extra})
+    cached = CachedBody(
+        etag=content_etag(data, "truncated" if truncated else "", repr(rng) if rng else ""),
+        body=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+    )
+    if read_cache is not None:
+        read_cache.put((rel, fst.st_mtime_ns, fst.st_size, max_bytes, rng), cached)
+    return 200, cached, ""
+
+
 def _run_git(cfg: BridgeConfig, args: List[str]) -> Tuple[int, str, str]:
     if not cfg.allow_git:
         return 403, "", "git disabled"
     if shutil.which("git") is None:
         return 500, "", "git not found"
-    p = subprocess.run(
-        ["git", *args],
-        cwd=str(cfg.repo_root),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-    )
-    return p.returncode, p.stdout, p.stderr
+    backend = get_backend(cfg.repo_root)
+    if args == ["status", "--porcelain=v1", "-b"]:
+        return backend.status_porcelain(branch=True)
+    return backend.run(args)
 
 
 def _safe_text_preview(s: str, max_chars: int = 200_000) -> str:
     return s if len(s) <= max_chars else s[:max_chars] + "\n\n[TRUNCATED]\n"
 
 
-def validate_plan(cfg: BridgeConfig, plan: Dict[str, Any]) -> Tuple[bool, List[str]]:
+@dataclass
+class PlanAction:
+    type: str
+    rel: str
+    abs_path: Path
+    data: Optional[bytes] = None  # write_file: content encoded once, shared by validate and apply
+
+
+def prepare_plan(cfg: BridgeConfig, plan: Dict[str, Any]) -> Tuple[List[PlanAction], List[str]]:
+    """
+    Validate every action and resolve it once. Returns: actions, errors
+    """
     errors: List[str] = []
+    actions: List[PlanAction] = []
     if "actions" not in plan or not isinstance(plan["actions"], list):
-        return False, ["plan.actions must be a list"]
+        return [], ["plan.actions must be a list"]
 
     for i, act in enumerate(plan["actions"]):
         if not isinstance(act, dict):
@@ -191,49 +773,106 @@ def validate_plan(cfg: BridgeConfig, plan: Dict[str, Any]) -> Tuple[bool, List[s
             errors.append(f"actions[{i}].path must be non-empty string")
             continue
         abs_path, err = _resolve_repo_path(cfg, rel)
-        if err:
+        if err or abs_path is None:
             errors.append(f"actions[{i}].path denied: {rel} ({err})")
             continue
+        data: Optional[bytes] = None
         if t == "write_file":
             content = act.get("content", "")
             if not isinstance(content, str):
                 errors.append(f"actions[{i}].content must be string")
-            if len(content.encode("utf-8")) > 600_000:
+                continue
+            data = content.encode("utf-8")
+            if len(data) > PLAN_MAX_FILE_BYTES:
                 errors.append(f"actions[{i}] content too large (>600KB)")
+                continue
+        actions.append(PlanAction(type=t, rel=rel.strip().lstrip("/").replace("\\", "/"), abs_path=abs_path, data=data))
+    return actions, errors
+
+
+def validate_plan(cfg: BridgeConfig, plan: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    _, errors = prepare_plan(cfg, plan)
     return len(errors) == 0, errors
 
 
-def apply_plan(cfg: BridgeConfig, plan: Dict[str, Any], dry_run: bool) -> Dict[str, Any]:
-    ok, errors = validate_plan(cfg, plan)
-    if not ok:
+def apply_plan(cfg: BridgeConfig, plan: Dict[str, Any], dry_run: bool, pool: Optional[Executor] = None) -> Dict[str, Any]:
+    """
+    Directories first (deduped, one mkdir per leaf), then file writes: each file is written to a
+    temp file and renamed into place, different paths in parallel on `pool`, repeated writes to
+    one path in plan order. Every result carries its wall time in ms.
+    """
+    actions, errors = prepare_plan(cfg, plan)
+    if errors:
         return {"ok": False, "errors": errors}
 
+    t_start = time.perf_counter()
     results: List[Dict[str, Any]] = []
-    for act in plan["actions"]:
-        t = act["type"]
-        rel = act["path"].strip().lstrip("/").replace("\\", "/")
-        abs_path, err = _resolve_repo_path(cfg, rel)
-        if err or abs_path is None:
-            results.append({"type": t, "path": rel, "ok": False, "error": err or "invalid"})
+    dirs: Dict[Path, List[int]] = {}  # dir -> indexes of mkdir results waiting on it
+    writes: Dict[Path, List[int]] = {}  # file -> indexes of write results, in plan order
+    payloads: Dict[int, bytes] = {}
+    for act in actions:
+        extra = {"dry_run": True} if dry_run else {}
+        if act.type == "mkdir":
+            results.append({"type": act.type, "path": act.rel, "ok": True, **extra})
+            dirs.setdefault(act.abs_path, []).append(len(results) - 1)
+        else:
+            data = act.data or b""
+            results.append({"type": act.type, "path": act.rel, "ok": True, "bytes": len(data), **extra})
+            # same bytes Path.write_text produced (newline translation included)
+            payloads[len(results) - 1] = data if os.linesep == "\n" else data.replace(b"\n", os.linesep.encode("ascii"))
+            writes.setdefault(act.abs_path, []).append(len(results) - 1)
+            dirs.setdefault(act.abs_path.parent, [])
+
+    if dry_run:
+        return {"ok": True, "dry_run": True, "results": results}
+
+    # a leaf mkdir (parents=True) covers all of its ancestors
+    t0 = time.perf_counter()
+    ordered = sorted(dirs, key=lambda d: len(d.parts), reverse=True)
+    made: Set[Path] = set()
+    for d in ordered:
+        if d in made:
             continue
-
-        if t == "mkdir":
-            if dry_run:
-                results.append({"type": t, "path": rel, "ok": True, "dry_run": True})
-            else:
-                abs_path.mkdir(parents=True, exist_ok=True)
-                results.append({"type": t, "path": rel, "ok": True})
-        elif t == "write_file":
-            parent = abs_path.parent
-            content = act.get("content", "")
-            if dry_run:
-                results.append({"type": t, "path": rel, "ok": True, "bytes": len(content.encode("utf-8")), "dry_run": True})
-            else:
-                parent.mkdir(parents=True, exist_ok=True)
-                abs_path.write_text(content, encoding="utf-8")
-                results.append({"type": t, "path": rel, "ok": True, "bytes": len(content.encode("utf-8"))})
-
-    return {"ok": True, "dry_run": dry_run, "results": results}
+        t_dir = time.perf_counter()
+        try:
+            d.mkdir(parents=True, exist_ok=True)
+            err = None
+        except OSError as e:
+            err = str(e)
+        ms = round((time.perf_counter() - t_dir) * 1000, 3)
+        made.update(d.parents)
+        made.add(d)
+        for i in dirs[d]:
+            results[i].update({"ok": err is None, "ms": ms, **({"error": err} if err else {})})
+    for d in ordered:
+        for i in dirs[d]:
+            results[i].setdefault("ms", 0.0)
+    mkdir_ms = round((time.perf_counter() - t0) * 1000, 3)
+
+    def _write_path(target: Path, idxs: List[int]) -> None:
+        for i in idxs:
+            t_w = time.perf_counter()
+            try:
+                write_file_atomic(target, payloads[i])
+            except OSError as e:
+                results[i].update({"ok": False, "error": str(e)})
+            results[i]["ms"] = round((time.perf_counter() - t_w) * 1000, 3)
+
+    t1 = time.perf_counter()
+    if pool is None or len(writes) <= 1:
+        for target, idxs in writes.items():
+            _write_path(target, idxs)
+    else:
+        for f in [pool.submit(_write_path, target, idxs) for target, idxs in writes.items()]:
+            f.result()
+    write_ms = round((time.perf_counter() - t1) * 1000, 3)
+
+    return {
+        "ok": all(r.get("ok") for r in results),
+        "dry_run": False,
+        "results": results,
+        "timing": {"mkdirMs": mkdir_ms, "writeMs": write_ms, "totalMs": round((time.perf_counter() - t_start) * 1000, 3)},
+    }
 
 
 def validate_patch(cfg: BridgeConfig, patch_text: str) -> Tuple[bool, List[str], List[str]]:
@@ -242,6 +881,11 @@ def validate_patch(cfg: BridgeConfig, patch_text: str) -> Tuple[bool, List[str],
     """
     errors: List[str] = []
     touched = extract_touched_paths(patch_text)
+    # git-style rename/copy headers name paths that have no ---/+++ line
+    for fp in parse_patch(patch_text).files:
+        for p in (fp.old_path, fp.new_path):
+            if p and p not in touched:
+                touched.append(p)
 
     if not touched:
         errors.append("patch touches no files (could not parse diff headers)")
@@ -259,30 +903,229 @@ def validate_patch(cfg: BridgeConfig, patch_text: str) -> Tuple[bool, List[str],
     return len(errors) == 0, errors, touched
 
 
+class _CountingWriter:
+    """
+    wfile wrapper counting bytes written (response size metrics).
+    """
+
+    def __init__(self, raw: Any) -> None:
+        self._raw = raw
+        self.written = 0
+
+    def write(self, data: bytes) -> int:
+        self.written += len(data)
+        return self._raw.write(data)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._raw, name)
+
+
 class BridgeHandler(BaseHTTPRequestHandler):
     server_version = "PlugaishopBridge/1.1"
+    # keep-alive; every response carries Content-Length (or is chunked), idle sockets time out
+    protocol_version = "HTTP/1.1"
+    timeout = DEFAULT_KEEPALIVE_TIMEOUT
+    # headers and body go out as separate writes: with Nagle on, a keep-alive client's delayed ACK
+    # holds the body back ~40 ms
+    disable_nagle_algorithm = True
+    # end of a turn: parked = idle keep-alive connection, suspension = request waiting to answer
+    parked = False
+    suspension: Optional[Suspension] = None
+
+    # ---------- connection turns (see BridgeHTTPServer._after_turn) ----------
+
+    def handle(self) -> None:
+        """
+        Serve requests while the client has sent some; then leave the connection parked
+        instead of blocking this thread on the next read.
+        """
+        self.parked = False
+        self.close_connection = True
+        self.handle_one_request()
+        self._serve_buffered()
+
+    def _serve_buffered(self) -> None:
+        while not self.close_connection and self.suspension is None:
+            if not self._input_pending():
+                self.parked = True
+                return
+            self.handle_one_request()
+
+    def _input_pending(self) -> bool:
+        """
+        Bytes of a next request already buffered or on the socket (pipelining, or a fast client).
+        """
+        try:
+            self.connection.setblocking(False)
+            try:
+                return bool(self.rfile.peek(1))
+            finally:
+                self.connection.settimeout(self.timeout)
+        except OSError:
+            return True  # let handle_one_request see the error
+
+    def finish(self) -> None:
+        if self.parked or self.suspension is not None:
+            try:
+                self.wfile.flush()
+            except OSError:
+                self.parked, self.suspension = False, None
+                super().finish()
+            return
+        super().finish()
+
+    def _suspend(self, deadline: float, ready: Any, resume: Any) -> None:
+        """
+        Answer later: resume(timed_out) runs on a worker once ready() or at deadline (monotonic),
+        with the request still open (trace, metrics). It may suspend again.
+        """
+        self.suspension = Suspension(deadline, ready, resume)
+
+    def resume(self, timed_out: bool) -> None:
+        suspension = self.suspension
+        assert suspension is not None
+        self.suspension = None
+        tracing.set_current(self.trace)
+        try:
+            suspension.resume(timed_out)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        finally:
+            tracing.set_current(None)
+        if self.suspension is not None:
+            return
+        self._end_observed()
+        self.wfile.flush()
+        self._serve_buffered()
+
+    def handle_expect_100(self) -> bool:
+        # "Expect: 100-continue" clients (curl, large bodies) are refused before they upload
+        max_bytes: int = self.server.max_body_bytes  # type: ignore[attr-defined]
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = 0
+        if max_bytes > 0 and length > max_bytes:
+            self.close_connection = True
+            _json_response(self, 413, {"ok": False, "error": f"request body too large ({length} bytes, max {max_bytes})"})
+            return False
+        return super().handle_expect_100()
+
+    def setup(self) -> None:
+        super().setup()
+        self.wfile = _CountingWriter(self.wfile)  # type: ignore[assignment]
+
+    def send_response(self, code: int, message: Optional[str] = None) -> None:
+        self._status = code
+        super().send_response(code, message)
+
+    @contextmanager
+    def _observed(self, method: str) -> Iterator[None]:
+        """
+        Request lifecycle: trace (id + phases, slow log) and metrics; a suspended request
+        is accounted for when its last continuation returns.
+        """
+        self.trace = RequestTrace(method, self.path, self.headers.get("X-Trace-Id", ""))
+        tracing.set_current(self.trace)
+        self._status = 0
+        self._method = method
+        writer: _CountingWriter = self.wfile  # type: ignore[assignment]
+        self._sent_before = writer.written
+        try:
+            yield
+        finally:
+            tracing.set_current(None)
+            if self.suspension is None:
+                self._end_observed()
+
+    def _end_observed(self) -> None:
+        total = self.trace.elapsed()
+        writer: _CountingWriter = self.wfile  # type: ignore[assignment]
+        sent = writer.written - self._sent_before
+        try:
+            received = max(0, int(self.headers.get("Content-Length", "0")))
+        except ValueError:
+            received = 0
+        path = self.path if self.path in METRIC_PATHS else "other"
+        _M_REQUESTS.inc((self._method, path, str(self._status)))
+        _M_LATENCY.observe(total, (path,))
+        _M_BYTES_OUT.inc((path,), sent)
+        _M_BYTES_IN.inc((path,), received)
+        slow_log: Optional[SlowLog] = self.server.slow_log  # type: ignore[attr-defined]
+        if slow_log is not None:
+            try:
+                slow_log.maybe_write(self.trace, self._status, total, {"bytesIn": received, "bytesOut": sent, "client": self.client_address[0]})
+            except Exception as e:
+                print(f"[bridge] slow log write failed: {e}")
+
+    def end_headers(self) -> None:
+        trace: Optional[RequestTrace] = getattr(self, "trace", None)
+        if trace is not None:
+            self.send_header("X-Trace-Id", trace.trace_id)
+        super().end_headers()
 
     def do_GET(self) -> None:
+        with self._observed("GET"):
+            self._handle_get()
+
+    def _handle_get(self) -> None:
         if self.path == "/health":
             _json_response(self, 200, {"ok": True})
             return
+        if self.path == "/metrics":
+            # Prometheus sends "Authorization: Bearer <token>"; X-Bridge-Token works too
+            cfg: BridgeConfig = self.server.cfg  # type: ignore[attr-defined]
+            auth = self.headers.get("Authorization", "")
+            token = auth[7:] if auth.startswith("Bearer ") else self.headers.get("X-Bridge-Token", "")
+            if token != cfg.token:
+                _json_response(self, 401, {"ok": False, "error": "unauthorized"})
+                return
+            data = METRICS.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
         _json_response(self, 404, {"ok": False, "error": "not found"})
 
     def do_POST(self) -> None:
+        with self._observed("POST"):
+            self._do_post()
+
+    def _do_post(self) -> None:
         cfg: BridgeConfig = self.server.cfg  # type: ignore[attr-defined]
 
         # Auth
-        token = self.headers.get("X-Bridge-Token", "")
-        if token != cfg.token:
+        with self.trace.phase("auth"):
+            authorized = self.headers.get("X-Bridge-Token", "") == cfg.token
+        if not authorized:
+            # body was not read: the connection cannot be reused
+            self.close_connection = True
             _json_response(self, 401, {"ok": False, "error": "unauthorized"})
             return
 
-        body = _read_json(self)
+        with self.trace.phase("body"):
+            body, body_err = _read_json(self, self.server.max_body_bytes)  # type: ignore[attr-defined]
+        if body is None:
+            # body possibly left (partly) unread: the connection cannot be reused
+            self.close_connection = True
+            _json_response(self, 413 if "too large" in (body_err or "") else 400, {"ok": False, "error": body_err})
+            return
+        self.trace.attrs["params"] = summarize_params(body)
+
+        limiter: EndpointLimiter = self.server.limiter  # type: ignore[attr-defined]
+        queued = time.perf_counter()
+        with limiter.slot(self.path):
+            self.trace.add("queue", time.perf_counter() - queued)
+            with self.trace.phase("handler"):
+                self._handle_post(cfg, body)
+
+    def _handle_post(self, cfg: BridgeConfig, body: Dict[str, Any]) -> None:
 
         if self.path == "/repo/tree":
             rel = str(body.get("path", "") or ".").strip()
             max_entries = int(body.get("maxEntries", 2000))
-            out: List[str] = []
             root = cfg.repo_root
 
             base = root if rel in (".", "") else _resolve_repo_path(cfg, rel)[0]
@@ -290,39 +1133,34 @@ class BridgeHandler(BaseHTTPRequestHandler):
                 _json_response(self, 400, {"ok": False, "error": "invalid base path"})
                 return
 
-            for p in base.rglob("*"):
-                if len(out) >= max_entries:
-                    break
-                if p.is_dir():
-                    continue
-                relp = p.relative_to(root).as_posix()
-                if _is_denied_path(relp):
-                    continue
-                if not _matches_allowlist(relp, cfg.allow_globs):
-                    continue
-                out.append(relp)
+            index: FileIndex = self.server.file_index  # type: ignore[attr-defined]
+            if self.server.index_poll <= 0:  # type: ignore[attr-defined]
+                index.refresh()
+            prefix = "" if base == root else base.relative_to(root).as_posix()
+            out, truncated = index.list_allowed(prefix, max_entries)
 
-            _json_response(self, 200, {"ok": True, "entries": out, "truncated": len(out) >= max_entries})
+            _json_response(self, 200, {"ok": True, "entries": out, "truncated": truncated})
             return
 
         if self.path == "/repo/read":
             rel = str(body.get("path", "")).strip()
-            abs_path, err = _resolve_repo_path(cfg, rel)
-            if err or abs_path is None:
-                _json_response(self, 403, {"ok": False, "error": err or "denied"})
+            max_bytes, max_err = _parse_max_bytes(body)
+            rng, rng_err = _parse_read_range(body)
+            if max_bytes is None or rng_err:
+                _json_response(self, 400, {"ok": False, "error": max_err or rng_err})
                 return
-            if not abs_path.exists() or not abs_path.is_file():
-                _json_response(self, 404, {"ok": False, "error": "file not found"})
+            status, cached, err = _read_repo_file(self.server, rel, max_bytes, rng)  # type: ignore[arg-type]
+            if cached is None:
+                _json_response(self, status, {"ok": False, "error": err})
                 return
-            max_bytes = int(body.get("maxBytes", 200_000))
-            data = abs_path.read_bytes()
-            if len(data) > max_bytes:
-                data = data[:max_bytes]
-                truncated = True
-            else:
-                truncated = False
-            text = data.decode("utf-8", errors="replace")
-            _json_response(self, 200, {"ok": True, "path": rel, "content": text, "truncated": truncated})
+            if etag_matches(self.headers.get("If-None-Match", ""), cached.etag):
+                _not_modified_response(self, cached.etag)
+                return
+            _json_bytes_response(self, 200, cached.body, {"ETag": cached.etag})
+            return
+
+        if self.path == "/repo/read-many":
+            self._read_many(cfg, body)
             return
 
         if self.path == "/repo/search":
@@ -331,30 +1169,114 @@ class BridgeHandler(BaseHTTPRequestHandler):
                 _json_response(self, 400, {"ok": False, "error": "query required"})
                 return
             max_hits = int(body.get("maxHits", 50))
-            pattern = re.compile(re.escape(query), re.IGNORECASE)
-
-            hits: List[Dict[str, Any]] = []
-            for p in cfg.repo_root.rglob("*"):
-                if p.is_dir():
-                    continue
-                relp = p.relative_to(cfg.repo_root).as_posix()
-                if _is_denied_path(relp) or not _matches_allowlist(relp, cfg.allow_globs):
-                    continue
-                try:
-                    txt = p.read_text(encoding="utf-8", errors="replace")
-                except Exception:
-                    continue
-                for m in pattern.finditer(txt):
-                    if len(hits) >= max_hits:
-                        break
-                    start = max(m.start() - 60, 0)
-                    end = min(m.end() + 60, len(txt))
-                    snippet = txt[start:end].replace("\n", "\\n")
-                    hits.append({"path": relp, "index": m.start(), "snippet": snippet})
-                if len(hits) >= max_hits:
-                    break
+            regex = bool(body.get("regex", False))
+            case_sensitive = bool(body.get("caseSensitive", False))
+            globs = body.get("glob") or []
+            if isinstance(globs, str):
+                globs = [globs]
+            try:
+                pattern = re.compile(query if regex else re.escape(query), 0 if case_sensitive else re.IGNORECASE)
+            except re.error as e:
+                _json_response(self, 400, {"ok": False, "error": f"invalid regex: {e}"})
+                return
 
-            _json_response(self, 200, {"ok": True, "hits": hits, "truncated": len(hits) >= max_hits})
+            self._refresh_index_on_demand()
+            search_index: Optional[SearchIndex] = self.server.search_index  # type: ignore[attr-defined]
+            with self.trace.phase("index"):
+                candidates = search_index.candidates(query, regex) if search_index is not None else None
+            if candidates is None:
+                walker: RepoWalker = self.server.walker  # type: ignore[attr-defined]
+                paths = (relp for relp, _ in walker.walk() if _is_allowed_rel(cfg, relp))
+            else:
+                paths = iter(candidates)
+
+            if globs:
+                paths = (relp for relp in paths if any(fnmatch.fnmatch(relp, str(g)) for g in globs))
+
+            scanned = [0]
+
+            def _counted(it: Iterator[str]) -> Iterator[str]:
+                for relp in it:
+                    scanned[0] += 1
+                    yield relp
+
+            indexed_label = "true" if candidates is not None else "false"
+            self.trace.attrs["search"] = {"indexed": candidates is not None, "candidates": None if candidates is None else len(candidates)}
+            if body.get("stream", False):
+                # time-to-first-hit: scan sequentially so each hit goes out as soon as it is found
+                with self.trace.phase("scan"):
+                    self._stream_search(scan_paths(cfg.repo_root, _counted(paths), pattern, max_hits), max_hits, candidates is not None)
+                _M_SEARCH_SCANNED.observe(scanned[0], (indexed_label,))
+                self.trace.attrs["search"]["scanned"] = scanned[0]
+                return
+            pool = self.server.search_pool  # type: ignore[attr-defined]
+            if candidates is not None and len(candidates) <= CHUNK_FILES:
+                pool = None  # a handful of index candidates: IPC would cost more than the scan
+            with self.trace.phase("scan"):
+                hits = list(scan_paths(cfg.repo_root, _counted(paths), pattern, max_hits, pool=pool))
+            _M_SEARCH_SCANNED.observe(scanned[0], (indexed_label,))
+            self.trace.attrs["search"].update({"scanned": scanned[0], "hits": len(hits), "parallel": pool is not None})
+
+            _json_response(self, 200, {"ok": True, "hits": hits, "truncated": len(hits) >= max_hits, "indexed": candidates is not None})
+            return
+
+        if self.path == "/repo/changes":
+            feed: ChangeFeed = self.server.change_feed  # type: ignore[attr-defined]
+            cursor = str(body.get("cursor", "") or "")
+            limit = max(1, min(int(body.get("limit", 1000)), CHANGES_MAX_LIMIT))
+            if body.get("stream", False):
+                max_s = float(body.get("maxSeconds", CHANGES_STREAM_MAX_SECONDS))
+                self._stream_changes(feed, cursor, limit, min(max(max_s, 1.0), CHANGES_STREAM_MAX_SECONDS))
+                return
+            if not cursor:
+                # starting point: the caller lists the tree once, then follows the feed from here
+                self._refresh_index_on_demand()
+                _json_response(self, 200, {"ok": True, "cursor": feed.cursor(), "changes": [], "reset": False, "truncated": False})
+                return
+            wait = min(max(float(body.get("wait", 0) or 0), 0.0), CHANGES_MAX_WAIT_SECONDS)
+            page = self._changes_page(feed, cursor, limit)
+            if wait > 0 and not page.changes and not page.reset and feed.acquire_waiter():
+                self._long_poll(feed, page.cursor, limit, time.monotonic() + wait)
+                return
+            _json_response(self, 200, {"ok": True, **asdict(page), "waited": False})
+            return
+
+        if self.path == "/repo/symbols":
+            symbols: Optional[SymbolIndex] = self.server.symbol_index  # type: ignore[attr-defined]
+            if symbols is None:
+                _json_response(self, 503, {"ok": False, "error": "symbol index disabled"})
+                return
+            self._refresh_index_on_demand()
+            rel = str(body.get("path", "") or "").strip()
+            if rel:
+                # outline of one file
+                abs_path, err = _resolve_repo_path(cfg, rel)
+                if abs_path is None:
+                    _json_response(self, 400, {"ok": False, "error": err})
+                    return
+                rel = abs_path.relative_to(cfg.repo_root.resolve()).as_posix()
+                with self.trace.phase("index"):
+                    outline = symbols.outline(rel)
+                if outline is None:
+                    _json_response(self, 404, {"ok": False, "error": "not an indexed source file", "path": rel})
+                    return
+                _json_response(self, 200, {"ok": True, "path": rel, **outline.to_json()})
+                return
+            name = str(body.get("name", "") or "").strip()
+            match = str(body.get("match", "exact"))
+            if not name or match not in SYMBOL_MATCHES:
+                _json_response(self, 400, {"ok": False, "error": f"name required; match must be one of {list(SYMBOL_MATCHES)}"})
+                return
+            kinds = body.get("kind") or []
+            kinds = {kinds} if isinstance(kinds, str) else {str(k) for k in kinds}
+            limit = max(1, min(int(body.get("maxResults", 200)), SYMBOLS_MAX_RESULTS))
+            with self.trace.phase("index"):
+                found, truncated = symbols.find(name, match, kinds or None, bool(body.get("exported", False)), limit)
+            _json_response(self, 200, {"ok": True, "symbols": found, "truncated": truncated, "ready": symbols.ready})
+            return
+
+        if self.path == "/repo/imports":
+            self._imports(cfg, body)
             return
 
         if self.path == "/git/status":
@@ -393,7 +1315,9 @@ class BridgeHandler(BaseHTTPRequestHandler):
                 _json_response(self, 403, {"ok": False, "error": "apply disabled"})
                 return
             dry_run = bool(body.get("dryRun", True))
-            res = apply_plan(cfg, body, dry_run=dry_run)
+            res = apply_plan(cfg, body, dry_run=dry_run, pool=self.server.io_pool)  # type: ignore[attr-defined]
+            if not dry_run and any(r.get("ok") for r in res.get("results", [])):
+                self._index_after_write([r["path"] for r in res["results"] if r.get("ok")])
             _json_response(self, 200 if res.get("ok") else 400, res)
             return
 
@@ -404,7 +1328,27 @@ class BridgeHandler(BaseHTTPRequestHandler):
                 _json_response(self, 400, {"ok": False, "error": "patch required"})
                 return
             ok, errors, touched = validate_patch(cfg, patch_text)
-            _json_response(self, 200, {"ok": ok, "errors": errors, "touched": touched})
+            out: Dict[str, Any] = {"ok": ok, "errors": errors, "touched": touched}
+            graph = self.server.import_graph  # type: ignore[attr-defined]
+            if ok and graph is not None and body.get("impact", True):
+                # blast radius: what imports the touched files, directly or through other files
+                with self.trace.phase("index"):
+                    out["impact"] = graph.impact(touched, IMPORTS_MAX_DEPTH, PATCH_IMPACT_MAX_FILES)
+            if ok and (body.get("check") or body.get("preview")):
+                # in-process: no git spawn, per-hunk conflict lines
+                parsed, results, contents = preview_patch(cfg.repo_root, patch_text, int(body.get("maxFuzz", DEFAULT_MAX_FUZZ)))
+                out["ok"] = not parsed.errors and all(r.ok for r in results)
+                out["errors"] = parsed.errors
+                out["diff"] = [fp.summary() for fp in parsed.files]
+                out["files"] = [asdict(r) for r in results]
+                if body.get("preview"):
+                    out["preview"] = {
+                        rel: None if text is None else _safe_text_preview(
+                            text.encode("utf-8", errors="surrogateescape").decode("utf-8", errors="replace")
+                        )
+                        for rel, text in contents.items()
+                    }
+            _json_response(self, 200, out)
             return
 
         if self.path == "/patch/apply":
@@ -422,9 +1366,28 @@ class BridgeHandler(BaseHTTPRequestHandler):
                 return
 
             # Guardrail: require clean worktree unless force
-            clean_ok, clean_msg = validate_clean_worktree(cfg.repo_root)
-            if not clean_ok and not force:
-                _json_response(self, 409, {"ok": False, "error": clean_msg, "hint": "Commit/stash changes or retry with force=true"})
+            status_age = None
+            if not force:
+                clean = check_clean_worktree(cfg.repo_root)
+                status_age = clean.age
+                if not clean.ok:
+                    _json_response(self, 409, {"ok": False, "error": clean.message, "hint": "Commit/stash changes or retry with force=true", "statusAge": status_age})
+                    return
+
+            journal: PatchJournal = self.server.journal  # type: ignore[attr-defined]
+            pre = journal.snapshot(touched) if not dry_run else {}
+
+            if bool(body.get("atomic", False)):
+                # single pass: check + apply on a snapshot, promoted only if every hunk applied
+                apply_ok, apply_err, files = git_apply_atomic(cfg.repo_root, patch_text, touched, dry_run)
+                if not apply_ok:
+                    _json_response(self, 400, {"ok": False, "error": apply_err, "files": files, "touched": touched})
+                    return
+                journal_id = None
+                if not dry_run:
+                    journal_id = self._journal_write("/patch/apply", pre)
+                    self._index_after_write(touched)
+                _json_response(self, 200, {"ok": True, "dry_run": dry_run, "files": files, "touched": touched, "statusAge": status_age, "journalId": journal_id})
                 return
 
             # Always check first
@@ -434,7 +1397,7 @@ class BridgeHandler(BaseHTTPRequestHandler):
                 return
 
             if dry_run:
-                _json_response(self, 200, {"ok": True, "dry_run": True, "touched": touched})
+                _json_response(self, 200, {"ok": True, "dry_run": True, "touched": touched, "statusAge": status_age})
                 return
 
             apply_ok, apply_err = git_apply(cfg.repo_root, patch_text)
@@ -442,7 +1405,69 @@ class BridgeHandler(BaseHTTPRequestHandler):
                 _json_response(self, 500, {"ok": False, "error": apply_err, "touched": touched})
                 return
 
-            _json_response(self, 200, {"ok": True, "dry_run": False, "touched": touched})
+            journal_id = self._journal_write("/patch/apply", pre)
+            self._index_after_write(touched)
+            _json_response(self, 200, {"ok": True, "dry_run": False, "touched": touched, "statusAge": status_age, "journalId": journal_id})
+            return
+
+        if self.path == "/patch/apply-batch":
+            if cfg.readonly or not cfg.allow_write or not cfg.allow_patch_apply:
+                _json_response(self, 403, {"ok": False, "error": "patch apply disabled"})
+                return
+
+            patches = body.get("patches") or []
+            if not isinstance(patches, list) or not patches:
+                _json_response(self, 400, {"ok": False, "error": "patches must be a non-empty list"})
+                return
+            if len(patches) > PATCH_BATCH_MAX_DIFFS:
+                _json_response(self, 400, {"ok": False, "error": f"too many patches (max {PATCH_BATCH_MAX_DIFFS})"})
+                return
+            patches = [str(p or "") for p in patches]
+            dry_run = bool(body.get("dryRun", True))
+            force = bool(body.get("force", False))
+
+            for i, patch_text in enumerate(patches):
+                # parse_patch also sees pure renames / mode changes (git headers, no ---/+++ lines)
+                if not any(fp.path for fp in parse_patch(patch_text).files):
+                    _json_response(self, 400, {"ok": False, "error": "patch touches no files (could not parse diff headers)", "failedIndex": i})
+                    return
+
+            # every distinct path is policy-checked once, across the whole batch
+            ok, errors, touched = validate_patch(cfg, "\n".join(patches))
+            if not ok:
+                _json_response(self, 400, {"ok": False, "errors": errors, "touched": touched})
+                return
+
+            status_age = None
+            if not force:
+                clean = check_clean_worktree(cfg.repo_root)
+                status_age = clean.age
+                if not clean.ok:
+                    _json_response(self, 409, {"ok": False, "error": clean.message, "hint": "Commit/stash changes or retry with force=true", "statusAge": status_age})
+                    return
+
+            journal: PatchJournal = self.server.journal  # type: ignore[attr-defined]
+            pre = journal.snapshot(touched) if not dry_run else {}
+            res = git_apply_batch(cfg.repo_root, patches, touched, dry_run)
+            if not res.ok:
+                _json_response(self, 400 if res.failed_index is not None else 500, {
+                    "ok": False, "error": res.error, "failedIndex": res.failed_index, "files": res.files, "touched": touched,
+                })
+                return
+            journal_id = None
+            if not dry_run:
+                journal_id = self._journal_write("/patch/apply-batch", pre)
+                self._index_after_write(touched)
+            _json_response(self, 200, {
+                "ok": True, "dry_run": dry_run, "applied": len(patches), "files": res.files, "touched": touched,
+                "statusAge": status_age, "journalId": journal_id,
+            })
+            return
+
+        if self.path == "/patch/journal":
+            journal: PatchJournal = self.server.journal  # type: ignore[attr-defined]
+            limit = max(1, min(int(body.get("limit", 50)), 1000))
+            _json_response(self, 200, {"ok": True, "entries": journal.recent(limit)})
             return
 
         if self.path == "/patch/revert":
@@ -454,15 +1479,22 @@ class BridgeHandler(BaseHTTPRequestHandler):
             dry_run = bool(body.get("dryRun", True))
             force = bool(body.get("force", False))
 
+            if body.get("id") or body.get("last"):
+                self._revert_from_journal(cfg, body, dry_run, force)
+                return
+
             ok, errors, touched = validate_patch(cfg, patch_text)
             if not ok:
                 _json_response(self, 400, {"ok": False, "errors": errors, "touched": touched})
                 return
 
-            clean_ok, clean_msg = validate_clean_worktree(cfg.repo_root)
-            if not clean_ok and not force:
-                _json_response(self, 409, {"ok": False, "error": clean_msg, "hint": "Commit/stash changes or retry with force=true"})
-                return
+            status_age = None
+            if not force:
+                clean = check_clean_worktree(cfg.repo_root)
+                status_age = clean.age
+                if not clean.ok:
+                    _json_response(self, 409, {"ok": False, "error": clean.message, "hint": "Commit/stash changes or retry with force=true", "statusAge": status_age})
+                    return
 
             # For revert dry-run, use --check on reverse by actually checking with git apply -R --check
             # Implemented via git_apply_reverse after a check:
@@ -475,7 +1507,7 @@ class BridgeHandler(BaseHTTPRequestHandler):
                 if code != 0:
                     _json_response(self, 400, {"ok": False, "error": err or out or "git apply -R --check failed", "touched": touched})
                     return
-                _json_response(self, 200, {"ok": True, "dry_run": True, "touched": touched})
+                _json_response(self, 200, {"ok": True, "dry_run": True, "touched": touched, "statusAge": status_age})
                 return
 
             rev_ok, rev_err = git_apply_reverse(cfg.repo_root, patch_text)
@@ -483,13 +1515,311 @@ class BridgeHandler(BaseHTTPRequestHandler):
                 _json_response(self, 500, {"ok": False, "error": rev_err, "touched": touched})
                 return
 
-            _json_response(self, 200, {"ok": True, "dry_run": False, "touched": touched})
+            self._index_after_write(touched)
+            _json_response(self, 200, {"ok": True, "dry_run": False, "touched": touched, "statusAge": status_age})
             return
 
         _json_response(self, 404, {"ok": False, "error": "not found"})
 
+    def _read_many(self, cfg: BridgeConfig, body: Dict[str, Any]) -> None:
+        """
+        Explicit paths first, then glob matches (from the file index), deduped.
+        The total budget is split in request order before reading, so results are deterministic.
+        """
+        max_bytes, max_err = _parse_max_bytes(body)
+        if max_bytes is None:
+            _json_response(self, 400, {"ok": False, "error": max_err})
+            return
+        budget = int(body.get("maxTotalBytes", 2_000_000))
+        max_files = min(int(body.get("maxFiles", 200)), READ_MANY_MAX_FILES)
+        raw_paths = body.get("paths") or []
+        raw_globs = body.get("globs") or []
+        if not isinstance(raw_paths, list) or not isinstance(raw_globs, list):
+            _json_response(self, 400, {"ok": False, "error": "paths/globs must be lists"})
+            return
+
+        rels: List[str] = [str(p).strip() for p in raw_paths if isinstance(p, str) and p.strip()]
+        if raw_globs:
+            index: FileIndex = self.server.file_index  # type: ignore[attr-defined]
+            allowed, _ = index.list_allowed()
+            globs = [str(g).replace("\\", "/") for g in raw_globs if isinstance(g, str)]
+            rels += [p for p in allowed if any(fnmatch.fnmatch(p, g) for g in globs)]
+        seen = set()
+        rels = [r for r in rels if not (r in seen or seen.add(r))]
+        files_truncated = len(rels) > max_files
+        rels = rels[:max_files]
+
+        # assign per-file limits from the budget (stat only)
+        limits: List[int] = []
+        remaining = budget
+        for rel in rels:
+            limit = min(max_bytes, remaining)
+            limits.append(limit)
+            abs_path, err = _resolve_repo_path(cfg, rel)
+            if abs_path is not None and not err and limit > 0:
+                try:
+                    remaining -= min(os.stat(abs_path).st_size, limit)
+                except OSError:
+                    pass
+
+        pool: ThreadPoolExecutor = self.server.io_pool  # type: ignore[attr-defined]
+        futures = [
+            pool.submit(_read_repo_file, self.server, rel, limit) if limit > 0 else None
+            for rel, limit in zip(rels, limits)
+        ]
+
+        # splice cached JSON bodies instead of decoding and re-encoding them
+        parts: List[bytes] = []
+        for rel, fut in zip(rels, futures):
+            if fut is None:
+                parts.append(json.dumps({"status": 413, "ok": False, "path": rel, "error": "byte budget exhausted"}, ensure_ascii=False).encode("utf-8"))
+                continue
+            try:
+                status, cached, err = fut.result()
+            except Exception as e:
+                status, cached, err = 500, None, str(e)
+            if cached is None:
+                parts.append(json.dumps({"status": status, "ok": False, "path": rel, "error": err}, ensure_ascii=False).encode("utf-8"))
+            else:
+                parts.append(b'{"status": 200, "etag": ' + json.dumps(cached.etag).encode("utf-8") + b", " + cached.body[1:])
+
+        tail = json.dumps({"budgetExhausted": remaining <= 0, "filesTruncated": files_truncated}).encode("utf-8")
+        data = b'{"ok": true, "files": [' + b", ".join(parts) + b"], " + tail[1:]
+        _json_bytes_response(self, 200, data)
+
+    def _stream_search(self, hits: Iterator[Dict[str, Any]], max_hits: int, indexed: bool) -> None:
+        """
+        NDJSON: one {"type": "hit", ...} line per hit, then a {"type": "done", ...} line.
+        HTTP/1.1 clients get chunked transfer encoding (connection stays open); HTTP/1.0 clients
+        get a close-delimited body. Stops as soon as the client disconnects. Never compressed.
+        """
+        chunked = self.request_version == "HTTP/1.1"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+
+        def _write(data: bytes) -> None:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data) if chunked else data)
+
+        n = 0
+        try:
+            for hit in hits:
+                _write(_ndjson_line({"type": "hit", **hit}))
+                n += 1
+            _write(_ndjson_line({"type": "done", "ok": True, "count": n, "truncated": n >= max_hits, "indexed": indexed}))
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # client went away: stop scanning
+        finally:
+            close = getattr(hits, "close", None)
+            if close is not None:
+                close()
+
+    def _imports(self, cfg: BridgeConfig, body: Dict[str, Any]) -> None:
+        """
+        /repo/imports {"path" | "paths", "direction": dependents | dependencies, "transitive", "maxDepth", "maxResults"}
+        """
+        graph: Optional[ImportGraph] = self.server.import_graph  # type: ignore[attr-defined]
+        if graph is None:
+            _json_response(self, 503, {"ok": False, "error": "symbol index disabled"})
+            return
+        raw = body.get("paths") or ([body["path"]] if body.get("path") else [])
+        direction = str(body.get("direction", "dependents"))
+        if not isinstance(raw, list) or not raw or direction not in IMPORT_DIRECTIONS:
+            _json_response(self, 400, {"ok": False, "error": f"path or paths required; direction must be one of {list(IMPORT_DIRECTIONS)}"})
+            return
+        paths: List[str] = []
+        for rp in raw:
+            abs_path, err = _resolve_repo_path(cfg, str(rp))
+            if abs_path is None:
+                _json_response(self, 400, {"ok": False, "error": err, "path": rp})
+                return
+            paths.append(abs_path.relative_to(cfg.repo_root.resolve()).as_posix())
+        self._refresh_index_on_demand()
+        transitive = bool(body.get("transitive", False))
+        depth = max(1, min(int(body.get("maxDepth", IMPORTS_MAX_DEPTH)), IMPORTS_MAX_DEPTH))
+        limit = max(1, min(int(body.get("maxResults", 1000)), IMPORTS_MAX_RESULTS))
+        walk = graph.dependents if direction == "dependents" else graph.dependencies
+        with self.trace.phase("index"):
+            found, truncated = walk(paths, transitive, depth, limit)
+            unknown = [p for p in paths if not graph.known(p)]
+            unresolved = graph.unresolved(paths) if direction == "dependencies" else {}
+        files = [{"path": p, "depth": d} for p, d in sorted(found.items(), key=lambda kv: (kv[1], kv[0]))]
+        out: Dict[str, Any] = {"ok": True, "direction": direction, "paths": paths, "files": files, "truncated": truncated}
+        if unknown:
+            out["notIndexed"] = unknown
+        if unresolved:
+            out["unresolved"] = unresolved
+        _json_response(self, 200, out)
+
+    def _refresh_index_on_demand(self) -> None:
+        # --index-poll 0 and no watcher: the index only moves when someone asks
+        if self.server.index_poll <= 0 and self.server.watcher is None:  # type: ignore[attr-defined]
+            self.server.file_index.refresh()  # type: ignore[attr-defined]
+
+    def _changes_page(self, feed: ChangeFeed, cursor: str, limit: int) -> FeedPage:
+        self._refresh_index_on_demand()
+        return feed.since(cursor, limit)
+
+    def _next_check(self, deadline: float) -> float:
+        # --index-poll 0 and no watcher: nothing records changes unless we refresh, so re-check every second
+        if self.server.index_poll <= 0 and self.server.watcher is None:  # type: ignore[attr-defined]
+            return min(deadline, time.monotonic() + 1.0)
+        return deadline
+
+    def _long_poll(self, feed: ChangeFeed, cursor: str, limit: int, deadline: float) -> None:
+        """
+        Answer once there are changes after cursor, or at deadline; suspended (no worker held) meanwhile.
+        The caller acquired a feed waiter slot.
+        """
+        started = time.perf_counter()
+
+        def _check(timed_out: bool) -> None:
+            try:
+                page = self._changes_page(feed, cursor, limit)
+                if page.cursor == cursor and not page.reset and time.monotonic() < deadline:
+                    self._suspend(self._next_check(deadline), lambda: feed.changed_since(cursor), _check)
+                    return
+            except BaseException:
+                feed.release_waiter()
+                raise
+            feed.release_waiter()
+            self.trace.add("wait", time.perf_counter() - started)
+            _json_response(self, 200, {"ok": True, **asdict(page), "waited": True})
+
+        self._suspend(self._next_check(deadline), lambda: feed.changed_since(cursor), _check)
+
+    def _stream_changes(self, feed: ChangeFeed, cursor: str, limit: int, max_seconds: float) -> None:
+        """
+        Server-sent events: a "changes" event (id = cursor) for the starting point and then for every
+        batch of changes, ": ping" comments while idle, until max_seconds or the client disconnects.
+        Between events the request is suspended: an open stream holds no worker.
+        """
+        if not feed.acquire_waiter():
+            _json_response(self, 503, {"ok": False, "error": "too many change feed watchers", "hint": "retry with a plain long-poll later"})
+            return
+        chunked = self.request_version == "HTTP/1.1"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+
+        def _write(data: bytes) -> None:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data) if chunked else data)
+            self.wfile.flush()
+
+        if not cursor:
+            self._refresh_index_on_demand()
+            cursor = feed.cursor()
+        deadline = time.monotonic() + max_seconds
+        state = {"cursor": cursor, "first": True, "sent": time.monotonic()}
+
+        def _step(timed_out: bool) -> None:
+            try:
+                while True:
+                    cur = state["cursor"]
+                    page = self._changes_page(feed, cur, limit)
+                    if state["first"] or page.changes or page.reset or page.cursor != cur:
+                        data = json.dumps(asdict(page), ensure_ascii=False)
+                        _write(f"id: {page.cursor}\nevent: changes\ndata: {data}\n\n".encode("utf-8"))
+                        state["first"], state["sent"] = False, time.monotonic()
+                    state["cursor"] = page.cursor
+                    if not page.truncated:
+                        break
+                now = time.monotonic()
+                if now >= deadline:
+                    if chunked:
+                        self.wfile.write(b"0\r\n\r\n")
+                    feed.release_waiter()
+                    return
+                if now - state["sent"] >= CHANGES_HEARTBEAT_SECONDS:
+                    _write(b": ping\n\n")
+                    state["sent"] = now
+                wake = self._next_check(min(deadline, state["sent"] + CHANGES_HEARTBEAT_SECONDS))
+                cur = state["cursor"]
+                self._suspend(wake, lambda: feed.changed_since(cur), _step)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+                feed.release_waiter()
+            except BaseException:
+                feed.release_waiter()
+                raise
+
+        _step(False)
+
+    def _journal_write(self, endpoint: str, pre: Dict[str, Optional[bytes]]) -> Optional[str]:
+        journal: PatchJournal = self.server.journal  # type: ignore[attr-defined]
+        try:
+            entry = journal.record(endpoint, pre)
+        except OSError as e:
+            # the patch itself is applied; only the undo record is missing
+            print(f"[bridge] patch journal write failed: {e}")
+            return None
+        return entry.id if entry else None
+
+    def _revert_from_journal(self, cfg: BridgeConfig, body: Dict[str, Any], dry_run: bool, force: bool) -> None:
+        """
+        Revert by journal id(s) or the last N journaled patches: stored pre-images are written back
+        directly. Instead of the clean-worktree check, every touched file must still hold the
+        content the patch left (unless force).
+        """
+        journal: PatchJournal = self.server.journal  # type: ignore[attr-defined]
+        if body.get("last"):
+            entries = journal.last(max(1, int(body.get("last", 1))))
+        else:
+            ids = body.get("id")
+            ids = ids if isinstance(ids, list) else [ids]
+            entries = []
+            for eid in ids:
+                e = journal.get(str(eid))
+                if e is None:
+                    _json_response(self, 404, {"ok": False, "error": f"unknown patch id: {eid}"})
+                    return
+                entries.append(e)
+            entries.sort(key=lambda e: e.ts, reverse=True)
+        if not entries:
+            _json_response(self, 404, {"ok": False, "error": "nothing to revert"})
+            return
+
+        ids = [e.id for e in entries]
+        touched = sorted({rel for e in entries for rel in e.paths})
+        for rel in touched:
+            _, err = _resolve_repo_path(cfg, rel)
+            if err:
+                _json_response(self, 400, {"ok": False, "errors": [f"denied path: {rel} ({err})"], "touched": touched})
+                return
+
+        res = journal.revert(entries, force=force, dry_run=dry_run)
+        if not res.ok:
+            status = 409 if res.drifted or res.error.startswith("already reverted") else 500
+            _json_response(self, status, {"ok": False, "error": res.error, "ids": ids, "drifted": res.drifted, "touched": touched})
+            return
+        if not dry_run:
+            self._index_after_write(res.restored)
+        _json_response(self, 200, {"ok": True, "dry_run": dry_run, "ids": ids, "restored": res.restored, "drifted": res.drifted, "touched": touched})
+
+    def _index_after_write(self, rel_paths: List[str]) -> None:
+        # only the written files and their dirs (new dirs included); the poller / watcher covers the rest
+        index: FileIndex = self.server.file_index  # type: ignore[attr-defined]
+        rels = [rel.replace("\\", "/").strip("/") for rel in rel_paths]
+        index.refresh_paths({rel.rpartition("/")[0] for rel in rels}, rels)
+
     def log_message(self, format: str, *args: Any) -> None:
-        sys.stderr.write("%s - %s\n" % (self.address_string(), format % args))
+        trace: Optional[RequestTrace] = getattr(self, "trace", None)
+        tid = f" [{trace.trace_id}]" if trace is not None else ""
+        sys.stderr.write("%s%s - %s\n" % (self.address_string(), tid, format % args))
 
 
 def main() -> None:
@@ -503,6 +1833,23 @@ def main() -> None:
     ap.add_argument("--allow-patch-apply", action="store_true", default=False)
     ap.add_argument("--disallow-git", action="store_true", default=False)
     ap.add_argument("--allow-glob", action="append", default=[], help="Extra allow glob (repeatable)")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Worker threads (0 = one thread per request)")
+    ap.add_argument("--index-poll", type=float, default=DEFAULT_INDEX_POLL_SECONDS, help="File index poll interval in seconds (0 = refresh on each /repo/tree)")
+    ap.add_argument("--no-watch", action="store_true", default=False, help="Do not use inotify; the file index only polls")
+    ap.add_argument("--no-symbol-index", action="store_true", default=False, help="Disable the TS/JS symbol index (/repo/symbols, /repo/imports, patch impact)")
+    ap.add_argument("--no-search-index", action="store_true", default=False, help="Disable the trigram search index")
+    ap.add_argument("--cache-dir", default="", help="Bridge cache dir (default: <repo>/.git/plugaishop-bridge)")
+    ap.add_argument("--max-body-mb", type=int, default=DEFAULT_MAX_BODY_MB, help="Max request body size in MB (0 = no limit)")
+    ap.add_argument("--slow-ms", type=float, default=DEFAULT_SLOW_MS, help="Log requests slower than this to the slow log (0 = disabled)")
+    ap.add_argument("--slow-log", default="", help="Slow request log (JSONL, rotated; default: <state dir or cache dir>/slow-requests.jsonl)")
+    ap.add_argument("--slow-log-max-mb", type=int, default=DEFAULT_SLOW_LOG_MAX_MB, help="Rotate the slow log at this size")
+    ap.add_argument("--state-dir", default="", help="Patch journal dir (default: the cache dir)")
+    ap.add_argument("--search-workers", type=int, default=DEFAULT_SEARCH_WORKERS, help="Search scan processes (<=1 = scan in the request thread)")
+    ap.add_argument("--read-cache-mb", type=int, default=DEFAULT_READ_CACHE_MB, help="/repo/read cache budget in MB (0 = disabled)")
+    ap.add_argument("--compress-min-bytes", type=int, default=DEFAULT_COMPRESS_MIN_BYTES, help="Compress responses at least this large (0 = never)")
+    ap.add_argument("--keepalive-timeout", type=float, default=DEFAULT_KEEPALIVE_TIMEOUT, help="Idle keep-alive connection timeout in seconds")
+    ap.add_argument("--git-status-max-age", type=float, default=DEFAULT_GIT_STATUS_MAX_AGE, help="Max seconds a cached git status is reused")
+    ap.add_argument("--max-searches", type=int, default=GROUP_LIMITS_DEFAULT["search"], help="Concurrent /repo/search limit (0 = unlimited)")
     args = ap.parse_args()
 
     repo_root = Path(args.repo).resolve()
@@ -520,12 +1867,49 @@ def main() -> None:
         allow_globs=ALLOW_GLOBS_DEFAULT + list(args.allow_glob or []),
     )
 
-    httpd = HTTPServer(("127.0.0.1", args.port), BridgeHandler)
-    httpd.cfg = cfg  # type: ignore[attr-defined]
+    limits = dict(GROUP_LIMITS_DEFAULT)
+    limits["search"] = max(0, int(args.max_searches))
+    workers = max(0, int(args.workers))
+    cache_dir = Path(args.cache_dir).resolve() if args.cache_dir else _default_cache_dir(repo_root)
+    state_dir = Path(args.state_dir).resolve() if args.state_dir else None
+    slow_log = None
+    log_dir = state_dir or cache_dir
+    slow_log_path: Optional[Path] = None
+    if args.slow_log:
+        slow_log_path = Path(args.slow_log).resolve()
+    elif log_dir is not None:
+        slow_log_path = log_dir / SLOW_LOG_FILENAME
+    if args.slow_ms > 0 and slow_log_path is None:
+        print("[bridge] slow log disabled: no .git, --state-dir or --slow-log to write it to")
+    if args.slow_ms > 0 and slow_log_path is not None:
+        slow_log = SlowLog(slow_log_path, float(args.slow_ms), max(1, int(args.slow_log_max_mb)) * 1024 * 1024)
+    httpd = BridgeHTTPServer(
+        ("127.0.0.1", args.port),
+        cfg,
+        workers=workers,
+        limits=limits,
+        index_poll=float(args.index_poll),
+        search_index=not bool(args.no_search_index),
+        cache_dir=cache_dir,
+        state_dir=state_dir,
+        search_workers=int(args.search_workers),
+        read_cache_mb=max(0, int(args.read_cache_mb)),
+        compress_min_bytes=max(0, int(args.compress_min_bytes)),
+        git_status_max_age=max(0.0, float(args.git_status_max_age)),
+        max_body_mb=max(0, int(args.max_body_mb)),
+        slow_log=slow_log,
+        watch=not bool(args.no_watch),
+        symbol_index=not bool(args.no_symbol_index),
+    )
+    BridgeHandler.timeout = float(args.keepalive_timeout) if args.keepalive_timeout > 0 else None
 
     print(f"[bridge] repo={cfg.repo_root}")
     print(f"[bridge] listening http://127.0.0.1:{args.port}")
     print(f"[bridge] readonly={cfg.readonly} allow_write={cfg.allow_write} allow_apply_plan={cfg.allow_apply_plan} allow_patch_apply={cfg.allow_patch_apply} allow_git={cfg.allow_git}")
+    print(f"[bridge] index={httpd.file_index.stats()} poll={httpd.index_poll}s search_index={httpd.search_index is not None} cache_dir={cache_dir}")
+    print(f"[bridge] workers={workers or 'per-request'} limits={limits}")
+    print(f"[bridge] watch={'inotify' if httpd.watcher is not None else 'polling'} index_poll={httpd.file_index.poll_interval}s")
+    print(f"[bridge] slow_log={slow_log.path if slow_log else None} slow_ms={args.slow_ms}")
     print("[bridge] token is required in X-Bridge-Token header")
     httpd.serve_forever()
 
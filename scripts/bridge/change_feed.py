@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# scripts/bridge/change_feed.py
+"""
+Cursor-based feed of file changes for /repo/changes.
+
+- Fed by FileIndex change listeners: one sequence number per (path, change) event
+- Cursor = "<epoch>.<seq>": the epoch is per process, so a cursor from an earlier bridge run
+  (or one older than the retained window) is answered with reset=true (client re-lists the tree)
+- since(): net change per path between the cursor and now (created+deleted cancel out,
+  deleted+created = modified), O(events since the cursor)
+- changed_since(): non-blocking check the server's parked long-poll / SSE waiters are re-tested with
+  (no thread blocks on the feed); the number of concurrent waiters is capped (memory, sockets)
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_MAX_EVENTS = 100_000
+DEFAULT_MAX_WAITERS = 256
+
+# (previous net change, new event) -> net change (None = no change)
+_MERGE: Dict[Tuple[str, str], Optional[str]] = {
+    ("created", "modified"): "created",
+    ("created", "deleted"): None,
+    ("modified", "created"): "modified",
+    ("modified", "modified"): "modified",
+    ("modified", "deleted"): "deleted",
+    ("deleted", "created"): "modified",
+    ("deleted", "modified"): "modified",
+}
+
+
+@dataclass
+class FeedPage:
+    cursor: str
+    changes: List[Dict[str, str]] = field(default_factory=list)
+    reset: bool = False
+    truncated: bool = False
+
+
+class ChangeFeed:
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS, max_waiters: int = DEFAULT_MAX_WAITERS) -> None:
+        self.epoch = uuid.uuid4().hex[:8]
+        self.max_events = max(1, max_events)
+        self._lock = threading.Lock()
+        self._events: List[Tuple[str, str]] = []  # (rel, change); _events[i] has seq _base + i + 1
+        self._base = 0
+        self._waiters = threading.BoundedSemaphore(max(1, max_waiters))
+
+    # ---------- producer ----------
+
+    def record(self, changes: List[Tuple[str, str]]) -> None:
+        if not changes:
+            return
+        with self._lock:
+            self._events.extend(changes)
+            if len(self._events) > self.max_events + self.max_events // 4:
+                drop = len(self._events) - self.max_events
+                del self._events[:drop]
+                self._base += drop
+
+    # ---------- consumers ----------
+
+    def _seq(self) -> int:
+        return self._base + len(self._events)
+
+    def cursor(self) -> str:
+        with self._lock:
+            return f"{self.epoch}.{self._seq()}"
+
+    def _parse(self, cursor: str) -> Optional[int]:
+        """
+        Cursor -> seq, None if it is not from this process or no longer covered by the buffer.
+        """
+        epoch, _, seq = cursor.partition(".")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        n = int(seq)
+        if n < self._base or n > self._seq():
+            return None
+        return n
+
+    def since(self, cursor: str, limit: int = 1000) -> FeedPage:
+        """
+        Net changes after cursor, at most `limit` paths (truncated=true: call again with the new cursor).
+        """
+        with self._lock:
+            start = self._parse(cursor)
+            if start is None:
+                return FeedPage(cursor=f"{self.epoch}.{self._seq()}", reset=True)
+            net: Dict[str, Optional[str]] = {}
+            end = self._seq()
+            truncated = False
+            for i in range(start - self._base, len(self._events)):
+                rel, change = self._events[i]
+                if rel not in net and len(net) >= limit:
+                    end, truncated = self._base + i, True
+                    break
+                prev = net.get(rel)
+                net[rel] = change if prev is None and rel not in net else _MERGE.get((prev or "", change), change)
+            changes = [{"path": rel, "change": c} for rel, c in sorted(net.items()) if c is not None]
+            return FeedPage(cursor=f"{self.epoch}.{end}", changes=changes, truncated=truncated)
+
+    def changed_since(self, cursor: str) -> bool:
+        """
+        True once there are events after cursor (or it is invalid).
+        """
+        with self._lock:
+            return self._parse(cursor) != self._seq()
+
+    def acquire_waiter(self) -> bool:
+        """
+        A waiter slot (released with release_waiter()); False when max_waiters clients are already waiting.
+        """
+        return self._waiters.acquire(blocking=False)
+
+    def release_waiter(self) -> None:
+        self._waiters.release()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"seq": self._seq(), "retained": len(self._events)}
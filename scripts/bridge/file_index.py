@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# scripts/bridge/file_index.py
+"""
+In-memory index of repo files for the bridge.
+
+- Built once at startup with the pruning RepoWalker (denied / non-allowlisted dirs are never entered)
+- Keeps size, mtime and policy verdict per file
+- Refreshed incrementally by polling directory mtimes: only directories whose
+  mtime changed are re-listed (create/delete/rename inside them); indexed files are
+  re-stat'd on each refresh so content edits are seen too. The stats run outside the
+  lock (readers are not blocked for a whole pass); only the changes are applied under it
+- Listeners are notified on any change (git status cache invalidation, search index);
+  change listeners also get the net per-path delta [(rel, "created" | "modified" | "deleted")]
+  of allowlisted files (change feed)
+- refresh_paths(): targeted refresh of the dirs / files a filesystem watcher reported or the bridge
+  just wrote (a dir that is not indexed yet is found by re-listing its nearest indexed ancestor)
+- /repo/tree becomes a sorted-list lookup instead of a full rglob
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from scripts.bridge.walker import RepoWalker
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@dataclass
+class FileEntry:
+    size: int
+    mtime_ns: int
+    allowed: bool
+
+
+Change = Tuple[str, str]  # (rel path, "created" | "modified" | "deleted")
+
+
+class FileIndex:
+    def __init__(
+        self,
+        repo_root: Path,
+        is_allowed: Callable[[str], bool],
+        walker: RepoWalker,
+    ) -> None:
+        self.repo_root = repo_root
+        self._is_allowed = is_allowed
+        self._walker = walker
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # one stat pass at a time
+        self._files: Dict[str, FileEntry] = {}
+        self._dirs: Dict[str, int] = {}  # rel dir ("" = root) -> mtime_ns
+        self._sorted: Optional[List[str]] = None
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # called (outside the lock) whenever a refresh/touch saw changes
+        self.listeners: List[Callable[[], None]] = []
+        # called (outside the lock) with the allowlisted paths a refresh/touch changed
+        self.change_listeners: List[Callable[[List[Change]], None]] = []
+        # while a refresh runs: rel -> (size, mtime) before its first change in this pass (None = absent)
+        self._before: Optional[Dict[str, Optional[Tuple[int, int]]]] = None
+        self.built_at = 0.0
+        self.refreshed_at = 0.0
+        self.poll_interval = 0.0
+
+    # ---------- build / refresh ----------
+
+    def build(self) -> None:
+        with self._lock:
+            self._files.clear()
+            self._dirs.clear()
+            self._scan_tree("")
+            self._sorted = None
+            self.built_at = self.refreshed_at = time.time()
+
+    def refresh(self) -> int:
+        """
+        Re-list every directory whose mtime changed since the last scan and re-stat indexed files.
+        Returns the number of directories / files that changed.
+        """
+        with self._refresh_lock:
+            with self._lock:
+                dirs = list(self._dirs.items())
+                files = [(rel, e.size, e.mtime_ns) for rel, e in self._files.items()]
+            # stat pass without the lock: O(repo) syscalls, readers keep going
+            dir_changes = [(rel_dir, old, _mtime_ns(self._abs(rel_dir))) for rel_dir, old in dirs]
+            dir_changes = [c for c in dir_changes if c[2] != c[1]]
+            file_changes: List[Tuple[str, int, int, Optional[os.stat_result]]] = []
+            for rel, size, mtime_ns in files:
+                try:
+                    st: Optional[os.stat_result] = os.stat(self._abs(rel))
+                except OSError:
+                    st = None
+                if st is None or st.st_mtime_ns != mtime_ns or st.st_size != size:
+                    file_changes.append((rel, size, mtime_ns, st))
+            if not dir_changes and not file_changes:
+                self.refreshed_at = time.time()
+                return 0
+            with self._lock:
+                self._before = {}
+                changed = self._apply_refresh(dir_changes, file_changes)
+                if changed:
+                    self._sorted = None
+                self.refreshed_at = time.time()
+                delta = self._take_delta()
+        if changed:
+            self._notify(delta)
+        return changed
+
+    def refresh_paths(self, rel_dirs: Iterable[str], rel_files: Iterable[str]) -> int:
+        """
+        Targeted refresh: re-list rel_dirs (entries created / deleted / renamed in them) and
+        re-stat the already indexed rel_files (content edits). Returns the number of paths handled.
+        """
+        n = 0
+        with self._lock:
+            self._before = {}
+            # new dir: listed with its nearest indexed ancestor; dropped dir: handled with its parent
+            todo = {self._indexed_ancestor(d.replace("\\", "/").strip("/")) for d in rel_dirs}
+            for rel_dir in sorted(todo, key=len):
+                if rel_dir not in self._dirs:
+                    continue  # dropped with an ancestor handled before it
+                if os.path.isdir(self._abs(rel_dir)):
+                    self._rescan_dir(rel_dir)
+                else:
+                    self._drop_dir(rel_dir)
+                n += 1
+            for rel in set(rel_files):
+                if rel in self._files:
+                    self._stat_file(rel)
+                    n += 1
+            self.refreshed_at = time.time()
+            delta = self._take_delta()
+            if delta:
+                self._sorted = None
+        if delta:
+            self._notify(delta)
+        return n
+
+    def _indexed_ancestor(self, rel_dir: str) -> str:
+        while rel_dir and rel_dir not in self._dirs:
+            rel_dir = rel_dir.rpartition("/")[0]
+        return rel_dir
+
+    def start_polling(self, interval: float) -> None:
+        """
+        Refresh every `interval` seconds; poll_interval may be changed later (watcher on / off).
+        """
+        if interval <= 0 or self._poller is not None:
+            return
+        self.poll_interval = interval
+
+        def _loop() -> None:
+            while not self._stop.wait(self.poll_interval):
+                try:
+                    self.refresh()
+                except Exception as e:  # keep poller alive
+                    print(f"[bridge] index refresh failed: {e}")
+
+        self._poller = threading.Thread(target=_loop, name="bridge-index", daemon=True)
+        self._poller.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ---------- queries ----------
+
+    def list_allowed(self, prefix: str = "", max_entries: int = 0) -> Tuple[List[str], bool]:
+        """
+        Allowed file paths under prefix (posix, relative), sorted.
+        Returns (entries, truncated).
+        """
+        prefix = prefix.replace("\\", "/").strip("/")
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(p for p, e in self._files.items() if e.allowed)
+            paths = self._sorted
+        if prefix:
+            key = prefix + "/"
+            start = bisect.bisect_left(paths, key)
+            end = bisect.bisect_left(paths, prefix + "0")  # "0" sorts right after "/"
+            paths = paths[start:end]
+        if max_entries > 0 and len(paths) > max_entries:
+            return paths[:max_entries], True
+        return list(paths), False
+
+    def get(self, rel_path: str) -> Optional[FileEntry]:
+        with self._lock:
+            return self._files.get(rel_path)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            allowed = sum(1 for e in self._files.values() if e.allowed)
+            return {"files": len(self._files), "allowed": allowed, "dirs": len(self._dirs)}
+
+    def dirs(self) -> List[str]:
+        """
+        Every indexed directory (rel posix, "" = root): what a filesystem watcher has to watch.
+        """
+        with self._lock:
+            return list(self._dirs)
+
+    def _notify(self, delta: List[Change]) -> None:
+        for fn in list(self.listeners):
+            try:
+                fn()
+            except Exception as e:
+                print(f"[bridge] index listener failed: {e}")
+        if not delta:
+            return
+        for cfn in list(self.change_listeners):
+            try:
+                cfn(delta)
+            except Exception as e:
+                print(f"[bridge] index change listener failed: {e}")
+
+    # ---------- change tracking (caller holds lock) ----------
+
+    def _note(self, rel: str) -> None:
+        """
+        Remember rel's state before its first change in the current pass; call before mutating.
+        """
+        if self._before is None or rel in self._before:
+            return
+        e = self._files.get(rel)
+        self._before[rel] = (e.size, e.mtime_ns) if e is not None else None
+
+    def _take_delta(self) -> List[Change]:
+        before, self._before = self._before or {}, None
+        delta: List[Change] = []
+        for rel, old in before.items():
+            e = self._files.get(rel)
+            if e is not None and not e.allowed:
+                continue
+            if e is None:
+                if old is not None and self._is_allowed(rel):
+                    delta.append((rel, "deleted"))
+            elif old is None:
+                delta.append((rel, "created"))
+            elif old != (e.size, e.mtime_ns):
+                delta.append((rel, "modified"))
+        delta.sort()
+        return delta
+
+    # ---------- internals (caller holds lock) ----------
+
+    def _abs(self, rel: str) -> str:
+        return str(self.repo_root / rel) if rel else str(self.repo_root)
+
+    def _scan_tree(self, rel_dir: str) -> None:
+        self._scan(rel_dir, recursive=True)
+
+    def _list_dir(self, rel_dir: str) -> List[str]:
+        """
+        Record one directory's files and mtime. Returns child dirs not yet indexed.
+        """
+        return self._scan(rel_dir, recursive=False)
+
+    def _scan(self, rel_dir: str, recursive: bool) -> List[str]:
+        try:
+            self._dirs[rel_dir] = os.stat(self._abs(rel_dir)).st_mtime_ns
+        except OSError:
+            self._dirs.pop(rel_dir, None)
+            return []
+        new_dirs: List[str] = []
+        for rel, de in self._walker.walk(rel_dir, include_dirs=True, recursive=recursive):
+            try:
+                st = de.stat()
+            except OSError:
+                continue
+            if de.is_dir(follow_symlinks=False):
+                if recursive:
+                    self._dirs[rel] = st.st_mtime_ns
+                elif rel not in self._dirs:
+                    new_dirs.append(rel)
+                continue
+            self._note(rel)
+            self._files[rel] = FileEntry(st.st_size, st.st_mtime_ns, self._is_allowed(rel))
+        return new_dirs
+
+    def _apply_refresh(
+        self,
+        dir_changes: List[Tuple[str, int, Optional[int]]],
+        file_changes: List[Tuple[str, int, int, Optional[os.stat_result]]],
+    ) -> int:
+        """
+        Apply what refresh() saw outside the lock. Entries another writer (touch, refresh_paths,
+        a rescan in this pass) updated since the snapshot are left alone.
+        """
+        changed = 0
+        for rel_dir, old_mtime, mtime in dir_changes:
+            if self._dirs.get(rel_dir) != old_mtime:
+                continue  # dropped / rescanned meanwhile or with a parent in this pass
+            if mtime is None:
+                self._drop_dir(rel_dir)
+            else:
+                self._rescan_dir(rel_dir)
+            changed += 1
+        # content edits do not touch the parent dir mtime
+        for rel, size, mtime_ns, st in file_changes:
+            entry = self._files.get(rel)
+            if entry is None or (entry.size, entry.mtime_ns) != (size, mtime_ns):
+                continue
+            self._note(rel)
+            if st is None:
+                del self._files[rel]
+            else:
+                entry.mtime_ns, entry.size = st.st_mtime_ns, st.st_size
+            changed += 1
+        return changed
+
+    def _rescan_dir(self, rel_dir: str) -> None:
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        # drop direct children; subdirs that still exist are kept (they have their own mtimes)
+        for p in [p for p in self._files if p.startswith(prefix) and "/" not in p[len(prefix):]]:
+            self._note(p)
+            del self._files[p]
+        for d in [d for d in self._dirs if d and d.startswith(prefix) and "/" not in d[len(prefix):]]:
+            if not os.path.isdir(self._abs(d)):
+                self._drop_dir(d)
+        for sub in self._list_dir(rel_dir):
+            self._scan_tree(sub)
+
+    def _drop_dir(self, rel_dir: str) -> None:
+        prefix = f"{rel_dir}/"
+        for p in [p for p in self._files if p.startswith(prefix)]:
+            self._note(p)
+            del self._files[p]
+        for d in [d for d in self._dirs if d == rel_dir or d.startswith(prefix)]:
+            del self._dirs[d]
+
+    def _stat_file(self, rel: str) -> None:
+        self._note(rel)
+        try:
+            st = os.stat(self._abs(rel))
+        except OSError:
+            self._files.pop(rel, None)
+            return
+        if os.path.isfile(self._abs(rel)):
+            self._files[rel] = FileEntry(st.st_size, st.st_mtime_ns, self._is_allowed(rel))
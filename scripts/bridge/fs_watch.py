@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# scripts/bridge/fs_watch.py
+"""
+Filesystem watcher that drives FileIndex refreshes (Linux inotify through ctypes, no dependency).
+
+- Watches exactly the directories the index holds (the pruning walker never enters node_modules,
+  .git, android, ...), kept in sync after each batch (new dirs added, removed dirs dropped)
+- Events are batched for DEBOUNCE_SECONDS, then FileIndex.refresh_paths() re-lists only the dirs
+  that gained / lost entries and re-stats only the files written: O(delta) instead of a full pass
+- Queue overflow -> one full FileIndex.refresh()
+- Elsewhere (or if inotify / the watch limit is unavailable) start() returns False and the
+  index keeps polling
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from scripts.bridge.file_index import FileIndex
+
+DEBOUNCE_SECONDS = 0.05
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW
+)
+_DIR_ENTRY_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+_FILE_EVENTS = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _libc() -> Optional[ctypes.CDLL]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None
+
+
+class InotifyWatcher:
+    def __init__(self, index: FileIndex) -> None:
+        self.index = index
+        self._libc = _libc()
+        self._fd = -1
+        self._wd_to_dir: Dict[int, str] = {}
+        self._dir_to_wd: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.active = False
+        self.batches = 0
+        # index poll interval to restore if the watcher has to give up (0 = leave as is)
+        self.fallback_poll = 0.0
+
+    @staticmethod
+    def available() -> bool:
+        return _libc() is not None
+
+    def start(self) -> bool:
+        if self._libc is None:
+            return False
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            print(f"[bridge] inotify unavailable: {os.strerror(ctypes.get_errno())}")
+            return False
+        self._fd = fd
+        if not self._sync_watches():
+            self._close()
+            return False
+        self.active = True
+        self._thread = threading.Thread(target=self._loop, name="bridge-watch", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._close()
+
+    def _close(self) -> None:
+        self.active = False
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    # ---------- watches ----------
+
+    def _sync_watches(self) -> bool:
+        """
+        Watch every indexed dir, unwatch dirs no longer indexed. False if the watch limit is hit.
+        """
+        assert self._libc is not None
+        wanted = set(self.index.dirs())
+        for d in [d for d in self._dir_to_wd if d not in wanted]:
+            wd = self._dir_to_wd.pop(d)
+            self._wd_to_dir.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+        root = str(self.index.repo_root)
+        for d in wanted:
+            if d in self._dir_to_wd:
+                continue
+            path = os.path.join(root, d) if d else root
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    print("[bridge] inotify watch limit reached (fs.inotify.max_user_watches): falling back to polling")
+                    return False
+                continue  # vanished meanwhile: the next refresh drops it
+            self._wd_to_dir[wd] = d
+            self._dir_to_wd[d] = wd
+        return True
+
+    # ---------- events ----------
+
+    def _read(self, dirs: Set[str], files: Set[str]) -> bool:
+        """
+        Drain pending events into dirs / files. Returns True on queue overflow.
+        """
+        overflow = False
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return overflow
+            if not buf:
+                return overflow
+            off = 0
+            while off + _EVENT_HEADER.size <= len(buf):
+                wd, mask, _, name_len = _EVENT_HEADER.unpack_from(buf, off)
+                name = buf[off + _EVENT_HEADER.size : off + _EVENT_HEADER.size + name_len].rstrip(b"\0")
+                off += _EVENT_HEADER.size + name_len
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                rel_dir = self._wd_to_dir.get(wd)
+                if rel_dir is None:
+                    continue
+                if mask & IN_IGNORED:
+                    self._wd_to_dir.pop(wd, None)
+                    self._dir_to_wd.pop(rel_dir, None)
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    parent = rel_dir.rpartition("/")[0]
+                    dirs.add(parent if rel_dir else rel_dir)
+                    continue
+                if mask & _DIR_ENTRY_EVENTS:
+                    dirs.add(rel_dir)
+                elif mask & _FILE_EVENTS and name:
+                    n = os.fsdecode(name)
+                    files.add(f"{rel_dir}/{n}" if rel_dir else n)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([self._fd], [], [], 0.5)
+            except (OSError, ValueError):
+                return
+            if not ready:
+                continue
+            dirs: Set[str] = set()
+            files: Set[str] = set()
+            overflow = self._read(dirs, files)
+            # editors / git write in bursts: collect the whole burst into one refresh
+            deadline = time.monotonic() + DEBOUNCE_SECONDS
+            while not self._stop.is_set():
+                left = deadline - time.monotonic()
+                if left <= 0 or not select.select([self._fd], [], [], left)[0]:
+                    break
+                overflow = self._read(dirs, files) or overflow
+            try:
+                if overflow:
+                    self.index.refresh()
+                else:
+                    self.index.refresh_paths(dirs, files)
+                self.batches += 1
+                if dirs or overflow:
+                    if not self._sync_watches():
+                        self._close()
+                        if self.fallback_poll > 0:
+                            self.index.poll_interval = self.fallback_poll  # polling takes over
+                        return
+            except Exception as e:  # keep the watcher alive
+                print(f"[bridge] watch refresh failed: {e}")
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# scripts/bridge/git_backend.py
+"""
+Git backends for the bridge.
+
+- GitBackend: plain, one `git` subprocess per call (previous behaviour)
+- CachingGitBackend: reuses work across calls
+  - `git status` results cached, keyed by .git/index + HEAD/ref mtimes and a worktree generation
+    counter (bumped by the file index / bridge writes), bounded by max_age
+  - one long-lived `git cat-file --batch` process for blob reads
+- patch_tools.run_git and bridge_server._run_git both go through the registered backend
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Callable, Dict, List, Optional, Tuple
+
+GitResult = Tuple[int, str, str]
+
+# git subcommands that can change index/HEAD/worktree (a --check/--dry-run run does not)
+_MUTATING = {"apply", "checkout", "reset", "commit", "add", "rm", "mv", "stash", "merge", "rebase", "restore", "switch"}
+
+
+class GitBackend:
+    def __init__(self, repo_root: Path) -> None:
+        self.repo_root = repo_root
+        self.spawns = 0
+        # (subcommand, seconds) after every git call, e.g. for metrics
+        self.on_command: Optional[Callable[[str, float], None]] = None
+
+    def _observe(self, command: str, started: float) -> None:
+        if self.on_command is not None:
+            self.on_command(command, time.perf_counter() - started)
+
+    def run(
+        self, args: List[str], stdin: Optional[str] = None, cwd: Optional[Path] = None, env: Optional[Dict[str, str]] = None
+    ) -> GitResult:
+        self.spawns += 1
+        started = time.perf_counter()
+        p = subprocess.run(
+            ["git", *args],
+            cwd=str(cwd or self.repo_root),
+            env={**os.environ, **env} if env else None,
+            input=stdin,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding="utf-8",
+            errors="replace",
+        )
+        self._observe(args[0] if args else "", started)
+        return p.returncode, p.stdout, p.stderr
+
+    def status_porcelain(self, branch: bool = False) -> GitResult:
+        return self.run(["status", "--porcelain=v1", *(["-b"] if branch else [])])
+
+    def status_age(self, branch: bool = False) -> Optional[float]:
+        """
+        Seconds since the status returned by the last status_porcelain() was computed (0 = fresh).
+        """
+        return 0.0
+
+    def read_blob(self, spec: str) -> Optional[bytes]:
+        """
+        Raw object content for a blob spec ("<oid>" or "HEAD:path"), None if missing.
+        """
+        self.spawns += 1
+        started = time.perf_counter()
+        p = subprocess.run(["git", "cat-file", "blob", spec], cwd=str(self.repo_root), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._observe("cat-file", started)
+        return p.stdout if p.returncode == 0 else None
+
+    def invalidate(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class _CachedStatus:
+    signature: Tuple[object, ...]
+    result: GitResult
+    computed_at: float
+
+
+class CachingGitBackend(GitBackend):
+    def __init__(self, repo_root: Path, max_age: float = 2.0) -> None:
+        super().__init__(repo_root)
+        self.max_age = max_age
+        self._git_dir = _find_git_dir(repo_root)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._status: Dict[bool, _CachedStatus] = {}
+        self._last_age: Dict[bool, float] = {}
+        self._batch: Optional[subprocess.Popen] = None
+        self._batch_lock = threading.Lock()
+        self.status_hits = 0
+        self.status_misses = 0
+
+    # ---------- invalidation ----------
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+
+    def _signature(self) -> Tuple[object, ...]:
+        sig: List[object] = [self._generation]
+        if self._git_dir is None:
+            return tuple(sig)
+        files = ["index", "HEAD", "packed-refs"]
+        try:
+            head = (self._git_dir / "HEAD").read_text(encoding="utf-8", errors="replace").strip()
+            if head.startswith("ref: "):
+                files.append(head[5:])
+        except OSError:
+            pass
+        for name in files:
+            try:
+                st = os.stat(self._git_dir / name)
+                sig.append((name, st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append((name, None))
+        return tuple(sig)
+
+    # ---------- commands ----------
+
+    def run(
+        self, args: List[str], stdin: Optional[str] = None, cwd: Optional[Path] = None, env: Optional[Dict[str, str]] = None
+    ) -> GitResult:
+        res = super().run(args, stdin, cwd=cwd, env=env)
+        if cwd is None and args and args[0] in _MUTATING and "--check" not in args and "--dry-run" not in args:
+            self.invalidate()
+        return res
+
+    def status_porcelain(self, branch: bool = False) -> GitResult:
+        sig = self._signature()
+        now = time.time()
+        with self._lock:
+            cached = self._status.get(branch)
+            if cached is not None and cached.signature == sig and now - cached.computed_at <= self.max_age:
+                self.status_hits += 1
+                self._last_age[branch] = now - cached.computed_at
+                return cached.result
+            self.status_misses += 1
+        res = super().status_porcelain(branch)
+        # status may refresh (rewrite) .git/index itself: key the result by the state it left behind
+        post_sig = self._signature()
+        with self._lock:
+            if res[0] == 0:
+                self._status[branch] = _CachedStatus(post_sig, res, now)
+            self._last_age[branch] = 0.0
+        return res
+
+    def status_age(self, branch: bool = False) -> Optional[float]:
+        with self._lock:
+            return self._last_age.get(branch)
+
+    def read_blob(self, spec: str) -> Optional[bytes]:
+        with self._batch_lock:
+            for attempt in (0, 1):
+                proc = self._ensure_batch()
+                started = time.perf_counter()
+                try:
+                    assert proc.stdin is not None and proc.stdout is not None
+                    proc.stdin.write(spec.encode("utf-8") + b"\n")
+                    proc.stdin.flush()
+                    data = _read_batch_reply(proc.stdout)
+                    self._observe("cat-file --batch", started)
+                    return data
+                except (BrokenPipeError, OSError, ValueError):
+                    self._close_batch()
+                    if attempt:
+                        raise
+        return None
+
+    def close(self) -> None:
+        with self._batch_lock:
+            self._close_batch()
+
+    # ---------- cat-file --batch (caller holds _batch_lock) ----------
+
+    def _ensure_batch(self) -> subprocess.Popen:
+        if self._batch is None or self._batch.poll() is not None:
+            self.spawns += 1
+            self._batch = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=str(self.repo_root),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._batch
+
+    def _close_batch(self) -> None:
+        if self._batch is None:
+            return
+        try:
+            if self._batch.stdin:
+                self._batch.stdin.close()
+            self._batch.wait(timeout=2)
+        except Exception:
+            self._batch.kill()
+        self._batch = None
+
+
+def _read_batch_reply(out: IO[bytes]) -> Optional[bytes]:
+    header = out.readline()
+    if not header:
+        raise ValueError("git cat-file --batch exited")
+    parts = header.rstrip(b"\n").split(b" ")
+    if len(parts) < 3 or parts[-1] == b"missing":
+        return None
+    size = int(parts[2])
+    data = out.read(size)
+    out.read(1)  # trailing LF
+    if parts[1] != b"blob":
+        return None
+    return data
+
+
+def _find_git_dir(repo_root: Path) -> Optional[Path]:
+    dot_git = repo_root / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        # worktrees / submodules: "gitdir: <path>"
+        try:
+            line = dot_git.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        if line.startswith("gitdir:"):
+            p = Path(line[7:].strip())
+            return p if p.is_absolute() else (repo_root / p).resolve()
+    return None
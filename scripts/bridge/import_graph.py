@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# scripts/bridge/import_graph.py
+"""
+Import / export dependency graph of the TS/JS sources, built on the symbol index.
+
+- Edges come from the symbol index imports (import, export ... from, import(), require())
+- Module resolution without touching the disk, against the indexed file set:
+  - relative specifiers, tsconfig.json compilerOptions.paths aliases ("@/*" -> "./*") and baseUrl,
+    following "extends" (relative files and packages under node_modules)
+  - extensions .ts/.tsx/.d.ts/.js/... and <dir>/index.*; React Native platform variants
+    (foo.ios.tsx, foo.web.ts, ...) when there is no plain foo.*
+  - bare package imports ("react") are external, not graph nodes
+- Incremental: only re-scanned files have their edges rebuilt, plus dependents of deleted files and,
+  when files appear, files that had unresolved imports, importers of the files a new one shadows
+  (foo.ts over foo/index.ts, icon.tsx over icon.ios.tsx, ...) and importers resolved through a later
+  alias target; a tsconfig change rebuilds everything
+- dependents / dependencies queries, direct or transitive (BFS with depth), in memory
+- `python -m scripts.bridge.import_graph` creates / deletes module files at random in a temp repo and
+  compares the incrementally synced graph with a full rebuild after every step
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import posixpath
+import random
+import re
+import sys
+import tempfile
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from scripts.bridge.file_index import FileIndex
+from scripts.bridge.symbol_index import ImportRef, SymbolIndex
+from scripts.bridge.walker import DENY_DIRS, RepoWalker
+
+RESOLVE_EXTENSIONS = (".ts", ".tsx", ".d.ts", ".mts", ".cts", ".js", ".jsx", ".mjs", ".cjs")
+PLATFORM_SUFFIXES = (".native", ".ios", ".android", ".web")
+MAX_EXTENDS_DEPTH = 8
+
+_JSONC_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/|,(?=\s*[}\]])', re.S)
+
+
+def load_jsonc(text: str) -> Dict:
+    """
+    tsconfig-style JSON: // and /* */ comments and trailing commas allowed.
+    """
+    cleaned = _JSONC_TOKEN.sub(lambda m: m.group(0) if m.group(0).startswith('"') else "", text)
+    data = json.loads(cleaned)
+    return data if isinstance(data, dict) else {}
+
+
+class PathAliases:
+    """
+    compilerOptions.baseUrl + paths from a tsconfig.json chain, as repo-relative posix targets.
+    """
+
+    def __init__(self, repo_root: Path, config: str = "tsconfig.json") -> None:
+        self.repo_root = repo_root
+        self.config = config
+        self.base_url: Optional[str] = None
+        self.patterns: List[Tuple[str, str, List[str]]] = []  # (prefix, suffix, targets with "*")
+        self.signature: Tuple = ()
+        self.error = ""
+        self.load()
+
+    def _stat_signature(self, files: List[Path]) -> Tuple:
+        sig = []
+        for f in files:
+            try:
+                st = os.stat(f)
+                sig.append((str(f), st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append((str(f), None))
+        return tuple(sig)
+
+    def _rel(self, p: Path) -> Optional[str]:
+        try:
+            rel = p.resolve().relative_to(self.repo_root.resolve()).as_posix()
+        except (ValueError, OSError):
+            return None
+        return "" if rel == "." else rel
+
+    def _extends_path(self, spec: str, from_dir: Path) -> Optional[Path]:
+        if spec.startswith("."):
+            p = (from_dir / spec)
+        else:
+            p = self.repo_root / "node_modules" / spec
+        for cand in (p, p.with_name(p.name + ".json"), p / "tsconfig.json"):
+            if cand.is_file():
+                return cand
+        return None
+
+    def load(self) -> None:
+        self.base_url, self.patterns, self.error = None, [], ""
+        chain: List[Path] = []
+        path: Optional[Path] = self.repo_root / self.config
+        base_url: Optional[str] = None
+        paths: Optional[Dict[str, List[str]]] = None
+        paths_dir: Optional[Path] = None
+        # nearest config wins: walk the extends chain, keep the first baseUrl / paths seen
+        while path is not None and path.is_file() and len(chain) < MAX_EXTENDS_DEPTH:
+            chain.append(path)
+            try:
+                data = load_jsonc(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                self.error = f"{path.name}: {e}"
+                break
+            opts = data.get("compilerOptions") or {}
+            if base_url is None and isinstance(opts.get("baseUrl"), str):
+                base_url = self._rel(path.parent / opts["baseUrl"])
+            if paths is None and isinstance(opts.get("paths"), dict):
+                paths, paths_dir = opts["paths"], path.parent
+            ext = data.get("extends")
+            path = self._extends_path(ext, path.parent) if isinstance(ext, str) else None
+        self.signature = self._stat_signature(chain or [self.repo_root / self.config])
+        self.base_url = base_url
+        if paths:
+            # paths are relative to baseUrl, or to the declaring tsconfig without one
+            root_rel = base_url if base_url is not None else (self._rel(paths_dir) if paths_dir else "")
+            for key, targets in paths.items():
+                if not isinstance(targets, list):
+                    continue
+                prefix, star, suffix = key.partition("*")
+                resolved = []
+                for t in targets:
+                    if isinstance(t, str):
+                        joined = posixpath.normpath(posixpath.join(root_rel or "", t)) if root_rel else posixpath.normpath(t)
+                        resolved.append("" if joined == "." else joined)
+                self.patterns.append((prefix, suffix if star else "\0exact", resolved))
+            # most specific (longest prefix) first, as TypeScript does
+            self.patterns.sort(key=lambda p: -len(p[0]))
+
+    def changed(self) -> bool:
+        return self._stat_signature([Path(s[0]) for s in self.signature]) != self.signature
+
+    def expand(self, spec: str) -> Tuple[List[str], bool]:
+        """
+        Repo-relative candidate bases for a non-relative specifier, and whether an alias matched.
+        """
+        for prefix, suffix, targets in self.patterns:
+            if suffix == "\0exact":
+                if spec == prefix:
+                    return targets, True
+                continue
+            if spec.startswith(prefix) and spec.endswith(suffix) and len(spec) >= len(prefix) + len(suffix):
+                middle = spec[len(prefix) : len(spec) - len(suffix)]
+                return [t.replace("*", middle, 1) for t in targets], True
+        if self.base_url is not None:
+            return [posixpath.normpath(posixpath.join(self.base_url, spec)) if self.base_url else spec], False
+        return [], False
+
+
+class ImportGraph:
+    def __init__(self, symbols: SymbolIndex, repo_root: Path) -> None:
+        self.symbols = symbols
+        self.repo_root = repo_root
+        self._lock = threading.Lock()
+        self._files: Set[str] = set()
+        self._deps: Dict[str, Set[str]] = {}
+        self._rdeps: Dict[str, Set[str]] = {}
+        self._unresolved: Dict[str, List[str]] = {}  # file -> local-looking specifiers that did not resolve
+        self._alias_fallbacks: Set[str] = set()  # files with an import resolved by a non-first alias target
+        self._pending: Set[str] = set()
+        self._built = False
+        self.aliases = PathAliases(repo_root)
+        symbols.listeners.append(self._on_rescanned)
+
+    def _on_rescanned(self, paths: List[str]) -> None:
+        with self._lock:
+            self._pending.update(paths)
+
+    # ---------- resolution ----------
+
+    def _lookup(self, base: str) -> List[str]:
+        """
+        Indexed files a module base path ("components/Button", "types/order.ts") refers to.
+        """
+        if base in self._files:
+            return [base]
+        for ext in RESOLVE_EXTENSIONS:
+            if base + ext in self._files:
+                return [base + ext]
+        for ext in RESOLVE_EXTENSIONS:
+            if f"{base}/index{ext}" in self._files:
+                return [f"{base}/index{ext}"]
+        # React Native: only platform-specific files exist (icon.ios.tsx + icon.tsx is caught above)
+        return [base + plat + ext for plat in PLATFORM_SUFFIXES for ext in RESOLVE_EXTENSIONS if base + plat + ext in self._files]
+
+    @staticmethod
+    def _module_bases(path: str) -> List[str]:
+        """
+        Module base paths _lookup() can resolve to path (the file itself, minus an extension,
+        its directory for an index file, minus a platform suffix).
+        """
+        bases = [path]
+        for ext in RESOLVE_EXTENSIONS:
+            if not path.endswith(ext):
+                continue
+            stem = path[: -len(ext)]
+            bases.append(stem)
+            if posixpath.basename(stem) == "index" and "/" in stem:
+                bases.append(posixpath.dirname(stem))
+            bases += [stem[: -len(plat)] for plat in PLATFORM_SUFFIXES if stem.endswith(plat)]
+        return bases
+
+    def resolve(self, importer: str, spec: str) -> Tuple[List[str], bool]:
+        """
+        Files spec (imported from importer) resolves to, and whether it looked local
+        (relative / alias / baseUrl) so that an empty result is worth reporting.
+        """
+        hit, local, _ = self._resolve(importer, spec)
+        return hit, local
+
+    def _resolve(self, importer: str, spec: str) -> Tuple[List[str], bool, bool]:
+        # third value: resolved by a later alias target (a new file can make an earlier one win)
+        if spec.startswith("./") or spec.startswith("../") or spec in (".", ".."):
+            base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), spec))
+            return ([] if base.startswith("..") else self._lookup(base)), True, False
+        if spec.startswith("/"):
+            return [], False, False
+        bases, aliased = self.aliases.expand(spec)
+        for i, base in enumerate(bases):
+            hit = self._lookup(base)
+            if hit:
+                return hit, True, i > 0
+        return [], aliased, False
+
+    # ---------- build / update (caller holds lock) ----------
+
+    def _set_edges(self, path: str, imports: Optional[List[ImportRef]]) -> None:
+        for dep in self._deps.pop(path, set()):
+            rd = self._rdeps.get(dep)
+            if rd is not None:
+                rd.discard(path)
+        self._unresolved.pop(path, None)
+        self._alias_fallbacks.discard(path)
+        if imports is None:
+            return
+        deps: Set[str] = set()
+        missing: List[str] = []
+        for ref in imports:
+            hit, local, fallback = self._resolve(path, ref.source)
+            if hit:
+                deps.update(h for h in hit if h != path)
+                if fallback:
+                    self._alias_fallbacks.add(path)
+            elif local:
+                missing.append(ref.source)
+        self._deps[path] = deps
+        for dep in deps:
+            self._rdeps.setdefault(dep, set()).add(path)
+        if missing:
+            self._unresolved[path] = sorted(set(missing))
+
+    def _rebuild(self) -> None:
+        snapshot = self.symbols.imports_snapshot()
+        self._files = set(snapshot)
+        self._deps, self._rdeps, self._unresolved = {}, {}, {}
+        self._alias_fallbacks = set()
+        for path, imports in snapshot.items():
+            self._set_edges(path, imports)
+        self._built = True
+
+    def sync(self) -> None:
+        """
+        Bring the graph up to date with the symbol index (and tsconfig.json).
+        """
+        self.symbols.sync()
+        with self._lock:
+            if self.aliases.changed():
+                self.aliases.load()
+                self._built = False
+            pending, self._pending = self._pending, set()
+            if not self._built:
+                self._rebuild()
+                return
+            if not pending:
+                return
+            current = self.symbols.imports_of(sorted(pending))
+            added = {p for p, imps in current.items() if imps is not None and p not in self._files}
+            removed = {p for p, imps in current.items() if imps is None and p in self._files}
+            # module bases a new file can take over, with what they resolved to before it existed
+            shadowed = {base: self._lookup(base) for p in added for base in self._module_bases(p)}
+            self._files |= added
+            self._files -= removed
+            redo: Set[str] = {p for p, imps in current.items() if imps is not None}
+            if added:
+                redo |= set(self._unresolved)  # a new file may be what they were missing
+                redo |= self._alias_fallbacks  # ... or an earlier alias target
+                for base, before in shadowed.items():
+                    if before and self._lookup(base) != before:
+                        for old in before:
+                            redo |= self._rdeps.get(old, set())
+            for p in removed:
+                redo |= self._rdeps.get(p, set())
+                self._set_edges(p, None)
+                self._rdeps.pop(p, None)
+            redo -= removed
+            extra = self.symbols.imports_of(sorted(redo - set(current)))
+            for p in redo:
+                imps = current.get(p) if p in current else extra.get(p)
+                self._set_edges(p, imps)
+
+    def verify(self) -> List[str]:
+        """
+        Differences between the incrementally synced graph and a full rebuild (which is kept).
+        """
+        self.sync()
+        with self._lock:
+            files, deps, unresolved = self._files, self._deps, self._unresolved
+            self._rebuild()
+            bad = [f"file {p}: incremental={p in files}" for p in sorted(files ^ self._files)]
+            for p in sorted(set(deps) | set(self._deps)):
+                a, b = sorted(deps.get(p, ())), sorted(self._deps.get(p, ()))
+                if a != b:
+                    bad.append(f"deps {p}: incremental={a} rebuild={b}")
+            for p in sorted(set(unresolved) | set(self._unresolved)):
+                if unresolved.get(p) != self._unresolved.get(p):
+                    bad.append(f"unresolved {p}: incremental={unresolved.get(p)} rebuild={self._unresolved.get(p)}")
+            return bad
+
+    # ---------- queries ----------
+
+    def _walk(self, start: Iterable[str], edges: Dict[str, Set[str]], transitive: bool, max_depth: int, limit: int) -> Tuple[Dict[str, int], bool]:
+        roots = set(start)
+        seen: Dict[str, int] = {}
+        queue = deque((p, 0) for p in roots)
+        while queue:
+            node, depth = queue.popleft()
+            if depth >= (max_depth if transitive else 1):
+                continue
+            for nxt in sorted(edges.get(node, ())):
+                if nxt in roots or nxt in seen:
+                    continue
+                if len(seen) >= limit:
+                    return seen, True
+                seen[nxt] = depth + 1
+                queue.append((nxt, depth + 1))
+        return seen, False
+
+    def dependents(self, paths: List[str], transitive: bool = False, max_depth: int = 50, limit: int = 5000) -> Tuple[Dict[str, int], bool]:
+        """
+        Files importing any of paths (directly, or through other files when transitive): path -> depth.
+        """
+        self.sync()
+        with self._lock:
+            return self._walk(paths, self._rdeps, transitive, max_depth, limit)
+
+    def dependencies(self, paths: List[str], transitive: bool = False, max_depth: int = 50, limit: int = 5000) -> Tuple[Dict[str, int], bool]:
+        """
+        Indexed files paths import (directly, or transitively): path -> depth.
+        """
+        self.sync()
+        with self._lock:
+            return self._walk(paths, self._deps, transitive, max_depth, limit)
+
+    def impact(self, paths: List[str], max_depth: int = 50, limit: int = 500) -> Dict[str, object]:
+        """
+        Blast radius of changing paths: direct and transitive dependents (capped at limit in total).
+        """
+        found, truncated = self.dependents(paths, transitive=True, max_depth=max_depth, limit=limit)
+        return {
+            "direct": sorted(p for p, d in found.items() if d == 1),
+            "transitive": sorted(p for p, d in found.items() if d > 1),
+            "total": len(found),
+            "truncated": truncated,
+        }
+
+    def unresolved(self, paths: List[str]) -> Dict[str, List[str]]:
+        with self._lock:
+            return {p: self._unresolved[p] for p in paths if p in self._unresolved}
+
+    def known(self, path: str) -> bool:
+        with self._lock:
+            return path in self._files
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "edges": sum(len(d) for d in self._deps.values()),
+                "unresolvedFiles": len(self._unresolved),
+            }
+
+
+def differential_check(root: Path, seed: int, steps: int) -> Tuple[int, List[str]]:
+    """
+    Random create / delete steps over module files that shadow each other (foo.ts, foo/index.ts,
+    foo.ios.tsx, alias targets, ...) under root; after each one the incrementally synced graph is
+    compared with a full rebuild. Returns: steps run, mismatch descriptions
+    """
+    rnd = random.Random(seed)
+    (root / "tsconfig.json").write_text('{"compilerOptions": {"paths": {"@/*": ["src/*", "*"]}}}', encoding="utf-8")
+    (root / "app").mkdir(parents=True, exist_ok=True)
+    (root / "app" / "a.ts").write_text('import "../foo";\nimport "@/foo";\nimport "../lib/icon";\nimport "@/lib/icon";\n', encoding="utf-8")
+    (root / "app" / "b.tsx").write_text('export * from "../foo/index";\nconst m = require("../types/order");\n', encoding="utf-8")
+    pool = [
+        "foo.ts", "foo.tsx", "foo.js", "foo/index.ts", "foo/index.tsx", "foo.ios.tsx", "foo.web.ts",
+        "src/foo.ts", "src/foo/index.ts", "lib/icon.tsx", "lib/icon.ios.tsx", "lib/icon.android.tsx",
+        "lib/icon/index.ts", "src/lib/icon.ts", "types/order.ts", "types/order.d.ts", "types/order/index.ts",
+    ]
+    file_index = FileIndex(root, is_allowed=lambda rel: True, walker=RepoWalker(root, deny_dirs=DENY_DIRS))
+    file_index.build()
+    symbols = SymbolIndex(file_index, None)
+    graph = ImportGraph(symbols, root)
+    graph.sync()
+    bad: List[str] = []
+    for step in range(steps):
+        rel = rnd.choice(pool)
+        path = root / rel
+        if path.exists():
+            path.unlink()
+            action = "delete"
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"export const x{step} = 1;\n", encoding="utf-8")
+            action = "create"
+        parent = posixpath.dirname(rel)
+        dirs = [""] + ["/".join(parent.split("/")[: i + 1]) for i in range(len(parent.split("/")))] if parent else [""]
+        file_index.refresh_paths(dirs, [rel])
+        bad += [f"step {step} ({action} {rel}): {line}" for line in graph.verify()]
+        if bad:
+            return step + 1, bad
+    return steps, bad
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Differential check: incremental import graph vs full rebuild")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--steps", type=int, default=500, help="Random create / delete steps")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="import-graph-") as tmp:
+        n, bad = differential_check(Path(tmp), args.seed, args.steps)
+    for line in bad[:50]:
+        print(line)
+    print(f"[import-graph] steps={n} mismatches={len(bad)}")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
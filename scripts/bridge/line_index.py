@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# scripts/bridge/line_index.py
+"""
+Line-offset index for ranged /repo/read.
+
+- One LineIndex per (path, mtime_ns, size): byte offset of every line start
+- Built lazily: only scanned as far as the highest line requested so far
+- Ranged reads then seek straight to the slice (no reading of earlier lines' content into Python)
+"""
+
+from __future__ import annotations
+
+import threading
+from array import array
+from collections import OrderedDict
+from typing import BinaryIO, Hashable, Optional, Tuple
+
+SCAN_CHUNK_BYTES = 1024 * 1024
+MAX_CACHED_INDEXES = 256
+
+
+class LineIndex:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.starts = array("Q", [0])  # byte offset of line N+1 at starts[N]
+        self.scanned_to = 0
+        self.complete = size == 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_lines(self) -> Optional[int]:
+        if not self.complete:
+            return None
+        if self.size == 0:
+            return 0
+        # a trailing newline does not open another line
+        n = len(self.starts)
+        return n - 1 if n > 1 and self.starts[-1] >= self.size else n
+
+    def ensure(self, f: BinaryIO, line: int) -> None:
+        """
+        Scan until the start of `line` (1-based) is known or EOF.
+        """
+        with self._lock:
+            if self.complete or len(self.starts) > line:
+                return
+            f.seek(self.scanned_to)
+            while len(self.starts) <= line:
+                chunk = f.read(SCAN_CHUNK_BYTES)
+                if not chunk:
+                    self.complete = True
+                    return
+                base = self.scanned_to
+                i = chunk.find(b"\n")
+                while i != -1:
+                    self.starts.append(base + i + 1)
+                    i = chunk.find(b"\n", i + 1)
+                self.scanned_to = base + len(chunk)
+            if self.scanned_to >= self.size:
+                self.complete = True
+
+    def byte_span(self, f: BinaryIO, start_line: int, end_line: Optional[int]) -> Tuple[int, int]:
+        """
+        [start, end) byte offsets for lines start_line..end_line (1-based, inclusive; None = to EOF).
+        """
+        self.ensure(f, start_line if end_line is None else end_line)
+        if start_line - 1 >= len(self.starts):
+            return self.size, self.size
+        start = self.starts[start_line - 1]
+        if end_line is None or end_line >= len(self.starts):
+            return start, self.size
+        return start, self.starts[end_line]
+
+
+class LineIndexCache:
+    def __init__(self, max_entries: int = MAX_CACHED_INDEXES) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Hashable, LineIndex]" = OrderedDict()
+
+    def get(self, key: Hashable, size: int) -> LineIndex:
+        with self._lock:
+            idx = self._items.get(key)
+            if idx is None:
+                idx = LineIndex(size)
+                self._items[key] = idx
+                while len(self._items) > self.max_entries:
+                    self._items.popitem(last=False)
+            else:
+                self._items.move_to_end(key)
+            return idx
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# scripts/bridge/metrics.py
+"""
+Minimal Prometheus-style metrics for the bridge (text exposition format 0.0.4, no dependencies).
+
+- Counter / Histogram with fixed label names, thread-safe
+- Collectors: callbacks sampled at scrape time (cache stats, git spawns, index sizes)
+- One process-wide registry (METRICS), rendered by GET /metrics
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, v in sorted(self._values.items()):
+                out.append(f"{self.name}{_labels(self.labelnames, labels)} {_num(v)}")
+        return out
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> (per-bucket counts (last = +Inf), sum)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[i] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                acc = 0
+                for bound, c in zip((*self.buckets, float("inf")), counts):
+                    acc += c
+                    le = 'le="%s"' % _num(bound)
+                    out.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {acc}")
+                out.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(total[0])}")
+                out.append(f"{self.name}_count{_labels(self.labelnames, labels)} {acc}")
+        return out
+
+
+Collector = Callable[[], List[Tuple[str, str, str, float]]]  # -> [(name, type, help, value)]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Collector] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        with self._lock:
+            m = self._metrics.setdefault(name, Counter(name, help, labelnames))
+        assert isinstance(m, Counter)
+        return m
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        with self._lock:
+            m = self._metrics.setdefault(name, Histogram(name, help, labelnames, buckets))
+        assert isinstance(m, Histogram)
+        return m
+
+    def add_collector(self, fn: Collector) -> None:
+        with self._lock:
+            self._collectors.append(fn)
+
+    def remove_collector(self, fn: Collector) -> None:
+        with self._lock:
+            if fn in self._collectors:
+                self._collectors.remove(fn)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())  # type: ignore[attr-defined]
+        for fn in collectors:
+            try:
+                samples = fn()
+            except Exception:
+                continue
+            for name, kind, help, value in samples:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_num(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Registry()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# scripts/bridge/parking.py
+"""
+Connections held off the worker pool while they wait for something.
+
+- Idle keep-alive connections: registered with a selector; when the socket turns readable (next request
+  or EOF) the connection is handed back to a worker; idle longer than the keep-alive timeout -> closed
+- Suspended requests (/repo/changes long-poll / SSE): a ready() predicate, re-checked on wake()
+  (change feed records) and when parked, plus a deadline; the continuation then runs on a worker
+- One thread, one selector: other threads hand items over through a queue + socketpair wakeup,
+  so a worker only ever runs requests that have work to do
+"""
+
+from __future__ import annotations
+
+import selectors
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+@dataclass
+class Suspension:
+    deadline: float  # time.monotonic()
+    ready: Callable[[], bool]
+    resume: Callable[[bool], None]  # called with timed_out
+
+
+@dataclass
+class _Idle:
+    sock: socket.socket
+    deadline: Optional[float]
+    on_ready: Callable[[], None]
+    close: Callable[[], None]
+
+
+@dataclass
+class _Waiter:
+    suspension: Suspension
+    on_done: Callable[[bool], None]
+    close: Callable[[], None]
+
+
+class Parking:
+    def __init__(self, submit: Callable[..., Any]) -> None:
+        self._submit = submit
+        self._sel = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._sel.register(self._wake_r, selectors.EVENT_READ, None)
+        self._lock = threading.Lock()
+        self._incoming: List[Union[_Idle, _Waiter]] = []
+        self._woken = False
+        self._closed = False
+        self._idle: Dict[int, _Idle] = {}
+        self._waiters: List[_Waiter] = []
+        self._thread = threading.Thread(target=self._loop, name="bridge-parking", daemon=True)
+        self._thread.start()
+
+    # ---------- producers (any thread) ----------
+
+    def park(self, sock: socket.socket, idle_timeout: Optional[float], on_ready: Callable[[], None], close: Callable[[], None]) -> None:
+        """
+        Hold an idle connection until it is readable (on_ready on a worker) or idle_timeout passes (close).
+        """
+        deadline = time.monotonic() + idle_timeout if idle_timeout else None
+        self._hand_over(_Idle(sock, deadline, on_ready, close), close)
+
+    def wait(self, suspension: Suspension, on_done: Callable[[bool], None], close: Callable[[], None]) -> None:
+        """
+        Hold a suspended request until suspension.ready() or its deadline; on_done(timed_out) runs on a worker.
+        """
+        self._hand_over(_Waiter(suspension, on_done, close), close)
+
+    def wake(self) -> None:
+        """
+        Something waiters may be waiting for happened: re-check their ready() predicates.
+        """
+        with self._lock:
+            self._woken = True
+        self._poke()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._incoming)
+            return {"idle": len(self._idle), "waiting": len(self._waiters), "pending": pending}
+
+    def close(self) -> None:
+        """
+        Stop the loop; every parked connection and suspended request is closed.
+        """
+        with self._lock:
+            self._closed = True
+        self._poke()
+        self._thread.join(timeout=5)
+
+    def _hand_over(self, item: Union[_Idle, _Waiter], close: Callable[[], None]) -> None:
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._incoming.append(item)
+        if closed:
+            close()
+            return
+        self._poke()
+
+    def _poke(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass  # buffer full: a wakeup is already pending
+
+    # ---------- loop ----------
+
+    def _dispatch(self, fn: Callable[..., None], *args: Any, close: Callable[[], None]) -> None:
+        try:
+            self._submit(fn, *args)
+        except RuntimeError:  # pool shut down
+            close()
+
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                incoming, self._incoming = self._incoming, []
+                woken, self._woken = self._woken, False
+                closed = self._closed
+            if closed:
+                for item in incoming:
+                    item.close()
+                break
+            for item in incoming:
+                if isinstance(item, _Waiter):
+                    self._waiters.append(item)
+                    woken = True  # may have become ready between the handler's check and now
+                    continue
+                try:
+                    self._sel.register(item.sock, selectors.EVENT_READ, item)
+                    self._idle[item.sock.fileno()] = item
+                except (ValueError, KeyError, OSError):
+                    self._dispatch(item.on_ready, close=item.close)  # let the worker see the error
+
+            now = time.monotonic()
+            keep: List[_Waiter] = []
+            for w in self._waiters:
+                if woken and self._is_ready(w):
+                    self._dispatch(w.on_done, False, close=w.close)
+                elif w.suspension.deadline <= now:
+                    self._dispatch(w.on_done, True, close=w.close)
+                else:
+                    keep.append(w)
+            self._waiters = keep
+            for fd, idle in list(self._idle.items()):
+                if idle.deadline is not None and idle.deadline <= now:
+                    self._unregister(fd, idle)
+                    idle.close()
+
+            deadlines = [w.suspension.deadline for w in self._waiters]
+            deadlines += [i.deadline for i in self._idle.values() if i.deadline is not None]
+            timeout = max(0.0, min(deadlines) - now) if deadlines else None
+            for key, _ in self._sel.select(timeout):
+                if key.data is None:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                    continue
+                idle = key.data
+                self._unregister(idle.sock.fileno(), idle)
+                self._dispatch(idle.on_ready, close=idle.close)
+
+        for fd, idle in list(self._idle.items()):
+            self._unregister(fd, idle)
+            idle.close()
+        for w in self._waiters:
+            w.close()
+        self._waiters = []
+        self._sel.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def _is_ready(self, w: _Waiter) -> bool:
+        try:
+            return bool(w.suspension.ready())
+        except Exception:
+            return True  # let the continuation run and report
+
+    def _unregister(self, fd: int, idle: _Idle) -> None:
+        self._idle.pop(fd, None)
+        try:
+            self._sel.unregister(idle.sock)
+        except (KeyError, ValueError, OSError):
+            pass
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# scripts/bridge/patch_journal.py
+"""
+Append-only journal of applied patches (revert by id, no diff resubmission).
+
+- One JSON line per event in <state dir>/journal/journal.jsonl ("apply" entries, "revert" markers)
+- Each apply entry: id, endpoint, time, and per touched path the pre-/post-image blob ids
+  (git-compatible sha1 of "blob <size>\\0<data>", None = file absent)
+- Blobs live in a content-addressed store next to the journal (journal/blobs/ab/cdef...), so they
+  survive `git gc`; without a state dir everything is kept in memory for the session
+- Revert restores the stored pre-images directly (no diff parsing, no git); a file whose current
+  content no longer matches the recorded post-image is reported as drifted
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from scripts.bridge.patch_tools import write_file_atomic
+
+JOURNAL_FILENAME = "journal.jsonl"
+
+
+def blob_id(data: bytes) -> str:
+    h = hashlib.sha1(b"blob %d\0" % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+
+@dataclass
+class JournalEntry:
+    id: str
+    endpoint: str
+    ts: float
+    paths: Dict[str, Tuple[Optional[str], Optional[str]]]  # rel -> (pre blob, post blob)
+    reverted: bool = False
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "endpoint": self.endpoint,
+            "ts": self.ts,
+            "paths": {rel: {"pre": pre, "post": post} for rel, (pre, post) in self.paths.items()},
+            "reverted": self.reverted,
+        }
+
+
+@dataclass
+class RevertResult:
+    ok: bool
+    error: str = ""
+    restored: List[str] = field(default_factory=list)
+    drifted: List[str] = field(default_factory=list)
+
+
+class PatchJournal:
+    def __init__(self, repo_root: Path, state_dir: Optional[Path]) -> None:
+        self.repo_root = repo_root
+        self.dir = state_dir / "journal" if state_dir else None
+        self._lock = threading.Lock()
+        self._entries: Dict[str, JournalEntry] = {}
+        self._order: List[str] = []
+        self._mem_blobs: Dict[str, bytes] = {}
+        self._seq = 0
+        self.load()
+
+    # ---------- persistence ----------
+
+    def _journal_path(self) -> Optional[Path]:
+        return self.dir / JOURNAL_FILENAME if self.dir else None
+
+    def load(self) -> None:
+        p = self._journal_path()
+        if p is None or not p.exists():
+            return
+        with open(p, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ev = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                if ev.get("op") == "apply":
+                    e = JournalEntry(
+                        id=ev["id"],
+                        endpoint=ev.get("endpoint", ""),
+                        ts=float(ev.get("ts", 0)),
+                        paths={rel: (v.get("pre"), v.get("post")) for rel, v in ev.get("paths", {}).items()},
+                    )
+                    self._entries[e.id] = e
+                    self._order.append(e.id)
+                elif ev.get("op") == "revert" and ev.get("id") in self._entries:
+                    self._entries[ev["id"]].reverted = True
+        self._seq = len(self._order)
+
+    def _append(self, ev: Dict[str, Any]) -> None:
+        p = self._journal_path()
+        if p is None:
+            return
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with open(p, "a", encoding="utf-8") as f:
+            f.write(json.dumps(ev, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ---------- blob store ----------
+
+    def _blob_path(self, oid: str) -> Optional[Path]:
+        return self.dir / "blobs" / oid[:2] / oid[2:] if self.dir else None
+
+    def _put_blob(self, data: bytes) -> str:
+        oid = blob_id(data)
+        p = self._blob_path(oid)
+        if p is None:
+            self._mem_blobs.setdefault(oid, data)
+        elif not p.exists():
+            write_file_atomic(p, data)
+        return oid
+
+    def _get_blob(self, oid: str) -> Optional[bytes]:
+        p = self._blob_path(oid)
+        if p is None:
+            return self._mem_blobs.get(oid)
+        try:
+            return p.read_bytes()
+        except OSError:
+            return None
+
+    # ---------- recording ----------
+
+    def snapshot(self, rel_paths: List[str]) -> Dict[str, Optional[bytes]]:
+        """
+        Current content of rel_paths (None = absent); call before writing.
+        """
+        out: Dict[str, Optional[bytes]] = {}
+        for rel in rel_paths:
+            p = self.repo_root / rel
+            out[rel] = p.read_bytes() if p.is_file() else None
+        return out
+
+    def record(self, endpoint: str, pre: Dict[str, Optional[bytes]]) -> Optional[JournalEntry]:
+        """
+        Journal an apply whose pre-images were taken with snapshot(). Unchanged paths are dropped;
+        returns None if nothing changed.
+        """
+        post = self.snapshot(list(pre))
+        paths: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        with self._lock:
+            for rel, before in pre.items():
+                after = post[rel]
+                if before == after:
+                    continue
+                paths[rel] = (
+                    self._put_blob(before) if before is not None else None,
+                    blob_id(after) if after is not None else None,
+                )
+            if not paths:
+                return None
+            self._seq += 1
+            entry = JournalEntry(id=f"p{int(time.time())}-{self._seq}", endpoint=endpoint, ts=time.time(), paths=paths)
+            self._append({"op": "apply", **entry.to_json()})
+            self._entries[entry.id] = entry
+            self._order.append(entry.id)
+        return entry
+
+    # ---------- queries ----------
+
+    def get(self, entry_id: str) -> Optional[JournalEntry]:
+        with self._lock:
+            return self._entries.get(entry_id)
+
+    def last(self, n: int) -> List[JournalEntry]:
+        """
+        The n most recent not-yet-reverted entries, newest first.
+        """
+        out: List[JournalEntry] = []
+        with self._lock:
+            for eid in reversed(self._order):
+                e = self._entries[eid]
+                if not e.reverted:
+                    out.append(e)
+                    if len(out) >= n:
+                        break
+        return out
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._entries[eid].to_json() for eid in reversed(self._order[-limit:])]
+
+    # ---------- revert ----------
+
+    def check(self, entries: List[JournalEntry]) -> List[str]:
+        """
+        Paths whose current content is not the post-image left by these entries (newest first).
+        """
+        expected: Dict[str, Optional[str]] = {}
+        for e in entries:
+            for rel, (pre, post) in e.paths.items():
+                expected.setdefault(rel, post)  # newest entry decides what should be on disk now
+        drifted: List[str] = []
+        for rel, post in expected.items():
+            p = self.repo_root / rel
+            cur = blob_id(p.read_bytes()) if p.is_file() else None
+            if cur != post:
+                drifted.append(rel)
+        return drifted
+
+    def revert(self, entries: List[JournalEntry], force: bool = False, dry_run: bool = False) -> RevertResult:
+        """
+        Restore the pre-images of entries (given newest first) as one unit. Refuses on drift unless force.
+        """
+        if any(e.reverted for e in entries):
+            return RevertResult(ok=False, error="already reverted: " + ", ".join(e.id for e in entries if e.reverted))
+        drifted = self.check(entries)
+        if drifted and not force:
+            return RevertResult(ok=False, error="files changed since the patch was applied", drifted=drifted)
+
+        # oldest pre-image wins when several entries touched the same path
+        target: Dict[str, Optional[str]] = {}
+        for e in entries:
+            for rel, (pre, _) in e.paths.items():
+                target[rel] = pre
+        data: Dict[str, Optional[bytes]] = {}
+        for rel, oid in target.items():
+            if oid is None:
+                data[rel] = None
+                continue
+            blob = self._get_blob(oid)
+            if blob is None:
+                return RevertResult(ok=False, error=f"pre-image missing from journal: {rel} ({oid})", drifted=drifted)
+            data[rel] = blob
+        if dry_run:
+            return RevertResult(ok=True, restored=sorted(data), drifted=drifted)
+
+        current = self.snapshot(list(data))
+        done: List[str] = []
+        try:
+            for rel, blob in data.items():
+                write_file_atomic(self.repo_root / rel, blob)
+                done.append(rel)
+        except OSError as e:
+            for rel in done:
+                try:
+                    write_file_atomic(self.repo_root / rel, current[rel])
+                except OSError:
+                    pass
+            return RevertResult(ok=False, error=f"restore failed, rolled back: {e}", drifted=drifted)
+
+        with self._lock:
+            for e in entries:
+                e.reverted = True
+                self._append({"op": "revert", "id": e.id, "ts": time.time()})
+        return RevertResult(ok=True, restored=sorted(data), drifted=drifted)
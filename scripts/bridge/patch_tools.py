@@ -2,12 +2,17 @@
 # scripts/bridge/patch_tools.py
 from __future__ import annotations
 
+import io
+import os
 import re
-import subprocess
 import shutil
-from dataclasses import dataclass
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Dict, Union
+
+from scripts.bridge.git_backend import GitBackend
 
 
 @dataclass
@@ -21,6 +26,16 @@ class PatchPolicy:
 
 _DIFF_FILE_RE = re.compile(r"^(---|\+\+\+) (.+)$")
 
+# `git apply --verbose --reject` output
+_V_CHECKING_RE = re.compile(r"^Checking patch (.+?)\.\.\.$")
+_V_APPLYING_RE = re.compile(r"^Applying patch (.+?) with \d+ rejects?\.\.\.$")
+_V_APPLIED_RE = re.compile(r"^Applied patch (.+?) cleanly\.$")
+_V_HUNK_OK_RE = re.compile(r"^Hunk #(\d+) applied cleanly\.$")
+_V_HUNK_OFFSET_RE = re.compile(r"^Hunk #(\d+) succeeded at (\d+)(?: \(offset (-?\d+) lines?\))?\.$")
+_V_REJECTED_RE = re.compile(r"^Rejected hunk #(\d+)\.$")
+_V_FAILED_RE = re.compile(r"^error: patch failed: (.+):(\d+)$")
+_V_ERROR_RE = re.compile(r"^error: (.+?): (.+)$")
+
 
 def _normalize_diff_path(raw: str) -> Optional[str]:
     """
@@ -68,6 +83,27 @@ def extract_touched_paths(patch_text: str) -> List[str]:
     return out
 
 
+_backends: Dict[Path, GitBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def set_backend(repo_root: Path, backend: GitBackend) -> None:
+    """
+    Register the git backend used for repo_root (the server installs a CachingGitBackend).
+    """
+    with _backends_lock:
+        _backends[repo_root.resolve()] = backend
+
+
+def get_backend(repo_root: Path) -> GitBackend:
+    key = repo_root.resolve()
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            backend = _backends[key] = GitBackend(key)
+        return backend
+
+
 def git_available() -> bool:
     return shutil.which("git") is not None
 
@@ -76,30 +112,40 @@ def run_git(repo_root: Path, args: List[str], patch_stdin: Optional[str] = None)
     """
     Runs git in repo_root. If patch_stdin provided, pipes it to stdin.
     """
-    p = subprocess.run(
-        ["git", *args],
-        cwd=str(repo_root),
-        input=patch_stdin,
-        text=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        encoding="utf-8",
-        errors="replace",
-    )
-    return p.returncode, p.stdout, p.stderr
+    return get_backend(repo_root).run(args, stdin=patch_stdin)
 
 
 def get_git_status_porcelain(repo_root: Path) -> Tuple[int, str, str]:
-    return run_git(repo_root, ["status", "--porcelain=v1"])
+    return get_backend(repo_root).status_porcelain()
 
 
-def validate_clean_worktree(repo_root: Path) -> Tuple[bool, str]:
-    code, out, err = get_git_status_porcelain(repo_root)
+@dataclass
+class CleanCheck:
+    ok: bool
+    message: str
+    # seconds the status result had been cached for (0 = git status just ran, None = unknown)
+    age: Optional[float]
+
+
+def check_clean_worktree(repo_root: Path) -> CleanCheck:
+    """
+    Worktree cleanliness from the backend's status. The caching backend only re-runs
+    `git status` when .git/index/HEAD or the watched worktree changed (or its max age expired).
+    """
+    backend = get_backend(repo_root)
+    code, out, err = backend.status_porcelain()
+    age = backend.status_age()
+    age = round(age, 3) if age is not None else None
     if code != 0:
-        return False, (err or out or "git status failed")
+        return CleanCheck(False, err or out or "git status failed", age)
     if out.strip():
-        return False, "working tree not clean (git status not empty)"
-    return True, ""
+        return CleanCheck(False, "working tree not clean (git status not empty)", age)
+    return CleanCheck(True, "", age)
+
+
+def validate_clean_worktree(repo_root: Path) -> Tuple[bool, str]:
+    c = check_clean_worktree(repo_root)
+    return c.ok, c.message
 
 
 def git_apply_check(repo_root: Path, patch_text: str) -> Tuple[bool, str]:
@@ -117,8 +163,601 @@ def git_apply(repo_root: Path, patch_text: str) -> Tuple[bool, str]:
     return False, (err or out or "git apply failed")
 
 
+@dataclass
+class FileApplyResult:
+    path: str
+    ok: bool = True
+    hunks: int = 0
+    rejected: List[int] = field(default_factory=list)
+    failed_at: List[int] = field(default_factory=list)  # line numbers git could not match
+    offsets: List[Dict[str, int]] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+def count_hunks(patch_text: str) -> Dict[str, int]:
+    """
+    Hunks per target path (new path, or old path for deletions), from the diff headers.
+    """
+    counts: Dict[str, int] = {}
+    old: Optional[str] = None
+    cur: Optional[str] = None
+    for line in patch_text.splitlines():
+        if line.startswith("--- "):
+            old = _normalize_diff_path(line[4:])
+        elif line.startswith("+++ "):
+            cur = _normalize_diff_path(line[4:]) or old
+            if cur:
+                counts.setdefault(cur, 0)
+        elif line.startswith("@@") and cur:
+            counts[cur] += 1
+    return counts
+
+
+def _parse_apply_verbose(output: str, hunk_counts: Dict[str, int]) -> List[FileApplyResult]:
+    results: Dict[str, FileApplyResult] = {}
+
+    def _get(path: str) -> FileApplyResult:
+        path = path.split(" => ")[-1]  # renames: "old => new"
+        if path not in results:
+            results[path] = FileApplyResult(path=path, hunks=hunk_counts.get(path, 0))
+        return results[path]
+
+    cur: Optional[FileApplyResult] = None
+    for line in output.splitlines():
+        m = _V_CHECKING_RE.match(line) or _V_APPLYING_RE.match(line)
+        if m:
+            cur = _get(m.group(1))
+            continue
+        m = _V_APPLIED_RE.match(line)
+        if m:
+            _get(m.group(1))
+            continue
+        m = _V_FAILED_RE.match(line)
+        if m:
+            r = _get(m.group(1))
+            r.ok = False
+            r.failed_at.append(int(m.group(2)))
+            continue
+        if cur is None:
+            continue
+        m = _V_HUNK_OFFSET_RE.match(line)
+        if m:
+            cur.offsets.append({"hunk": int(m.group(1)), "line": int(m.group(2)), "offset": int(m.group(3) or 0)})
+            continue
+        m = _V_REJECTED_RE.match(line)
+        if m:
+            cur.ok = False
+            cur.rejected.append(int(m.group(1)))
+            continue
+        if _V_HUNK_OK_RE.match(line) or line.startswith("error: while searching for"):
+            continue
+        m = _V_ERROR_RE.match(line)
+        if m and not line.startswith("error: patch failed"):
+            r = _get(m.group(1))
+            r.ok = False
+            r.errors.append(m.group(2))
+    return list(results.values())
+
+
+def git_apply_atomic(
+    repo_root: Path, patch_text: str, touched: List[str], dry_run: bool
+) -> Tuple[bool, str, List[Dict[str, Any]]]:
+    """
+    Single-pass apply: touched files are copied into a scratch snapshot, the patch is applied
+    there once (`git apply --reject --verbose`, per-hunk results), and only if every hunk
+    applied are the results promoted into the worktree (per-file temp write + os.replace).
+    On a promotion error the pre-images are restored. The worktree is never left half-patched.
+    """
+    res = git_apply_batch(repo_root, [patch_text], touched, dry_run)
+    return res.ok, res.error, res.files[0] if res.files else []
+
+
+@dataclass
+class BatchApplyResult:
+    ok: bool
+    error: str = ""
+    failed_index: Optional[int] = None  # position of the diff that did not apply
+    files: List[List[Dict[str, Any]]] = field(default_factory=list)  # per diff, per file
+
+
+def git_apply_batch(repo_root: Path, patches: List[str], touched: List[str], dry_run: bool) -> BatchApplyResult:
+    """
+    Apply an ordered list of diffs as one unit: every diff is applied in turn to the same
+    snapshot (later diffs see earlier ones), and the worktree is only written once all of them
+    applied. `touched` must cover every path of every diff.
+    """
+    pre: Dict[str, Optional[bytes]] = {}
+    pre_exec: Dict[str, int] = {}  # executable bits: mode-only diffs change nothing else
+    for rel in touched:
+        p = repo_root / rel
+        pre[rel] = p.read_bytes() if p.is_file() else None
+        pre_exec[rel] = p.stat().st_mode & 0o111 if pre[rel] is not None else 0
+
+    files: List[List[Dict[str, Any]]] = []
+    with tempfile.TemporaryDirectory(prefix="bridge-apply-") as tmp:
+        snap = Path(tmp) / "wt"
+        snap.mkdir()
+        for rel, data in pre.items():
+            if data is not None:
+                (snap / rel).parent.mkdir(parents=True, exist_ok=True)
+                (snap / rel).write_bytes(data)
+                shutil.copymode(repo_root / rel, snap / rel)
+        for i, patch_text in enumerate(patches):
+            # outside any repo: git apply works as a plain patch tool on the snapshot
+            code, out, err = get_backend(repo_root).run(
+                ["apply", "--reject", "--verbose", "--whitespace=nowarn"],
+                stdin=patch_text,
+                cwd=snap,
+                env={"GIT_CEILING_DIRECTORIES": str(Path(tmp))},
+            )
+            results = _parse_apply_verbose(out + "\n" + err, count_hunks(patch_text))
+            files.append([asdict(r) for r in results])
+            if code != 0 or not all(r.ok for r in results):
+                msg = "\n".join(l for l in err.splitlines() if l.startswith("error:")) or err or out or "git apply failed"
+                return BatchApplyResult(ok=False, error=msg, failed_index=i, files=files)
+        post: Dict[str, Optional[bytes]] = {}
+        post_exec: Dict[str, int] = {}
+        for rel in touched:
+            p = snap / rel
+            post[rel] = p.read_bytes() if p.is_file() else None
+            post_exec[rel] = p.stat().st_mode & 0o111 if post[rel] is not None else 0
+
+    if dry_run:
+        return BatchApplyResult(ok=True, files=files)
+
+    done: List[str] = []
+    try:
+        for rel, data in post.items():
+            if data == pre[rel] and post_exec[rel] == pre_exec[rel]:
+                continue
+            done.append(rel)
+            if data != pre[rel]:
+                write_file_atomic(repo_root / rel, data)
+            if data is not None and post_exec[rel] != pre_exec[rel]:
+                _set_exec_bits(repo_root / rel, post_exec[rel])
+    except OSError as e:
+        for rel in done:
+            try:
+                write_file_atomic(repo_root / rel, pre[rel])
+                if pre[rel] is not None:
+                    _set_exec_bits(repo_root / rel, pre_exec[rel])
+            except OSError:
+                pass
+        return BatchApplyResult(ok=False, error=f"promotion failed, rolled back: {e}", files=files)
+    return BatchApplyResult(ok=True, files=files)
+
+
+def _set_exec_bits(target: Path, bits: int) -> None:
+    os.chmod(target, (target.stat().st_mode & 0o7666) | bits)
+
+
+def write_file_atomic(target: Path, data: Optional[bytes]) -> None:
+    if data is None:
+        if target.exists():
+            target.unlink()
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".bridge-tmp")
+    tmp.write_bytes(data)
+    if target.exists():
+        shutil.copymode(target, tmp)
+    os.replace(tmp, target)
+
+
 def git_apply_reverse(repo_root: Path, patch_text: str) -> Tuple[bool, str]:
     code, out, err = run_git(repo_root, ["apply", "-R", "--whitespace=nowarn"], patch_stdin=patch_text)
     if code == 0:
         return True, ""
-    return False, (err or out or "git apply -R failed")
\ No newline at end of file
+    return False, (err or out or "git apply -R failed")
+
+# ---------- in-process unified diff (parse / check / preview, no subprocess) ----------
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)$")
+DEFAULT_MAX_FUZZ = 2
+
+
+@dataclass
+class Hunk:
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    section: str = ""
+    lines: List[Tuple[str, str]] = field(default_factory=list)  # (" " | "-" | "+", text without EOL)
+    old_eof_newline: bool = True
+    new_eof_newline: bool = True
+
+    @property
+    def old_lines(self) -> List[str]:
+        return [t for op, t in self.lines if op != "+"]
+
+    @property
+    def new_lines(self) -> List[str]:
+        return [t for op, t in self.lines if op != "-"]
+
+
+@dataclass
+class FilePatch:
+    old_path: Optional[str]  # None = /dev/null (new file)
+    new_path: Optional[str]  # None = /dev/null (deleted file)
+    hunks: List[Hunk] = field(default_factory=list)
+    renamed: bool = False
+    binary: bool = False
+    old_mode: Optional[str] = None
+    new_mode: Optional[str] = None
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        return self.new_path or self.old_path or ""
+
+    def summary(self) -> Dict[str, Any]:
+        added = sum(1 for h in self.hunks for op, _ in h.lines if op == "+")
+        removed = sum(1 for h in self.hunks for op, _ in h.lines if op == "-")
+        return {
+            "path": self.path,
+            "oldPath": self.old_path,
+            "hunks": len(self.hunks),
+            "added": added,
+            "removed": removed,
+            "new": self.old_path is None,
+            "deleted": self.new_path is None,
+            "renamed": self.renamed,
+            "binary": self.binary,
+        }
+
+
+@dataclass
+class ParsedPatch:
+    files: List[FilePatch]
+    errors: List[str]
+
+
+def iter_file_patches(lines: Iterable[str]) -> Iterator[FilePatch]:
+    """
+    Streaming unified diff parser (plain and git-style headers). Yields each file once its last
+    hunk is complete; problems are recorded on FilePatch.errors with the diff line number.
+    """
+    cur: Optional[FilePatch] = None
+    hunk: Optional[Hunk] = None
+    old_left = new_left = 0
+    saw_minus = False
+    last_op = ""
+
+    for no, raw in enumerate(lines, 1):
+        line = raw.rstrip("\n").rstrip("\r")
+
+        if hunk is not None and (old_left > 0 or new_left > 0):
+            op = line[:1]
+            if op in (" ", "") and old_left > 0 and new_left > 0:
+                # editors often strip the lone space of an empty context line
+                hunk.lines.append((" ", line[1:]))
+                old_left -= 1
+                new_left -= 1
+            elif op == "-" and old_left > 0:
+                hunk.lines.append(("-", line[1:]))
+                old_left -= 1
+            elif op == "+" and new_left > 0:
+                hunk.lines.append(("+", line[1:]))
+                new_left -= 1
+            elif op == "\\":
+                _mark_no_eol(hunk, last_op)
+                continue
+            else:
+                assert cur is not None
+                cur.errors.append(f"line {no}: hunk shorter than its header (-{old_left} +{new_left} lines missing)")
+                hunk = None
+                old_left = new_left = 0
+                # fall through: the line may start the next file/hunk
+            if hunk is not None:
+                last_op = op if op in ("-", "+") else " "
+                continue
+
+        if line.startswith("\\") and hunk is not None:
+            _mark_no_eol(hunk, last_op)
+            continue
+
+        if line.startswith("diff --git "):
+            if cur is not None:
+                yield cur
+            old, new = _split_git_header(line[len("diff --git "):])
+            cur = FilePatch(old_path=old, new_path=new)
+            hunk = None
+            saw_minus = False
+            continue
+
+        if line.startswith("--- "):
+            # plain diffs have no "diff --git": a second header (or one after hunks) opens a new file
+            if cur is None or cur.hunks or saw_minus:
+                if cur is not None:
+                    yield cur
+                cur = FilePatch(old_path=None, new_path=None)
+            cur.old_path = _normalize_diff_path(line[4:])
+            saw_minus = True
+            hunk = None
+            continue
+
+        if cur is None:
+            continue
+
+        if line.startswith("+++ "):
+            cur.new_path = _normalize_diff_path(line[4:])
+            continue
+
+        m = _HUNK_RE.match(line)
+        if m:
+            hunk = Hunk(
+                old_start=int(m.group(1)),
+                old_count=int(m.group(2)) if m.group(2) is not None else 1,
+                new_start=int(m.group(3)),
+                new_count=int(m.group(4)) if m.group(4) is not None else 1,
+                section=m.group(5) or "",
+            )
+            cur.hunks.append(hunk)
+            old_left, new_left = hunk.old_count, hunk.new_count
+            last_op = ""
+            continue
+
+        if hunk is not None:
+            continue  # trailing noise after a complete hunk
+
+        # git extended headers
+        if line.startswith("rename from ") or line.startswith("copy from "):
+            cur.old_path = _normalize_diff_path(line.split(" ", 2)[2])
+            cur.renamed = line.startswith("rename")
+        elif line.startswith("rename to ") or line.startswith("copy to "):
+            cur.new_path = _normalize_diff_path(line.split(" ", 2)[2])
+        elif line.startswith("new file mode "):
+            cur.old_path, cur.new_mode = None, line[len("new file mode "):]
+        elif line.startswith("deleted file mode "):
+            cur.new_path, cur.old_mode = None, line[len("deleted file mode "):]
+        elif line.startswith("old mode "):
+            cur.old_mode = line[len("old mode "):]
+        elif line.startswith("new mode "):
+            cur.new_mode = line[len("new mode "):]
+        elif line.startswith("Binary files ") or line == "GIT binary patch":
+            cur.binary = True
+
+    if cur is not None:
+        if hunk is not None and (old_left > 0 or new_left > 0):
+            cur.errors.append(f"unexpected end of patch inside hunk (-{old_left} +{new_left} lines missing)")
+        yield cur
+
+
+def parse_patch(source: Union[str, Iterable[str]]) -> ParsedPatch:
+    lines = io.StringIO(source) if isinstance(source, str) else source
+    files = list(iter_file_patches(lines))
+    errors = [f"{fp.path}: {e}" for fp in files for e in fp.errors]
+    if not files:
+        errors.append("patch touches no files (could not parse diff headers)")
+    return ParsedPatch(files=files, errors=errors)
+
+
+def _mark_no_eol(hunk: Hunk, last_op: str) -> None:
+    if last_op in (" ", "-"):
+        hunk.old_eof_newline = False
+    if last_op in (" ", "+"):
+        hunk.new_eof_newline = False
+
+
+def _split_git_header(rest: str) -> Tuple[Optional[str], Optional[str]]:
+    # "a/x b/y" (paths without spaces are the common case; quoted/odd names rely on ---/+++)
+    i = rest.rfind(" b/")
+    if i == -1:
+        parts = rest.split(" ", 1)
+        return _normalize_diff_path(parts[0]), _normalize_diff_path(parts[-1])
+    return _normalize_diff_path(rest[:i]), _normalize_diff_path(rest[i + 1:])
+
+
+def _split_eol(text: str) -> Tuple[List[str], List[str]]:
+    lines: List[str] = []
+    eols: List[str] = []
+    for chunk in text.split("\n"):
+        if chunk.endswith("\r"):
+            lines.append(chunk[:-1])
+            eols.append("\r\n")
+        else:
+            lines.append(chunk)
+            eols.append("\n")
+    # the piece after the final "\n" is not a line (or is the last line without newline)
+    if lines[-1] == "" and eols[-1] == "\n":
+        lines.pop()
+        eols.pop()
+    else:
+        eols[-1] = ""
+    return lines, eols
+
+
+class _LineHashIndex:
+    """
+    line text -> positions in the original file; candidates for a hunk come from its rarest line.
+    """
+
+    def __init__(self, lines: List[str]) -> None:
+        self._pos: Dict[str, List[int]] = {}
+        for i, t in enumerate(lines):
+            self._pos.setdefault(t, []).append(i)
+
+    def starts(self, pattern: List[str]) -> List[int]:
+        best_k, best = 0, None
+        for k, t in enumerate(pattern):
+            p = self._pos.get(t)
+            if not p:
+                return []
+            if best is None or len(p) < len(best):
+                best_k, best = k, p
+        return [p - best_k for p in (best or [])]
+
+
+def apply_hunks(text: str, fp: FilePatch, max_fuzz: int = DEFAULT_MAX_FUZZ) -> Tuple[Optional[str], FileApplyResult]:
+    """
+    Apply one file's hunks to `text` in memory. Hunks are located at their header position
+    (plus the drift of earlier hunks), else at the nearest position found via the line-hash
+    index, dropping up to max_fuzz outer context lines. Returns (new text or None if any hunk
+    failed / the file is deleted, per-hunk result).
+    """
+    res = FileApplyResult(path=fp.path, hunks=len(fp.hunks))
+    lines, eols = _split_eol(text)
+    n = len(lines)
+    file_eol = "\r\n" if eols and eols[0] == "\r\n" else "\n"
+    index = _LineHashIndex(lines)
+    edits: List[Tuple[int, int, Hunk]] = []  # (start, end) in original lines
+    min_pos = 0
+    drift = 0
+
+    for hn, h in enumerate(fp.hunks, 1):
+        old = h.old_lines
+        # a zero-length old side inserts *after* old_start
+        expected = h.old_start + drift if not old else h.old_start - 1 + drift
+        found = _locate(lines, index, h, expected, min_pos, max_fuzz)
+        if found is None:
+            res.ok = False
+            res.rejected.append(hn)
+            res.failed_at.append(_first_mismatch(lines, old, max(expected, min_pos)) + 1)
+            continue
+        start, fuzz = found
+        if start != expected or fuzz:
+            entry = {"hunk": hn, "line": start + 1, "offset": start - expected}
+            if fuzz:
+                entry["fuzz"] = fuzz
+            res.offsets.append(entry)
+        drift += start - expected
+        edits.append((start, start + len(old), h))
+        min_pos = start + len(old)
+
+    if not res.ok:
+        return None, res
+    if fp.new_path is None:
+        covered = sum(end - start for start, end, _ in edits)
+        if covered != n or any(h.new_lines for _, _, h in edits):
+            res.ok = False
+            res.errors.append("deleted file does not match the patch")
+        return None, res
+
+    out: List[str] = []
+    pos = 0
+    for start, end, h in edits:
+        for i in range(pos, start):
+            out.append(lines[i] + eols[i])
+        orig = start
+        new_side: List[Tuple[str, str]] = []
+        for op, t in h.lines:
+            if op == " ":
+                new_side.append((t, (eols[orig] if orig < n else "") or file_eol))
+                orig += 1
+            elif op == "-":
+                orig += 1
+            else:
+                new_side.append((t, file_eol))
+        if new_side and end >= n:
+            t, eol = new_side[-1]
+            new_side[-1] = (t, "" if not h.new_eof_newline else (eol or file_eol))
+        out.extend(t + eol for t, eol in new_side)
+        pos = end
+    for i in range(pos, n):
+        out.append(lines[i] + eols[i])
+    return "".join(out), res
+
+
+def _locate(
+    lines: List[str], index: _LineHashIndex, h: Hunk, expected: int, min_pos: int, max_fuzz: int
+) -> Optional[Tuple[int, int]]:
+    old = h.old_lines
+    n = len(lines)
+    lead_ctx = 0
+    while lead_ctx < len(h.lines) and h.lines[lead_ctx][0] == " ":
+        lead_ctx += 1
+    trail_ctx = 0
+    while trail_ctx < len(h.lines) - lead_ctx and h.lines[-1 - trail_ctx][0] == " ":
+        trail_ctx += 1
+
+    # like git apply: a hunk at line 1 must match at the top, one without trailing context at the end;
+    # fuzz >= 1 drops those anchors, then also trims up to `fuzz` outer context lines
+    for fuzz in range(0, max_fuzz + 1):
+        lead = min(fuzz, lead_ctx)
+        trail = min(fuzz, trail_ctx)
+        at_top = fuzz == 0 and h.old_start <= 1
+        at_end = fuzz == 0 and trail_ctx == 0
+        while old and lead + trail >= len(old):  # keep at least one line to anchor on
+            lead, trail = (lead - 1, trail) if lead >= trail else (lead, trail - 1)
+        pattern = old[lead:len(old) - trail]
+        if not pattern:
+            if at_top:
+                return (0, 0) if min_pos == 0 else None
+            if at_end:
+                return (n, 0) if n >= min_pos else None
+            return min(max(expected, min_pos), n), fuzz
+        want = expected + lead
+        if 0 <= want and want + len(pattern) <= n and lines[want:want + len(pattern)] == pattern and want - lead >= min_pos:
+            if (not at_top or want - lead == 0) and (not at_end or want + len(pattern) == n):
+                return want - lead, fuzz
+        best: Optional[int] = None
+        for s in index.starts(pattern):
+            if s - lead < min_pos or s + len(pattern) > n:
+                continue
+            if (at_top and s - lead != 0) or (at_end and s + len(pattern) != n):
+                continue
+            if lines[s:s + len(pattern)] != pattern:
+                continue
+            if best is None or abs(s - want) < abs(best - want):
+                best = s
+        if best is not None:
+            return best - lead, fuzz
+    return None
+
+
+def _first_mismatch(lines: List[str], old: List[str], at: int) -> int:
+    """
+    0-based line where the hunk's old side stops matching when placed at `at`.
+    """
+    for k, t in enumerate(old):
+        if at + k >= len(lines) or lines[at + k] != t:
+            return at + k
+    return at
+
+
+def preview_patch(
+    repo_root: Path, patch_text: str, max_fuzz: int = DEFAULT_MAX_FUZZ
+) -> Tuple[ParsedPatch, List[FileApplyResult], Dict[str, Optional[str]]]:
+    """
+    Check a patch against the worktree without touching it or spawning git.
+    Returns the parsed patch, per-file results and the resulting text per path (None = deleted).
+    Files touched more than once see the result of their earlier sections.
+    """
+    parsed = parse_patch(patch_text)
+    results: List[FileApplyResult] = []
+    contents: Dict[str, Optional[str]] = {}
+
+    def _current(rel: str) -> Optional[str]:
+        if rel in contents:
+            return contents[rel]
+        p = repo_root / rel
+        if not p.is_file():
+            return None
+        return p.read_bytes().decode("utf-8", errors="surrogateescape")
+
+    for fp in parsed.files:
+        if fp.errors:
+            results.append(FileApplyResult(path=fp.path, ok=False, hunks=len(fp.hunks), errors=list(fp.errors)))
+            continue
+        if fp.binary:
+            results.append(FileApplyResult(path=fp.path, ok=False, errors=["binary patches are not supported in-process"]))
+            continue
+        src = _current(fp.old_path) if fp.old_path else None
+        if fp.old_path is None:
+            if fp.new_path and _current(fp.new_path) is not None:
+                results.append(FileApplyResult(path=fp.path, ok=False, hunks=len(fp.hunks), errors=["already exists"]))
+                continue
+            src = ""
+        elif src is None:
+            results.append(FileApplyResult(path=fp.path, ok=False, hunks=len(fp.hunks), errors=["does not exist"]))
+            continue
+        new_text, res = apply_hunks(src, fp, max_fuzz)
+        results.append(res)
+        if not res.ok:
+            continue
+        if fp.old_path and fp.old_path != fp.new_path:
+            contents[fp.old_path] = None
+        if fp.new_path:
+            contents[fp.new_path] = new_text
+    return parsed, results, contents
\ No newline at end of file
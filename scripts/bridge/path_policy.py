@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# scripts/bridge/path_policy.py
+"""
+Compiled path policy (deny list + allowlist) for the bridge.
+
+- Deny patterns and allow globs are each compiled once into a single combined regex
+  (fnmatch.translate, same case rules as fnmatch: deny on lower-cased paths, allow via os.path.normcase)
+- Per-directory memo: a directory whose components hit DENY_DIRS, or whose path already satisfies a
+  trailing-"*" pattern, rejects (deny) / accepts (allow) its whole subtree without per-file matching
+- Verdicts are identical to the original fnmatch loops, kept below as reference_* functions;
+  `python -m scripts.bridge.path_policy --repo <path>` compares both over every file of a tree
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import os
+import random
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+MAX_DIR_MEMO = 65536
+
+
+def _combine(patterns: Sequence[str]) -> Optional[Pattern[str]]:
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
+class DenyMatcher:
+    def __init__(self, deny_dirs: Iterable[str], deny_patterns: Sequence[str]) -> None:
+        self.deny_dirs = frozenset(deny_dirs)
+        pats = [p.lower() for p in deny_patterns]
+        self._any = _combine(pats)
+        # a pattern ending in "*" that matches "<dir>/" matches everything below it
+        self._tail = _combine([p for p in pats if p.endswith("*")])
+        self._dirs: Dict[str, bool] = {}
+
+    def _dir_denied(self, d: str) -> bool:
+        hit = self._dirs.get(d)
+        if hit is not None:
+            return hit
+        head, _, base = d.rpartition("/")
+        hit = base in self.deny_dirs or (bool(head) and self._dir_denied(head))
+        if not hit and self._tail is not None:
+            hit = self._tail.match(d + "/") is not None
+        if len(self._dirs) >= MAX_DIR_MEMO:
+            self._dirs.clear()
+        self._dirs[d] = hit
+        return hit
+
+    def is_denied(self, rel_posix: str) -> bool:
+        rel = rel_posix.replace("\\", "/").lower()
+        d, sep, name = rel.rpartition("/")
+        if sep and self._dir_denied(d):
+            return True
+        if name in self.deny_dirs:
+            return True
+        if self._any is None:
+            return False
+        return self._any.match(name) is not None or self._any.match(rel) is not None
+
+
+class AllowMatcher:
+    def __init__(self, allow_globs: Sequence[str]) -> None:
+        globs = [g.replace("\\", "/") for g in allow_globs]
+        self._any = _combine([os.path.normcase(g) for g in globs])
+        self._tail = _combine([os.path.normcase(g) for g in globs if os.path.normcase(g).endswith("*")])
+        # "<base>/**" also admits anything under <base>/ by plain (case-sensitive) prefix
+        self._prefixes: Tuple[str, ...] = tuple(g[:-3].rstrip("/") + "/" for g in globs if g.endswith("/**"))
+        self._dirs: Dict[str, bool] = {}
+
+    def _dir_allowed(self, d: str) -> bool:
+        hit = self._dirs.get(d)
+        if hit is not None:
+            return hit
+        head = d.rpartition("/")[0]
+        sub = d + "/"
+        hit = (bool(head) and self._dir_allowed(head)) or sub.startswith(self._prefixes)
+        if not hit and self._tail is not None:
+            hit = self._tail.match(os.path.normcase(sub)) is not None
+        if len(self._dirs) >= MAX_DIR_MEMO:
+            self._dirs.clear()
+        self._dirs[d] = hit
+        return hit
+
+    def matches(self, rel_posix: str) -> bool:
+        rel = rel_posix.replace("\\", "/")
+        d, sep, _ = rel.rpartition("/")
+        if sep and self._dir_allowed(d):
+            return True
+        if self._any is not None and self._any.match(os.path.normcase(rel)) is not None:
+            return True
+        return rel.startswith(self._prefixes)
+
+
+# ---------- reference implementation (pre-compilation behaviour) ----------
+
+
+def reference_is_denied(rel_posix: str, deny_dirs: Iterable[str], deny_patterns: Sequence[str]) -> bool:
+    rel = rel_posix.replace("\\", "/").lower()
+    parts = rel.split("/")
+    if any(p in deny_dirs for p in parts):
+        return True
+    name = parts[-1]
+    for pat in deny_patterns:
+        if fnmatch.fnmatch(name, pat.lower()) or fnmatch.fnmatch(rel, pat.lower()):
+            return True
+    return False
+
+
+def reference_matches_allowlist(rel_posix: str, allow_globs: Sequence[str]) -> bool:
+    rel = rel_posix.replace("\\", "/")
+    for g in allow_globs:
+        gposix = g.replace("\\", "/")
+        if fnmatch.fnmatch(rel, gposix):
+            return True
+        if gposix.endswith("/**"):
+            base = gposix[:-3]
+            if rel.startswith(base.rstrip("/") + "/"):
+                return True
+    return False
+
+
+def differential_check(
+    paths: Iterable[str], deny_dirs: Iterable[str], deny_patterns: Sequence[str], allow_globs: Sequence[str]
+) -> Tuple[int, List[str]]:
+    """
+    Compare compiled vs reference verdicts. Returns: paths checked, mismatch descriptions
+    """
+    deny_dirs = frozenset(deny_dirs)
+    deny = DenyMatcher(deny_dirs, deny_patterns)
+    allow = AllowMatcher(allow_globs)
+    n = 0
+    bad: List[str] = []
+    for rel in paths:
+        n += 1
+        a, b = deny.is_denied(rel), reference_is_denied(rel, deny_dirs, deny_patterns)
+        if a != b:
+            bad.append(f"deny {rel!r}: compiled={a} reference={b}")
+        a, b = allow.matches(rel), reference_matches_allowlist(rel, allow_globs)
+        if a != b:
+            bad.append(f"allow {rel!r}: compiled={a} reference={b}")
+    return n, bad
+
+
+def _fuzz_paths(seed: int, count: int) -> List[str]:
+    rnd = random.Random(seed)
+    pieces = [
+        "app", "App", "components", "node_modules", "Node_Modules", ".git", "scripts", "utils", "types",
+        "secret", "Secrets.json", "token", "my_token.ts", "private", "key", "private_key.txt", ".env",
+        ".env.local", "x.pem", "id_rsa.pub", "a.ts", "b.tsx", "README.md", "package.json", "tsconfig.json",
+        "android", "ios", "dist", ".github", "data", "hooks", "", "x\\y", "a b", "[x]", "*",
+    ]
+    out = []
+    for _ in range(count):
+        out.append("/".join(rnd.choice(pieces) for _ in range(rnd.randint(1, 5))))
+    return out
+
+
+def main() -> None:
+    from scripts.bridge.bridge_server import ALLOW_GLOBS_DEFAULT, DENY_PATTERNS
+    from scripts.bridge.walker import DENY_DIRS
+
+    ap = argparse.ArgumentParser(description="Differential check: compiled path policy vs fnmatch reference")
+    ap.add_argument("--repo", default="", help="Tree whose every file (no pruning) is checked")
+    ap.add_argument("--fuzz", type=int, default=20000, help="Random synthetic paths to check")
+    args = ap.parse_args()
+
+    paths: List[str] = _fuzz_paths(0, args.fuzz)
+    if args.repo:
+        root = Path(args.repo).resolve()
+        for dirpath, dirnames, filenames in os.walk(root):
+            rel_dir = Path(dirpath).relative_to(root).as_posix()
+            for name in dirnames + filenames:
+                paths.append(name if rel_dir == "." else f"{rel_dir}/{name}")
+    n, bad = differential_check(paths, DENY_DIRS, DENY_PATTERNS, ALLOW_GLOBS_DEFAULT)
+    for line in bad[:50]:
+        print(line)
+    print(f"[path-policy] checked={n} mismatches={len(bad)}")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# scripts/bridge/read_cache.py
+"""
+LRU cache for /repo/read responses.
+
+- Keyed by (path, mtime_ns, size, request shape): any change on disk is a new key, so entries never go stale
+- Stores the already encoded JSON body + its ETag (content hash), so hits skip disk I/O and json.dumps
+- Bounded by a memory budget in bytes (oldest entries evicted first)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    etag: str
+    body: bytes
+
+
+def content_etag(data: bytes, *parts: str) -> str:
+    h = hashlib.sha1(data)
+    for p in parts:
+        h.update(b"\0" + p.encode("utf-8"))
+    return f'"{h.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    # weak comparison (RFC 9110 13.1.2): W/ prefix is ignored
+    return "*" in tags or any(t[2:] == etag if t.startswith("W/") else t == etag for t in tags)
+
+
+class ReadCache:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[CachedBody]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def put(self, key: Hashable, item: CachedBody) -> None:
+        cost = len(item.body)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old.body)
+            self._items[key] = item
+            self._size += cost
+            while self._size > self.max_bytes and self._items:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted.body)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._size, "hits": self.hits, "misses": self.misses}
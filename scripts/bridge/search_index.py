@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# scripts/bridge/search_index.py
+"""
+Trigram index behind /repo/search.
+
+- Postings: case-folded trigram -> file ids (in memory), per-file trigram string kept for removals;
+  folding covers every pair re.IGNORECASE treats as equal (str.lower() misses e.g. ſ/s, ς/σ, ı/i)
+- Persisted as gzip JSON under the cache dir; on startup only files whose mtime/size changed are re-read
+- Kept current by FileIndex change deltas (poller / watcher / bridge writes): only the changed
+  paths are re-read, never a stat pass on the search request path
+- Queries return candidate paths; the caller still verifies every candidate with the real regex
+- Files too large to index are always returned as candidates (never a false negative)
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+try:  # py3.11+
+    from re import _parser as _sre_parse  # type: ignore[attr-defined]
+    from re import _constants as _sre_c  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover
+    import sre_constants as _sre_c  # type: ignore[no-redef]
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+from scripts.bridge.file_index import FileIndex
+
+INDEX_VERSION = 2
+INDEX_FILENAME = "trigram-v2.json.gz"
+MAX_INDEXED_BYTES = 2_000_000
+SAVE_INTERVAL_SECONDS = 30.0
+
+
+# re.IGNORECASE matches dotless ı and dotted İ with i; casefold() keeps ı and expands İ to i + U+0307
+_FOLD_FIRST = {ord("\u0131"): "i", ord("\u0130"): "i"}
+
+
+def fold(text: str) -> str:
+    return text.translate(_FOLD_FIRST).casefold()
+
+
+def trigrams(text: str) -> Set[str]:
+    t = fold(text)
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+
+def literal_runs(query: str, regex: bool) -> List[str]:
+    """
+    Literal substrings every match must contain. Empty list means "cannot filter".
+    """
+    if not regex:
+        return [query] if len(query) >= 3 else []
+    try:
+        parsed = _sre_parse.parse(query)
+    except Exception:
+        return []
+    runs: List[str] = []
+    cur: List[str] = []
+    for op, av in parsed:
+        if op is _sre_c.LITERAL:
+            cur.append(chr(av))
+            continue
+        # anything else (classes, repeats, groups, alternation, anchors) breaks the run
+        if cur:
+            runs.append("".join(cur))
+            cur = []
+    if cur:
+        runs.append("".join(cur))
+    return [r for r in runs if len(r) >= 3]
+
+
+class SearchIndex:
+    def __init__(self, file_index: FileIndex, cache_dir: Optional[Path]) -> None:
+        self.file_index = file_index
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._paths: Dict[int, str] = {}
+        self._meta: Dict[str, Tuple[int, int]] = {}  # path -> (mtime_ns, size)
+        self._grams: Dict[str, str] = {}  # path -> concatenated trigrams
+        self._postings: Dict[str, Set[int]] = {}
+        self._unindexed: Set[str] = set()
+        self._next_id = 0
+        self._pending: Set[str] = set()
+        self._saved_at = 0.0
+        self.ready = False
+        file_index.change_listeners.append(self._on_changes)
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        """
+        Load the persisted index and sync it in the background. Until ready, callers fall back to a scan.
+        """
+        def _run() -> None:
+            try:
+                self.load()
+                self.sync()
+                self.save()
+                self.ready = True
+                self.sync_pending()  # changes seen while the full pass ran
+            except Exception as e:
+                print(f"[bridge] search index unavailable: {e}")
+
+        threading.Thread(target=_run, name="bridge-search-index", daemon=True).start()
+
+    def _on_changes(self, changes: List[Tuple[str, str]]) -> None:
+        with self._lock:
+            self._pending.update(rel for rel, _ in changes)
+        if self.ready:
+            self.sync_pending()
+
+    # ---------- persistence ----------
+
+    def _index_path(self) -> Optional[Path]:
+        return self.cache_dir / INDEX_FILENAME if self.cache_dir else None
+
+    def load(self) -> None:
+        p = self._index_path()
+        if p is None or not p.exists():
+            return
+        try:
+            with gzip.open(p, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        with self._lock:
+            for path, (mtime_ns, size, grams) in data.get("files", {}).items():
+                self._add(path, int(mtime_ns), int(size), grams)
+
+    def save(self) -> None:
+        p = self._index_path()
+        if p is None:
+            return
+        with self._lock:
+            files = {path: [m[0], m[1], self._grams[path]] for path, m in self._meta.items() if path in self._grams}
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": files}, f, ensure_ascii=False)
+        os.replace(tmp, p)
+        self._saved_at = time.time()
+
+    # ---------- sync ----------
+
+    def sync(self) -> int:
+        """
+        Full pass: bring the index in line with the allowed files on disk (startup).
+        Returns number of files (re)indexed or dropped.
+        """
+        with self._sync_lock:
+            allowed, _ = self.file_index.list_allowed()
+            seen = set(allowed)
+            with self._lock:
+                gone = [p for p in self._meta if p not in seen]
+            return self._sync_paths(allowed, gone)
+
+    def sync_pending(self) -> int:
+        """
+        Re-index the paths FileIndex reported changed since the last call.
+        """
+        with self._sync_lock:
+            with self._lock:
+                pending, self._pending = self._pending, set()
+            if not pending:
+                return 0
+            return self._sync_paths(sorted(pending), [])
+
+    def _sync_paths(self, paths: List[str], gone: List[str]) -> int:
+        root = self.file_index.repo_root
+        changed = 0
+        for rel in paths:
+            entry = self.file_index.get(rel)
+            if entry is None or not entry.allowed:
+                gone.append(rel)
+                continue
+            try:
+                st = os.stat(root / rel)
+            except OSError:
+                gone.append(rel)
+                continue
+            meta = (st.st_mtime_ns, st.st_size)
+            if self._meta.get(rel) == meta:
+                continue
+            changed += 1
+            if st.st_size > MAX_INDEXED_BYTES:
+                with self._lock:
+                    self._remove(rel)
+                    self._meta[rel] = meta
+                    self._unindexed.add(rel)
+                continue
+            try:
+                text = (root / rel).read_text(encoding="utf-8", errors="replace")
+            except Exception:
+                continue
+            grams = "".join(trigrams(text))
+            with self._lock:
+                self._remove(rel)
+                self._add(rel, meta[0], meta[1], grams)
+
+        with self._lock:
+            for rel in gone:
+                if rel in self._meta:
+                    self._remove(rel)
+                    changed += 1
+
+        if changed and time.time() - self._saved_at > SAVE_INTERVAL_SECONDS:
+            try:
+                self.save()
+            except Exception as e:
+                print(f"[bridge] search index save failed: {e}")
+        return changed
+
+    # ---------- queries ----------
+
+    def candidates(self, query: str, regex: bool) -> Optional[List[str]]:
+        """
+        Sorted candidate paths for the query, or None if the index is not ready.
+        """
+        if not self.ready:
+            return None
+        runs = literal_runs(query, regex)
+        with self._lock:
+            if not runs:
+                return sorted(self._meta)
+            ids: Optional[Set[int]] = None
+            for run in runs:
+                for g in trigrams(run):
+                    posting = self._postings.get(g)
+                    if not posting:
+                        ids = set()
+                        break
+                    ids = set(posting) if ids is None else ids & posting
+                if ids is not None and not ids:
+                    break
+            out = {self._paths[i] for i in (ids or set())}
+            out |= self._unindexed
+        return sorted(out)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"files": len(self._meta), "trigrams": len(self._postings), "unindexed": len(self._unindexed)}
+
+    # ---------- internals (caller holds lock) ----------
+
+    def _add(self, path: str, mtime_ns: int, size: int, grams: str) -> None:
+        fid = self._next_id
+        self._next_id += 1
+        self._ids[path] = fid
+        self._paths[fid] = path
+        self._meta[path] = (mtime_ns, size)
+        self._grams[path] = grams
+        for i in range(0, len(grams), 3):
+            self._postings.setdefault(grams[i:i + 3], set()).add(fid)
+
+    def _remove(self, path: str) -> None:
+        self._meta.pop(path, None)
+        self._unindexed.discard(path)
+        fid = self._ids.pop(path, None)
+        grams = self._grams.pop(path, "")
+        if fid is None:
+            return
+        self._paths.pop(fid, None)
+        for i in range(0, len(grams), 3):
+            g = grams[i:i + 3]
+            posting = self._postings.get(g)
+            if posting is not None:
+                posting.discard(fid)
+                if not posting:
+                    del self._postings[g]
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# scripts/bridge/search_scan.py
+"""
+File scanning for /repo/search.
+
+- scan_file: regex-scan one file into hit dicts (same shape as before: path/index/snippet)
+- iter_file_hits: files are read in buffered chunks (with overlap), never loaded whole
+- scan_paths: sequential or fanned out over a process pool in fixed-size chunks
+- Results are always merged in input order, so maxHits/truncation match a sequential scan
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import re
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+SNIPPET_CONTEXT = 60
+CHUNK_FILES = 32
+READ_CHUNK_CHARS = 256 * 1024
+# Matches longer than this may be missed across read-chunk boundaries
+MATCH_OVERLAP_CHARS = 64 * 1024
+
+
+def iter_file_hits(root: Path, relp: str, pattern: "re.Pattern[str]") -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield hits for one file. "index" is the character offset in the whole file, as before.
+    """
+    try:
+        f = open(root / relp, "r", encoding="utf-8", errors="replace")
+    except Exception:
+        return
+    with f:
+        buf = ""
+        base = 0  # file offset of buf[0]
+        scan_from = 0  # file offset where the next search starts
+        eof = False
+        while not eof:
+            try:
+                data = f.read(READ_CHUNK_CHARS)
+            except Exception:
+                return
+            eof = not data
+            buf += data
+            safe_end = len(buf) if eof else len(buf) - MATCH_OVERLAP_CHARS
+            if safe_end <= 0:
+                continue
+            for m in pattern.finditer(buf, scan_from - base):
+                if not eof and m.end() > safe_end:
+                    break  # may still grow with more data
+                start = max(m.start() - SNIPPET_CONTEXT, 0)
+                end = min(m.end() + SNIPPET_CONTEXT, len(buf))
+                snippet = buf[start:end].replace("\n", "\\n")
+                yield {"path": relp, "index": base + m.start(), "snippet": snippet}
+                scan_from = base + max(m.end(), m.start() + 1)
+            else:
+                scan_from = max(scan_from, base + safe_end)
+            # keep only what the next pass still needs (plus snippet context)
+            drop = max(min(scan_from - base, safe_end) - SNIPPET_CONTEXT, 0)
+            buf = buf[drop:]
+            base += drop
+
+
+def scan_file(root: Path, relp: str, pattern: "re.Pattern[str]", limit: int) -> List[Dict[str, Any]]:
+    hits: List[Dict[str, Any]] = []
+    if limit <= 0:
+        return hits
+    for hit in iter_file_hits(root, relp, pattern):
+        hits.append(hit)
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+def scan_chunk(root: str, paths: List[str], pattern: "re.Pattern[str]", limit: int) -> List[Dict[str, Any]]:
+    """
+    Worker entry point: scan paths in order, stop once limit hits are collected.
+    """
+    base = Path(root)
+    hits: List[Dict[str, Any]] = []
+    for relp in paths:
+        hits.extend(scan_file(base, relp, pattern, limit - len(hits)))
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+def make_pool(workers: int) -> Optional[Executor]:
+    if workers <= 1:
+        return None
+    # spawn: forking a threaded server process is not safe
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _chunks(paths: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for p in paths:
+        chunk.append(p)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def scan_paths(
+    root: Path,
+    paths: Iterable[str],
+    pattern: "re.Pattern[str]",
+    max_hits: int,
+    pool: Optional[Executor] = None,
+    in_flight: int = 8,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield up to max_hits hits in path order. With a pool, up to in_flight chunks are scanned ahead.
+    """
+    if max_hits <= 0:
+        return
+    if pool is None:
+        n = 0
+        for relp in paths:
+            for hit in iter_file_hits(root, relp, pattern):
+                n += 1
+                yield hit
+                if n >= max_hits:
+                    return
+        return
+
+    pending: Deque["Future[List[Dict[str, Any]]]"] = deque()
+    chunks = _chunks(paths, CHUNK_FILES)
+    n = 0
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                pending.append(pool.submit(scan_chunk, str(root), chunk, pattern, max_hits))
+            if not pending:
+                return
+            for hit in pending.popleft().result()[: max_hits - n]:
+                n += 1
+                yield hit
+            if n >= max_hits:
+                return
+    finally:
+        for f in pending:
+            f.cancel()
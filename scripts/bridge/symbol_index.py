@@ -0,0 +1,709 @@
+#!/usr/bin/env python3
+# scripts/bridge/symbol_index.py
+"""
+Symbol / outline index of the allowlisted TS/JS sources behind /repo/symbols.
+
+- Tokenizer-level scanner (no TypeScript parser): comments, strings, template literals and regex
+  literals are skipped; top-level declarations are read off the token stream
+  - symbols: function, component, hook, class, interface, type, enum, namespace, context, const, variable,
+    default, reexport; with line, exported and default flags
+  - imports: static imports, re-exports (export ... from), dynamic import("x") and require("x")
+- Per file, keyed by (mtime_ns, size): sync re-scans only files whose stat changed
+  (FileIndex change deltas after the first full pass); persisted as gzip JSON under the cache dir
+- Name -> paths map for exact lookups; prefix / substring lookups walk the distinct names only
+- listeners get the paths each sync re-scanned or dropped (the import graph updates from them)
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from scripts.bridge.file_index import FileIndex
+
+SCANNER_VERSION = 1
+INDEX_FILENAME = f"symbols-v{SCANNER_VERSION}.json.gz"
+SOURCE_EXTENSIONS = (".ts", ".tsx", ".mts", ".cts", ".js", ".jsx", ".mjs", ".cjs")
+MAX_SCANNED_BYTES = 1_000_000
+SAVE_INTERVAL_SECONDS = 30.0
+
+Token = Tuple[str, str, int]  # (kind: "id" | "str" | "p", value, line)
+
+_IDENT_START = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_$")
+_IDENT_CHARS = _IDENT_START | frozenset("0123456789")
+# after these keywords a "/" starts a regex literal, not a division
+_REGEX_AFTER_WORDS = frozenset({"return", "typeof", "case", "in", "of", "new", "delete", "void", "throw", "else", "do", "yield", "await"})
+_DECL_WORDS = frozenset({"function", "class", "interface", "type", "enum", "const", "let", "var", "namespace", "module", "abstract", "async", "declare"})
+_COMPONENT_INIT_WORDS = frozenset({"function", "async", "memo", "forwardRef", "React", "styled"})
+
+
+@dataclass
+class Symbol:
+    name: str
+    kind: str
+    line: int
+    exported: bool = False
+    default: bool = False
+
+
+@dataclass
+class ImportRef:
+    source: str
+    line: int
+    kind: str  # import | reexport | dynamic | require
+    names: List[str] = field(default_factory=list)
+    typeOnly: bool = False
+
+
+@dataclass
+class FileSymbols:
+    symbols: List[Symbol] = field(default_factory=list)
+    imports: List[ImportRef] = field(default_factory=list)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"symbols": [asdict(s) for s in self.symbols], "imports": [asdict(i) for i in self.imports]}
+
+    @staticmethod
+    def from_json(data: Dict[str, Any]) -> "FileSymbols":
+        return FileSymbols(
+            symbols=[Symbol(**s) for s in data.get("symbols", [])],
+            imports=[ImportRef(**i) for i in data.get("imports", [])],
+        )
+
+
+# ---------- tokenizer ----------
+
+
+def _skip_string(text: str, i: int, quote: str) -> Tuple[int, str]:
+    """
+    i is just after the opening quote. Returns (index after the closing quote, value).
+    """
+    n = len(text)
+    out: List[str] = []
+    while i < n:
+        ch = text[i]
+        if ch == "\\":
+            out.append(text[i + 1 : i + 2])
+            i += 2
+            continue
+        if ch == quote:
+            return i + 1, "".join(out)
+        if ch == "\n":
+            return i, "".join(out)  # unterminated: stop at the line end
+        out.append(ch)
+        i += 1
+    return i, "".join(out)
+
+
+def _skip_template(text: str, i: int) -> int:
+    """
+    i is just after the opening backtick. Skips nested ${ ... } expressions.
+    """
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch == "\\":
+            i += 2
+        elif ch == "`":
+            return i + 1
+        elif ch == "$" and text.startswith("${", i):
+            i = _skip_expression(text, i + 2)
+        else:
+            i += 1
+    return i
+
+
+def _skip_expression(text: str, i: int) -> int:
+    """
+    Inside a template "${": skip to after the matching "}".
+    """
+    n = len(text)
+    depth = 1
+    while i < n:
+        ch = text[i]
+        if ch in "'\"":
+            i = _skip_string(text, i + 1, ch)[0]
+        elif ch == "`":
+            i = _skip_template(text, i + 1)
+        elif ch == "{":
+            depth += 1
+            i += 1
+        elif ch == "}":
+            depth -= 1
+            i += 1
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return i
+
+
+def tokenize(text: str) -> List[Token]:
+    toks: List[Token] = []
+    n = len(text)
+    i = 0
+    line = 1
+    while i < n:
+        ch = text[i]
+        if ch == "\n":
+            line += 1
+            i += 1
+        elif ch in " \t\r\f\v\ufeff":
+            i += 1
+        elif ch == "/" and i + 1 < n and text[i + 1] == "/":
+            j = text.find("\n", i)
+            i = n if j < 0 else j
+        elif ch == "/" and i + 1 < n and text[i + 1] == "*":
+            j = text.find("*/", i + 2)
+            j = n if j < 0 else j + 2
+            line += text.count("\n", i, j)
+            i = j
+        elif ch in "'\"":
+            j, value = _skip_string(text, i + 1, ch)
+            toks.append(("str", value, line))
+            i = j
+        elif ch == "`":
+            j = _skip_template(text, i + 1)
+            line += text.count("\n", i, j)
+            toks.append(("str", "", line))
+            i = j
+        elif ch in _IDENT_START:
+            j = i + 1
+            while j < n and text[j] in _IDENT_CHARS:
+                j += 1
+            toks.append(("id", text[i:j], line))
+            i = j
+        elif ch.isdigit():
+            j = i + 1
+            while j < n and (text[j] in _IDENT_CHARS or text[j] == "."):
+                j += 1
+            toks.append(("p", "0", line))
+            i = j
+        elif ch == "/" and _regex_allowed(toks):
+            i = _skip_regex(text, i + 1)
+            toks.append(("str", "", line))
+        else:
+            toks.append(("p", ch, line))
+            i += 1
+    return toks
+
+
+def _regex_allowed(toks: List[Token]) -> bool:
+    if not toks:
+        return True
+    kind, value, _ = toks[-1]
+    if kind == "id":
+        return value in _REGEX_AFTER_WORDS
+    if kind == "str":
+        return False
+    # "</" closes a JSX tag
+    return value not in ")]}0<"
+
+
+def _skip_regex(text: str, i: int) -> int:
+    n = len(text)
+    in_class = False
+    while i < n:
+        ch = text[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "\n":
+            return i
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "/":
+            i += 1
+            while i < n and text[i] in _IDENT_CHARS:
+                i += 1  # flags
+            return i
+        i += 1
+    return i
+
+
+# ---------- scanner ----------
+
+
+def _is_pascal(name: str) -> bool:
+    return bool(name) and name[0].isupper() and not name.isupper()
+
+
+def _is_hook(name: str) -> bool:
+    return len(name) > 3 and name.startswith("use") and name[3].isupper()
+
+
+class _Scanner:
+    def __init__(self, toks: List[Token], jsx: bool) -> None:
+        self.t = toks
+        self.n = len(toks)
+        self.jsx = jsx
+        self.out = FileSymbols()
+        self.local_exports: Dict[str, str] = {}  # local name -> exported alias
+        self.default_local: Optional[str] = None
+
+    def tok(self, i: int) -> Token:
+        return self.t[i] if i < self.n else ("p", "", self.t[-1][2] if self.t else 0)
+
+    def is_p(self, i: int, v: str) -> bool:
+        k, val, _ = self.tok(i)
+        return k == "p" and val == v
+
+    def is_id(self, i: int, v: Optional[str] = None) -> bool:
+        k, val, _ = self.tok(i)
+        return k == "id" and (v is None or val == v)
+
+    def run(self) -> FileSymbols:
+        depth = 0
+        i = 0
+        while i < self.n:
+            k, v, line = self.t[i]
+            prev = self.t[i - 1] if i else ("p", ";", 0)
+            if k == "p":
+                if v == "{":
+                    depth += 1
+                elif v == "}":
+                    depth = max(0, depth - 1)
+                i += 1
+                continue
+            if k == "id" and prev[1] != ".":
+                if v in ("import", "require") and self.is_p(i + 1, "(") and self.tok(i + 2)[0] == "str":
+                    self.out.imports.append(ImportRef(source=self.tok(i + 2)[1], line=line, kind="dynamic" if v == "import" else "require"))
+                    i += 3
+                    continue
+                if depth == 0 and v == "import":
+                    i = self._import(i + 1, line)
+                    continue
+                if depth == 0 and v == "export":
+                    i = self._export(i + 1, line)
+                    continue
+                if depth == 0 and v in _DECL_WORDS and prev[1] != "(":
+                    i = self._decl(i, exported=False, default=False)
+                    continue
+            i += 1
+        self._finish()
+        return self.out
+
+    # ----- import / export -----
+
+    def _names_in_braces(self, i: int) -> Tuple[int, List[Tuple[str, str]]]:
+        """
+        i at "{". Returns (index after "}", [(name, alias)]), "type" modifiers dropped.
+        """
+        pairs: List[Tuple[str, str]] = []
+        i += 1
+        while i < self.n and not self.is_p(i, "}"):
+            if self.is_id(i, "type") and self.is_id(i + 1) and not self.is_id(i + 1, "as"):
+                i += 1
+            if self.tok(i)[0] in ("id", "str"):
+                name = self.tok(i)[1]
+                alias = name
+                if self.is_id(i + 1, "as") and self.tok(i + 2)[0] in ("id", "str"):
+                    alias = self.tok(i + 2)[1]
+                    i += 2
+                pairs.append((name, alias))
+            i += 1
+        return i + 1, pairs
+
+    def _from(self, i: int) -> Tuple[int, Optional[str]]:
+        if self.is_id(i, "from") and self.tok(i + 1)[0] == "str":
+            return i + 2, self.tok(i + 1)[1]
+        return i, None
+
+    def _import(self, i: int, line: int) -> int:
+        type_only = False
+        if self.is_id(i, "type") and not self.is_id(i + 1, "from") and not self.is_p(i + 1, ","):
+            type_only, i = True, i + 1
+        if self.tok(i)[0] == "str":  # side-effect import
+            self.out.imports.append(ImportRef(source=self.tok(i)[1], line=line, kind="import"))
+            return i + 1
+        names: List[str] = []
+        while i < self.n and not self.is_id(i, "from") and not self.is_p(i, ";"):
+            if self.is_p(i, "{"):
+                i, pairs = self._names_in_braces(i)
+                names += [alias for _, alias in pairs]
+                continue
+            if self.is_p(i, "*") and self.is_id(i + 1, "as") and self.is_id(i + 2):
+                names.append(self.tok(i + 2)[1])
+                i += 3
+                continue
+            if self.is_id(i) and self.tok(i)[1] != "as":
+                if self.is_p(i + 1, "="):  # import x = require("y") / import x = A.B
+                    return i + 1
+                names.append(self.tok(i)[1])
+            i += 1
+        i, source = self._from(i)
+        if source is not None:
+            self.out.imports.append(ImportRef(source=source, line=line, kind="import", names=names, typeOnly=type_only))
+        return i
+
+    def _export(self, i: int, line: int) -> int:
+        if self.is_id(i, "default"):
+            i += 1
+            if self.is_id(i) and self.tok(i)[1] in _DECL_WORDS:
+                return self._decl(i, exported=True, default=True)
+            if self.is_id(i) and (self.is_p(i + 1, ";") or self.tok(i + 1)[2] != line or i + 1 >= self.n):
+                self.default_local = self.tok(i)[1]
+                return i + 1
+            self.out.symbols.append(Symbol(name="default", kind="default", line=line, exported=True, default=True))
+            return i
+        type_only = False
+        if self.is_id(i, "type") and self.is_p(i + 1, "{"):
+            type_only, i = True, i + 1
+        if self.is_p(i, "{"):
+            i, pairs = self._names_in_braces(i)
+            i, source = self._from(i)
+            if source is not None:
+                self.out.imports.append(ImportRef(source=source, line=line, kind="reexport", names=[a for _, a in pairs], typeOnly=type_only))
+                for _, alias in pairs:
+                    self.out.symbols.append(Symbol(name=alias, kind="reexport", line=line, exported=True, default=alias == "default"))
+            else:
+                for name, alias in pairs:
+                    self.local_exports[name] = alias
+            return i
+        if self.is_p(i, "*"):
+            i += 1
+            names: List[str] = []
+            if self.is_id(i, "as") and self.is_id(i + 1):
+                names.append(self.tok(i + 1)[1])
+                i += 2
+            i, source = self._from(i)
+            if source is not None:
+                self.out.imports.append(ImportRef(source=source, line=line, kind="reexport", names=names or ["*"]))
+                for name in names:
+                    self.out.symbols.append(Symbol(name=name, kind="reexport", line=line, exported=True))
+            return i
+        if self.is_p(i, "=") and self.is_id(i + 1):  # export = X
+            self.default_local = self.tok(i + 1)[1]
+            return i + 2
+        if self.is_id(i) and self.tok(i)[1] in _DECL_WORDS:
+            return self._decl(i, exported=True, default=False)
+        return i
+
+    # ----- declarations -----
+
+    def _decl(self, i: int, exported: bool, default: bool) -> int:
+        while self.is_id(i) and self.tok(i)[1] in ("declare", "abstract", "async", "export", "default"):
+            i += 1
+        k, word, line = self.tok(i)
+        if k != "id":
+            return i
+        if word == "function":
+            i += 1
+            if self.is_p(i, "*"):
+                i += 1
+            name = self.tok(i)[1] if self.is_id(i) else "default"
+            self._add(name, self._function_kind(name), line, exported, default)
+            return i + 1 if name != "default" else i
+        if word in ("class", "interface", "enum", "namespace", "module"):
+            name = self.tok(i + 1)[1] if self.is_id(i + 1) else "default"
+            if word == "module" and name == "default":
+                return i + 1  # declare module "x" { ... }
+            self._add(name, "namespace" if word == "module" else word, line, exported, default)
+            return i + 2
+        if word == "type":
+            if self.is_id(i + 1) and (self.is_p(i + 2, "=") or self.is_p(i + 2, "<")):
+                self._add(self.tok(i + 1)[1], "type", line, exported, default)
+                return i + 2
+            return i + 1
+        if word == "const" and self.is_id(i + 1, "enum"):
+            return self._decl(i + 1, exported, default)
+        if word in ("const", "let", "var"):
+            return self._variables(i + 1, word, line, exported)
+        return i + 1
+
+    def _function_kind(self, name: str) -> str:
+        if _is_hook(name):
+            return "hook"
+        if self.jsx and _is_pascal(name):
+            return "component"
+        return "function"
+
+    def _variables(self, i: int, word: str, line: int, exported: bool) -> int:
+        names: List[str] = []
+        if self.is_id(i):
+            names.append(self.tok(i)[1])
+            i += 1
+        elif self.is_p(i, "{") or self.is_p(i, "["):
+            close = "}" if self.is_p(i, "{") else "]"
+            depth = 0
+            while i < self.n:
+                if self.is_p(i, "{") or self.is_p(i, "["):
+                    depth += 1
+                elif self.is_p(i, "}") or self.is_p(i, "]"):
+                    depth -= 1
+                    if depth == 0:
+                        break
+                elif depth == 1 and self.is_id(i) and self.tok(i + 1)[1] in (",", close, "=") and not self.is_p(i - 1, "."):
+                    names.append(self.tok(i)[1])
+                i += 1
+            i += 1
+        else:
+            return i
+        kind = "const" if word == "const" else "variable"
+        if len(names) == 1:
+            kind = self._initializer_kind(i, names[0], kind)
+        for name in names:
+            self._add(name, kind, line, exported, False)
+        return i
+
+    def _initializer_kind(self, i: int, name: str, fallback: str) -> str:
+        # skip a type annotation up to "=" (same statement only)
+        j = i
+        while j < self.n and j - i < 64 and not self.is_p(j, "=") and not self.is_p(j, ";"):
+            j += 1
+        if not self.is_p(j, "="):
+            return fallback
+        head = [self.tok(j + d)[1] for d in range(1, 6)]
+        if "createContext" in head:
+            return "context"
+        first = head[0]
+        callable_init = first in ("(", "function", "async") or (self.tok(j + 1)[0] == "id" and self.is_p(j + 2, "=") and self.is_p(j + 3, ">"))
+        if _is_hook(name) and callable_init:
+            return "hook"
+        if _is_pascal(name) and (callable_init or first in _COMPONENT_INIT_WORDS) and self.jsx:
+            return "component"
+        if callable_init:
+            return "function"
+        return fallback
+
+    def _add(self, name: str, kind: str, line: int, exported: bool, default: bool) -> None:
+        self.out.symbols.append(Symbol(name=name, kind=kind, line=line, exported=exported or default, default=default))
+
+    def _finish(self) -> None:
+        by_name = {s.name: s for s in self.out.symbols if s.kind not in ("reexport", "default")}
+        for local, alias in self.local_exports.items():
+            s = by_name.get(local)
+            if s is None:
+                continue
+            s.exported = True
+            if alias == "default":
+                s.default = True
+            elif alias != local:
+                self.out.symbols.append(Symbol(name=alias, kind=s.kind, line=s.line, exported=True))
+        if self.default_local is not None:
+            s = by_name.get(self.default_local)
+            if s is not None:
+                s.exported = s.default = True
+        self.out.symbols.sort(key=lambda s: (s.line, s.name))
+
+
+def scan_source(text: str, path: str = "") -> FileSymbols:
+    """
+    Symbols and imports of one TS/JS source file.
+    """
+    return _Scanner(tokenize(text), jsx=path.endswith(("x", ".js"))).run()
+
+
+# ---------- index ----------
+
+
+class SymbolIndex:
+    def __init__(self, file_index: FileIndex, cache_dir: Optional[Path]) -> None:
+        self.file_index = file_index
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._meta: Dict[str, Tuple[int, int]] = {}  # path -> (mtime_ns, size)
+        self._files: Dict[str, FileSymbols] = {}
+        self._by_name: Dict[str, Set[str]] = {}
+        self._pending: Set[str] = set()
+        self._full = True  # next sync stats every source file
+        self._saved_at = 0.0
+        self.ready = False
+        # called with the paths each sync() re-scanned or dropped (outside the lock)
+        self.listeners: List[Callable[[List[str]], None]] = []
+        file_index.change_listeners.append(self._on_changes)
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        def _run() -> None:
+            try:
+                self.load()
+                self.sync()
+                self.save()
+                self.ready = True
+            except Exception as e:
+                print(f"[bridge] symbol index unavailable: {e}")
+
+        threading.Thread(target=_run, name="bridge-symbol-index", daemon=True).start()
+
+    def _on_changes(self, changes: List[Tuple[str, str]]) -> None:
+        with self._lock:
+            self._pending.update(rel for rel, _ in changes if rel.endswith(SOURCE_EXTENSIONS))
+
+    def mark_dirty(self) -> None:
+        with self._lock:
+            self._full = True
+
+    # ---------- persistence ----------
+
+    def _index_path(self) -> Optional[Path]:
+        return self.cache_dir / INDEX_FILENAME if self.cache_dir else None
+
+    def load(self) -> None:
+        p = self._index_path()
+        if p is None or not p.exists():
+            return
+        try:
+            with gzip.open(p, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        if data.get("version") != SCANNER_VERSION:
+            return
+        with self._lock:
+            for path, (mtime_ns, size, syms) in data.get("files", {}).items():
+                self._put(path, (int(mtime_ns), int(size)), FileSymbols.from_json(syms))
+
+    def save(self) -> None:
+        p = self._index_path()
+        if p is None:
+            return
+        with self._lock:
+            files = {path: [m[0], m[1], self._files[path].to_json()] for path, m in self._meta.items()}
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump({"version": SCANNER_VERSION, "files": files}, f, ensure_ascii=False)
+        os.replace(tmp, p)
+        self._saved_at = time.time()
+
+    # ---------- sync ----------
+
+    def sync(self) -> int:
+        """
+        Re-scan sources whose (mtime, size) changed. Returns number of files (re)scanned or dropped.
+        """
+        with self._sync_lock:
+            with self._lock:
+                full, self._full = self._full, False
+                pending, self._pending = self._pending, set()
+            if full:
+                allowed, _ = self.file_index.list_allowed()
+                paths = [p for p in allowed if p.endswith(SOURCE_EXTENSIONS)]
+                path_set = set(paths)
+                with self._lock:
+                    gone = [p for p in self._meta if p not in path_set]
+            else:
+                paths = sorted(pending)
+                gone = []
+            touched = self._sync_paths(paths, gone)
+            for fn in self.listeners if touched else []:
+                try:
+                    fn(touched)
+                except Exception as e:
+                    print(f"[bridge] symbol index listener failed: {e}")
+        if touched and time.time() - self._saved_at > SAVE_INTERVAL_SECONDS:
+            try:
+                self.save()
+            except Exception as e:
+                print(f"[bridge] symbol index save failed: {e}")
+        return len(touched)
+
+    def _sync_paths(self, paths: List[str], gone: List[str]) -> List[str]:
+        root = self.file_index.repo_root
+        touched: List[str] = []
+        for rel in paths:
+            try:
+                st = os.stat(root / rel)
+            except OSError:
+                gone.append(rel)
+                continue
+            meta = (st.st_mtime_ns, st.st_size)
+            with self._lock:
+                if self._meta.get(rel) == meta:
+                    continue
+            syms = FileSymbols()
+            if st.st_size <= MAX_SCANNED_BYTES:
+                try:
+                    syms = scan_source((root / rel).read_text(encoding="utf-8", errors="replace"), rel)
+                except OSError:
+                    continue
+            with self._lock:
+                self._drop(rel)
+                self._put(rel, meta, syms)
+            touched.append(rel)
+        with self._lock:
+            for rel in gone:
+                if rel in self._meta:
+                    self._drop(rel)
+                    touched.append(rel)
+        return touched
+
+    # ---------- queries ----------
+
+    def find(self, name: str, match: str = "exact", kinds: Optional[Set[str]] = None, exported_only: bool = False, limit: int = 200) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Symbols named `name` (match: exact | prefix | substring; exact and prefix are case-sensitive,
+        substring is not). Returns (matches sorted by exported first then path, truncated).
+        """
+        self.sync()
+        with self._lock:
+            if match == "exact":
+                names = [name] if name in self._by_name else []
+            elif match == "prefix":
+                names = [n for n in self._by_name if n.startswith(name)]
+            else:
+                low = name.lower()
+                names = [n for n in self._by_name if low in n.lower()]
+            out: List[Dict[str, Any]] = []
+            for n in names:
+                for path in self._by_name[n]:
+                    for s in self._files[path].symbols:
+                        if s.name != n or (kinds and s.kind not in kinds) or (exported_only and not s.exported):
+                            continue
+                        out.append({"path": path, **asdict(s)})
+        out.sort(key=lambda r: (not r["exported"], r["kind"] == "reexport", r["path"], r["line"]))
+        return out[:limit], len(out) > limit
+
+    def outline(self, rel: str) -> Optional[FileSymbols]:
+        self.sync()
+        with self._lock:
+            return self._files.get(rel)
+
+    def imports_snapshot(self) -> Dict[str, List[ImportRef]]:
+        """
+        Imports of every indexed file (no sync: callers sync first).
+        """
+        with self._lock:
+            return {path: list(syms.imports) for path, syms in self._files.items()}
+
+    def imports_of(self, paths: List[str]) -> Dict[str, Optional[List[ImportRef]]]:
+        """
+        Imports of the given files, None for files not (or no longer) indexed.
+        """
+        with self._lock:
+            return {p: (list(self._files[p].imports) if p in self._files else None) for p in paths}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"files": len(self._files), "names": len(self._by_name)}
+
+    # ---------- internals (caller holds lock) ----------
+
+    def _put(self, path: str, meta: Tuple[int, int], syms: FileSymbols) -> None:
+        self._meta[path] = meta
+        self._files[path] = syms
+        for s in syms.symbols:
+            self._by_name.setdefault(s.name, set()).add(path)
+
+    def _drop(self, path: str) -> None:
+        self._meta.pop(path, None)
+        old = self._files.pop(path, None)
+        if old is None:
+            return
+        for s in old.symbols:
+            paths = self._by_name.get(s.name)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._by_name[s.name]
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# scripts/bridge/tracing.py
+"""
+Per-request tracing for the bridge.
+
+- RequestTrace: trace id (X-Trace-Id from the client, or generated) + time per phase
+  (auth, body, handler, and nested: policy, git, index, scan, encode, compress, write)
+- The active trace is thread-local, so helpers (path policy, git backend hook, JSON encoding)
+  add their time without threading the trace through every call
+- SlowLog: requests slower than a threshold (not counting long-poll waits) go to a rotating JSONL file with their parameters
+  (large strings / lists summarized, never logged verbatim) and the phase breakdown
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+_TRACE_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+PARAM_MAX_CHARS = 200
+
+_local = threading.local()
+
+
+class RequestTrace:
+    def __init__(self, method: str, path: str, trace_id: str = "") -> None:
+        self.trace_id = trace_id if _TRACE_ID_RE.match(trace_id or "") else uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.attrs: Dict[str, Any] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+def current() -> Optional[RequestTrace]:
+    return getattr(_local, "trace", None)
+
+
+def set_current(trace: Optional[RequestTrace]) -> None:
+    _local.trace = trace
+
+
+def add_phase(name: str, seconds: float) -> None:
+    trace = current()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Time a block against the current thread's trace (no-op outside a request).
+    """
+    trace = current()
+    if trace is None:
+        yield
+        return
+    with trace.phase(name):
+        yield
+
+
+def summarize_params(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Request parameters safe and small enough to log: short scalars as-is, the rest (and any
+    multi-line string: patch / file content) as sizes.
+    """
+    out: Dict[str, Any] = {}
+    for k, v in body.items():
+        if isinstance(v, (bool, int, float)) or v is None:
+            out[k] = v
+        elif isinstance(v, str):
+            out[k] = v if len(v) <= PARAM_MAX_CHARS and "\n" not in v else {"chars": len(v)}
+        elif isinstance(v, list):
+            out[k] = {"items": len(v)}
+        elif isinstance(v, dict):
+            out[k] = {"keys": len(v)}
+        else:
+            out[k] = type(v).__name__
+    return out
+
+
+class SlowLog:
+    def __init__(self, path: Path, threshold_ms: float, max_bytes: int, backups: int = 3) -> None:
+        self.path = path
+        self.threshold_ms = threshold_ms
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._logger = logging.getLogger(f"bridge.slowlog.{path}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        if not self._logger.handlers:
+            handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+    def maybe_write(self, trace: RequestTrace, status: int, total_s: float, extra: Dict[str, Any]) -> bool:
+        ms = total_s * 1000
+        # idle long-poll time (phase "wait") is not slowness
+        if ms - trace.phases.get("wait", 0.0) * 1000 < self.threshold_ms:
+            return False
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+            "traceId": trace.trace_id,
+            "method": trace.method,
+            "path": trace.path,
+            "status": status,
+            "ms": round(ms, 3),
+            "phases": {k: round(v * 1000, 3) for k, v in sorted(trace.phases.items())},
+            **trace.attrs,
+            **extra,
+        }
+        self._logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+        return True
+
+    def close(self) -> None:
+        for h in list(self._logger.handlers):
+            h.close()
+            self._logger.removeHandler(h)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# scripts/bridge/walker.py
+"""
+Pruning repo walker shared by the bridge (/repo/tree index, /repo/search) and scripts/ai.
+
+- os.scandir based, lazy (callers can stop early)
+- Never descends into deny dirs (node_modules, .git, android, ...)
+- Never descends into subtrees no allow glob could match
+- Yields (rel_posix, os.DirEntry); file policy (deny patterns, exact allowlist) stays with the caller
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Directories never walked or served (bridge policy, scripts/ai patchers)
+DENY_DIRS = {
+    ".git", "node_modules", "dist", "dist-web", "build", ".expo", ".next", ".turbo",
+    "android", "ios",
+}
+
+
+def _glob_literal_prefix(glob: str) -> Tuple[str, bool]:
+    """
+    Literal part of a glob before its first wildcard, and whether it has a wildcard at all.
+    fnmatch wildcards also match "/", so anything after the literal prefix may be any depth.
+    """
+    g = glob.replace("\\", "/").lstrip("/")
+    for i, ch in enumerate(g):
+        if ch in "*?[":
+            return g[:i], True
+    return g, False
+
+
+class RepoWalker:
+    def __init__(self, repo_root: Path, deny_dirs: Iterable[str], allow_globs: Optional[List[str]] = None) -> None:
+        self.repo_root = repo_root
+        self.deny_dirs = {d.lower() for d in deny_dirs}
+        self._allow: Optional[List[Tuple[str, bool]]] = None
+        if allow_globs is not None:
+            self._allow = [
+                (os.path.normcase(prefix), wild) for prefix, wild in map(_glob_literal_prefix, allow_globs)
+            ]
+
+    def dir_allowed(self, rel_dir: str) -> bool:
+        """
+        False if the directory is denied or no allow glob can match anything below it.
+        """
+        rel_dir = rel_dir.replace("\\", "/").strip("/")
+        if not rel_dir:
+            return True
+        if any(part.lower() in self.deny_dirs for part in rel_dir.split("/")):
+            return False
+        return self._may_contain_allowed(rel_dir)
+
+    def _may_contain_allowed(self, rel_dir: str) -> bool:
+        if self._allow is None:
+            return True
+        d = os.path.normcase(rel_dir + "/")
+        for prefix, wild in self._allow:
+            if prefix.startswith(d):
+                return True  # glob reaches below this dir
+            if wild and d.startswith(prefix):
+                return True  # wildcard starts at/above this dir
+        return False
+
+    def walk(
+        self,
+        start: str = "",
+        include_dirs: bool = False,
+        recursive: bool = True,
+        suffixes: Optional[Tuple[str, ...]] = None,
+    ) -> Iterator[Tuple[str, os.DirEntry]]:
+        """
+        Depth-first, lazily. Directories are yielded (when include_dirs) before their contents.
+        """
+        start = start.replace("\\", "/").strip("/")
+        if not self.dir_allowed(start):
+            return
+        stack = [start]
+        while stack:
+            rel_dir = stack.pop()
+            abs_dir = str(self.repo_root / rel_dir) if rel_dir else str(self.repo_root)
+            try:
+                it = os.scandir(abs_dir)
+            except OSError:
+                continue
+            subdirs: List[str] = []
+            with it:
+                for de in it:
+                    rel = f"{rel_dir}/{de.name}" if rel_dir else de.name
+                    try:
+                        is_dir = de.is_dir(follow_symlinks=False)
+                        is_file = not is_dir and de.is_file()
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if de.name.lower() in self.deny_dirs or not self._may_contain_allowed(rel):
+                            continue
+                        if include_dirs:
+                            yield rel, de
+                        if recursive:
+                            subdirs.append(rel)
+                        continue
+                    if not is_file:
+                        continue
+                    if suffixes is not None and not de.name.endswith(suffixes):
+                        continue
+                    yield rel, de
+            # reversed so siblings are visited in scandir order
+            stack.extend(reversed(subdirs))